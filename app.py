@@ -1,21 +1,31 @@
 import streamlit as st
 import datetime
 import os
+import pandas as pd
 from dotenv import load_dotenv
 
 load_dotenv()
 
 # --- Real Clients ---
 from services.weather_api import WeatherApiClient
-from services.gemini_llm import GeminiLLMClient
+from services.explanation_cache import CachedGeminiClient
+from services.clients import get_gemini_client, get_weather_client, warm_up_from_env
+from services.explanation_templates import FALLBACK_ERROR_CODES, template_explanation
 
-from services.report_generator import generate_report
+from services.report_generator import generate_report, format_report_as_text
 from services.file_logger import log_report_to_file
 from utils.app_error import AppErrorWrapper
 from utils.validation import sanitize_location_input
 from engine.heuristic_engine import run_heuristic_engine
+from engine.hourly_engine import run_hourly_assessment
+from engine.activity_profiles import run_profiles
+from engine.ensemble_engine import run_ensemble_assessment
+from engine.range_engine import run_range_assessment, RangeAssessment
+from engine.batch_engine import DECISIONS
 from engine.models import HeuristicInput
-from services.models import GeminiInput, CurrentWeatherForGemini, DayForecastForGemini, AssessmentReport
+from services.models import GeminiInput, GeminiOutput, CurrentWeatherForGemini, DayForecastForGemini
+from services.lean_weather_models import LeanForecastRange
+from services.route_planner import parse_track, assess_route
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -24,84 +34,60 @@ st.set_page_config(
     layout="wide"
 )
 
-# --- Helper Function for TXT Export (Story 5.2) ---
-def _format_report_as_text(report: AssessmentReport) -> str:
+# Optional (ALLOUT_WARM_UP=1): build the clients and open connections before the first assessment
+warm_up_from_env()
+
+# --- Helper Function for the Multi-day Heatmap ---
+HEATMAP_COLORS = {
+    "GO": "background-color: #c8e6c9",
+    "MAYBE": "background-color: #ffe0b2",
+    "NO-GO": "background-color: #ffcdd2",
+    "INSUFFICIENT DATA": "background-color: #eeeeee",
+    "NO DATA": "background-color: #eeeeee",
+}
+
+def _build_range_heatmap(forecast_range: LeanForecastRange, range_assessment: RangeAssessment):
     """
-    Formats an AssessmentReport as a human-readable text string.
-    
+    Builds a days x hours calendar of safety scores, colored by decision.
+
     Args:
-        report: The AssessmentReport to format
-        
+        forecast_range: The fetched multi-day forecast
+        range_assessment: The engine result for that forecast
+
+    Returns:
+        A pandas Styler suitable for st.dataframe
+    """
+    hour_labels = [f"{h:02d}" for h in range(range_assessment.hours_per_day)]
+    scores = pd.DataFrame(range_assessment.score_matrix().round(0), index=forecast_range.dates, columns=hour_labels)
+    styles = pd.DataFrame(
+        [[HEATMAP_COLORS[DECISIONS[code]] for code in row] for row in range_assessment.decision_matrix()],
+        index=scores.index,
+        columns=scores.columns
+    )
+    return scores.style.apply(lambda _: styles, axis=None).format("{:.0f}", na_rep="–")
+
+def _stream_advice(slot, gemini_client: CachedGeminiClient, gemini_input: GeminiInput) -> GeminiOutput:
+    """
+    Renders the AI advice into `slot` as Gemini streams it.
+
     Returns:
-        A formatted string suitable for TXT export
+        The complete, validated explanation
     """
-    lines = []
-    lines.append("=" * 70)
-    lines.append("ALLOUT - OUTDOOR SAFETY ASSESSMENT REPORT")
-    lines.append("=" * 70)
-    lines.append("")
-    
-    # Header Information
-    lines.append(f"Location: {report.location_name}")
-    lines.append(f"Assessment Date: {report.assessment_date}")
-    lines.append(f"Generated: {report.assessment_timestamp_utc}")
-    lines.append(f"Report ID: {report.report_id}")
-    lines.append("")
-    
-    # Weather Conditions
-    lines.append("-" * 70)
-    lines.append("CURRENT WEATHER CONDITIONS")
-    lines.append("-" * 70)
-    current = report.weather_data.current
-    lines.append(f"Temperature: {current.temp_c}°C (Feels like: {current.feelslike_c}°C)")
-    lines.append(f"Wind Speed: {current.wind_mph} mph")
-    lines.append(f"Precipitation: {current.precip_mm} mm")
-    lines.append(f"UV Index: {current.uv}")
-    lines.append("")
-    
-    # Forecast
-    forecast_day = report.weather_data.forecast.forecastday[0]
-    lines.append(f"Daily Chance of Rain: {forecast_day.day.daily_chance_of_rain}%")
-    lines.append(f"Temperature Range: {forecast_day.day.mintemp_c}°C - {forecast_day.day.maxtemp_c}°C")
-    lines.append("")
-    
-    # Heuristic Decision
-    lines.append("-" * 70)
-    lines.append("HEURISTIC ANALYSIS")
-    lines.append("-" * 70)
-    heuristic = report.heuristic_output
-    lines.append(f"Decision: {heuristic.decision}")
-    
-    if heuristic.weighted_score is not None:
-        lines.append(f"Safety Score: {heuristic.weighted_score:.1f}/100")
-    
-    if heuristic.hard_stop_reasons:
-        lines.append("\nHard Stop Warnings:")
-        for reason in heuristic.hard_stop_reasons:
-            lines.append(f"  ⚠️  {reason}")
-    
-    if heuristic.reasons:
-        lines.append("\nReasoning:")
-        for reason in heuristic.reasons:
-            lines.append(f"  • {reason}")
-    
-    if heuristic.notes:
-        lines.append(f"\nNotes: {heuristic.notes}")
-    
-    lines.append("")
-    
-    # AI Explanation
-    lines.append("-" * 70)
-    lines.append("AI ANALYSIS")
-    lines.append("-" * 70)
-    lines.append(report.ai_explanation.explanation)
-    lines.append("")
-    
-    lines.append("=" * 70)
-    lines.append("End of Report")
-    lines.append("=" * 70)
-    
-    return "\n".join(lines)
+    stream = gemini_client.stream_explanation(gemini_input)
+    explanation = ""
+    while True:
+        try:
+            chunk = next(stream)
+        except StopIteration as finished:
+            gemini_output = finished.value  # The stream returns the complete explanation
+            break
+        explanation += chunk
+        slot.info(f"**AI Safety Advice:** {explanation}▌")
+    with slot.container():
+        st.info(f"**AI Safety Advice:** {gemini_output.explanation}")
+        if gemini_output.source == "template":
+            st.caption("⏱️ The AI advisor took too long, so this guidance was built from the assessment itself.")
+    return gemini_output
 
 # --- UI Components ---
 st.title("AllOut Safety Assessment")
@@ -110,6 +96,10 @@ st.write("Your outdoor safety buddy. Get a clear Go/No-Go decision for your plan
 # --- Inputs ---
 location_input = st.text_input("Enter Location", "Coventry", key="location")
 assessment_date = st.date_input("Select Assessment Date", datetime.date.today())
+hourly_mode = st.checkbox("Assess every hour of the day", key="hourly_mode")
+if hourly_mode:
+    activity_hours = st.slider("Activity length (hours)", min_value=1, max_value=12, value=3, key="activity_hours")
+uncertainty_mode = st.checkbox("Show forecast uncertainty", key="uncertainty_mode")
 
 # --- Trigger ---
 if st.button("Assess Safety", type="primary"):
@@ -120,15 +110,32 @@ if st.button("Assess Safety", type="primary"):
         else:
             with st.spinner("Assessing conditions..."):
                 
-                # Always use real clients
-                weather_client = WeatherApiClient()
-                gemini_client = GeminiLLMClient()
+                # Real clients, built once per process and shared by every session
+                weather_client = get_weather_client()
+                gemini_client = get_gemini_client()
 
                 # 1. Get Weather Data
-                weather_data = weather_client.get_weather_data(
-                    location=sanitized_location,
-                    date=assessment_date.strftime("%Y-%m-%d")
-                )
+                hourly_assessment = None
+                if hourly_mode:
+                    hourly_data = weather_client.get_hourly_weather_data(
+                        location=sanitized_location,
+                        date=assessment_date.strftime("%Y-%m-%d")
+                    )
+                    weather_data = hourly_data.weather
+                    # Score all hours in one vectorized pass
+                    hourly_assessment = run_hourly_assessment(
+                        wind_mph=hourly_data.hourly.wind_mph,
+                        feelslike_c=hourly_data.hourly.feelslike_c,
+                        pop_percent=hourly_data.hourly.chance_of_rain,
+                        precip_rate_mmhr=hourly_data.hourly.precip_mm,
+                        uv_index=hourly_data.hourly.uv,
+                        activity_hours=activity_hours
+                    )
+                else:
+                    weather_data = weather_client.get_weather_data(
+                        location=sanitized_location,
+                        date=assessment_date.strftime("%Y-%m-%d")
+                    )
 
                 # 2. Run Heuristic Engine
                 heuristic_input = HeuristicInput(
@@ -144,8 +151,11 @@ if st.button("Assess Safety", type="primary"):
                     precip_rate_mmhr=weather_data.current.precip_mm
                 )
                 heuristic_result = run_heuristic_engine(heuristic_input)
+                ensemble_result = run_ensemble_assessment(heuristic_input) if uncertainty_mode else None
+                # Every activity profile from the same inputs, in one engine pass
+                profile_results = run_profiles(heuristic_input.to_record())
 
-                # 3. Get AI Explanation
+                # 3. Prepare the AI Explanation request (streamed in below the results)
                 gemini_input = GeminiInput(
                     location_name=weather_data.location.name,
                     current_weather=CurrentWeatherForGemini(
@@ -161,78 +171,6 @@ if st.button("Assess Safety", type="primary"):
                     ),
                     heuristic_output=heuristic_result
                 )
-                
-                # NEW: Graceful Fallback for 429 Rate Limit Errors
-                try:
-                    gemini_output = gemini_client.get_explanation(gemini_input)
-                except AppErrorWrapper as e:
-                    if e.error_code == "GEMINI_API_ERROR" and "429" in e.user_message:
-                        # Show friendly warning with error details
-                        st.warning("⚠️ **AI Service Temporarily Unavailable**")
-                        st.caption(f"🔍 Error Code: 429 - Rate Limit Exceeded | Error Type: {e.error_code}")
-                        st.info("💡 Showing general safety guidance based on conditions assessment...")
-                        
-                        # Context-aware fallback based on heuristic decision
-                        decision = heuristic_result.decision
-                        
-                        if decision == "GO":
-                            fallback_message = (
-                                "**Conditions appear favorable for outdoor activities.** "
-                                "The current weather metrics suggest safe conditions. However, always:\n\n"
-                                "✅ Check the latest weather updates before departing\n\n"
-                                "✅ Inform someone of your plans and expected return time\n\n"
-                                "✅ Pack essential safety gear (first aid, navigation, communication)\n\n"
-                                "✅ Bring layers and rain protection - weather can change quickly\n\n"
-                                "✅ Monitor conditions throughout your activity\n\n"
-                                "Stay alert to any weather changes and trust your judgment. "
-                                "If conditions deteriorate, don't hesitate to turn back."
-                            )
-                        elif decision == "MAYBE":
-                            fallback_message = (
-                                "**Conditions are borderline - proceed with caution.** "
-                                "Our analysis indicates marginal weather conditions. Consider these recommendations:\n\n"
-                                "⚠️ Re-check weather forecasts from multiple sources\n\n"
-                                "⚠️ Have a backup plan and clear turnaround criteria\n\n"
-                                "⚠️ Ensure all participants are experienced and properly equipped\n\n"
-                                "⚠️ Start early to allow time for changing conditions\n\n"
-                                "⚠️ Be prepared to cancel or turn back if conditions worsen\n\n"
-                                "Borderline conditions require extra vigilance. It's always better to postpone "
-                                "than to take unnecessary risks. Your safety is the priority."
-                            )
-                        else:  # NO-GO
-                            fallback_message = (
-                                "**Conditions are not favorable - outdoor activities not recommended.** "
-                                "Our safety analysis indicates significant risks. Here's why this matters:\n\n"
-                                "❌ Current weather metrics exceed safe thresholds\n\n"
-                                "❌ High risk of dangerous conditions during your planned activity\n\n"
-                                "❌ Increased chance of weather-related incidents\n\n"
-                                "**Recommended Actions:**\n\n"
-                                "• Postpone your outdoor plans to a safer day\n\n"
-                                "• Consider alternative indoor activities\n\n"
-                                "• If you must go out, take extreme precautions and stay in sheltered areas\n\n"
-                                "• Monitor weather updates for improvement\n\n"
-                                "Remember: Mountains, trails, and outdoor activities will always be there. "
-                                "Your safety cannot be compromised."
-                            )
-                        
-                        # Create fallback GeminiOutput
-                        from services.models import GeminiOutput
-                        gemini_output = GeminiOutput(explanation=fallback_message)
-                    else:
-                        # For other non-429 Gemini errors, re-raise
-                        raise e
-
-                # 4. Generate and Log Report
-                assessment_report = generate_report(
-                    location_name=weather_data.location.name,
-                    assessment_date=assessment_date.strftime("%Y-%m-%d"),
-                    weather_data=weather_data,
-                    heuristic_output=heuristic_result,
-                    ai_explanation=gemini_output,
-                )
-                
-                # Always log
-                log_report_to_file(assessment_report)
 
             # --- Results Display ---
             st.subheader(f"Safety Assessment for {weather_data.location.name} on {assessment_date.strftime('%Y-%m-%d')}")
@@ -252,7 +190,9 @@ if st.button("Assess Safety", type="primary"):
             elif heuristic_result.decision in ["INSUFFICIENT DATA", "NO DATA"]:
                 st.info(f"# ℹ️ {heuristic_result.decision}\n\n### {heuristic_result.notes}")
 
-            st.info(f"**AI Safety Advice:** {gemini_output.explanation}")
+            # The AI advice streams into this slot once the rest of the results are on screen
+            advice_slot = st.empty()
+            advice_slot.info("**AI Safety Advice:** _Preparing advice..._")
 
             # Score and Hard-Stops
             col1, col2 = st.columns([1, 2])
@@ -265,7 +205,37 @@ if st.button("Assess Safety", type="primary"):
                     st.write("**Hard-Stop Reasons:**")
                     for reason in heuristic_result.hard_stop_reasons:
                         st.markdown(f"- {reason}")
+
+            # Forecast Uncertainty
+            if ensemble_result is not None:
+                st.write(
+                    f"**Forecast uncertainty** ({ensemble_result.n_samples:,} simulated forecasts): "
+                    f"{ensemble_result.flip_probability:.0%} chance the decision differs from {heuristic_result.decision}"
+                )
+                prob_cols = st.columns(3)
+                for col, decision in zip(prob_cols, ("GO", "MAYBE", "NO-GO")):
+                    with col:
+                        st.metric(f"P({decision})", f"{ensemble_result.decision_probabilities[decision]:.0%}")
+                likely_hard_stops = {r: p for r, p in ensemble_result.hard_stop_probabilities.items() if p > 0}
+                if likely_hard_stops:
+                    st.write("**Hard-stop probabilities:**")
+                    for reason, probability in likely_hard_stops.items():
+                        st.markdown(f"- {probability:.0%}: {reason}")
             
+            # Activity Comparison
+            st.write("**By activity:**")
+            st.dataframe(
+                pd.DataFrame({
+                    "Activity": [name.title() for name in profile_results],
+                    "Decision": [output.decision for output in profile_results.values()],
+                    "Score": [output.weighted_score for output in profile_results.values()],
+                    "Hard Stops": [", ".join(output.hard_stop_reasons) for output in profile_results.values()],
+                }).style.apply(lambda row: [HEATMAP_COLORS[row["Decision"]]] * len(row), axis=1)
+                .format({"Score": "{:.0f}"}, na_rep="–"),
+                hide_index=True,
+                use_container_width=True
+            )
+
             st.divider()
 
             # Weather Grid
@@ -282,6 +252,66 @@ if st.button("Assess Safety", type="primary"):
             with cols[4]:
                 st.metric("Precipitation", f"{weather_data.current.precip_mm} mm")
 
+            # Hourly Breakdown
+            if hourly_assessment is not None:
+                st.divider()
+                st.subheader("🕒 Hourly Breakdown")
+                hours = hourly_data.hourly
+                best_window = hourly_assessment.best_window
+                if best_window is not None:
+                    st.success(
+                        f"Best {best_window.hours}-hour GO window: "
+                        f"{hours.time[best_window.start_index][-5:]} - "
+                        f"{int(hours.time[best_window.end_index - 1][-5:-3]) + 1:02d}:00 "
+                        f"(average score {best_window.mean_score:.0f}/100)"
+                    )
+                else:
+                    st.warning(f"No {hourly_assessment.activity_hours}-hour window with GO conditions on this day.")
+                st.dataframe(
+                    {
+                        "Hour": [t[-5:] for t in hours.time],
+                        "Decision": hourly_assessment.decisions,
+                        "Score": [round(float(v), 1) for v in hourly_assessment.hourly.weighted_scores],
+                        "Wind (mph)": hours.wind_mph.tolist(),
+                        "Feels Like (°C)": hours.feelslike_c.tolist(),
+                        "Rain Chance (%)": hours.chance_of_rain.tolist(),
+                        "Precip (mm)": hours.precip_mm.tolist(),
+                        "UV": hours.uv.tolist(),
+                    },
+                    hide_index=True,
+                    use_container_width=True
+                )
+
+            # 4. Stream the AI Explanation
+            # Graceful fallback to local advice when Gemini is rate limited or times out
+            try:
+                gemini_output = _stream_advice(advice_slot, gemini_client, gemini_input)
+            except AppErrorWrapper as e:
+                if e.error_code in FALLBACK_ERROR_CODES:
+                    gemini_output = template_explanation(gemini_input)
+                    with advice_slot.container():  # Replaces any partial advice
+                        # Show friendly warning with error details
+                        st.warning("⚠️ **AI Service Temporarily Unavailable**")
+                        st.caption(f"🔍 Error Type: {e.error_code} | {e.user_message}")
+                        st.info("💡 Showing general safety guidance based on conditions assessment...")
+                        st.info(f"**AI Safety Advice:** {gemini_output.explanation}")
+                else:
+                    # For other Gemini errors, drop any partial advice and re-raise
+                    advice_slot.empty()
+                    raise e
+
+            # 5. Generate and Log Report
+            assessment_report = generate_report(
+                location_name=weather_data.location.name,
+                assessment_date=assessment_date.strftime("%Y-%m-%d"),
+                weather_data=weather_data,
+                heuristic_output=heuristic_result,
+                ai_explanation=gemini_output,
+            )
+
+            # Always log
+            log_report_to_file(assessment_report)
+
             # === STORY 5.2: Export Report Buttons ===
             st.divider()
             st.subheader("📥 Export Report")
@@ -304,7 +334,7 @@ if st.button("Assess Safety", type="primary"):
             
             with col2:
                 # TXT Export
-                txt_data = _format_report_as_text(assessment_report)
+                txt_data = format_report_as_text(assessment_report)
                 txt_filename = f"AllOut_{weather_data.location.name.replace(' ', '_')}_{assessment_date.strftime('%Y-%m-%d')}.txt"
                 
                 st.download_button(
@@ -318,10 +348,149 @@ if st.button("Assess Safety", type="primary"):
 
     # FIX: Only catch NON-Gemini errors here (Weather API errors, validation errors, etc.)
     except AppErrorWrapper as e:
-        # Only show error UI if it's NOT a Gemini 429 (those are handled gracefully above)
-        if not (e.error_code == "GEMINI_API_ERROR" and "429" in str(e)):
+        # Gemini rate limits and timeouts are handled gracefully above
+        if e.error_code not in FALLBACK_ERROR_CODES:
             st.error(f"**{e.error_code}:** {e.user_message}")
     except Exception as e:
         print(f"--- DEBUG: An unexpected exception occurred in app.py: {e} ---")
         st.error(f"An unexpected error occurred: {e}")
 
+
+
+# === Multi-day Outlook: best-day search over up to 14 days ===
+st.divider()
+st.subheader("📅 Multi-day Outlook")
+st.write("Compare the coming days and find the best window for your activity.")
+
+range_cols = st.columns(3)
+with range_cols[0]:
+    range_days = st.slider("Days ahead", min_value=1, max_value=WeatherApiClient.MAX_FORECAST_DAYS, value=7, key="range_days")
+with range_cols[1]:
+    range_activity_hours = st.slider("Activity length (hours)", min_value=1, max_value=12, value=3, key="range_activity_hours")
+with range_cols[2]:
+    planning_hours = st.slider("Planning hours", min_value=0, max_value=24, value=(8, 20), key="range_planning_hours")
+# An empty selection plans the one hour it starts at; (24, 24) means the last hour of the day
+first_hour = min(planning_hours[0], 23)
+last_hour = max(planning_hours[1], first_hour + 1)
+
+if st.button("Find Best Days", key="find_best_days"):
+    try:
+        sanitized_location = sanitize_location_input(location_input)
+        if not sanitized_location:
+            st.error("Please enter a valid location.")
+        else:
+            with st.spinner("Scoring the coming days..."):
+                weather_client = get_weather_client()
+
+                # One request for the whole horizon, one engine pass for every hour
+                forecast_range = weather_client.get_forecast_range(location=sanitized_location, days=range_days)
+                range_assessment = run_range_assessment(
+                    dates=forecast_range.dates,
+                    wind_mph=forecast_range.hourly_matrix("wind_mph"),
+                    feelslike_c=forecast_range.hourly_matrix("feelslike_c"),
+                    pop_percent=forecast_range.hourly_matrix("chance_of_rain"),
+                    precip_rate_mmhr=forecast_range.hourly_matrix("precip_mm"),
+                    uv_index=forecast_range.hourly_matrix("uv"),
+                    activity_hours=range_activity_hours,
+                    first_hour=first_hour,
+                    last_hour=last_hour
+                )
+
+            st.subheader(f"Best days in {forecast_range.location.name}")
+            st.dataframe(
+                {
+                    "Rank": list(range(1, len(range_assessment.ranked) + 1)),
+                    "Date": [day.date for day in range_assessment.ranked],
+                    "Best GO Window": [
+                        f"{day.best_window.start_index:02d}:00 - {day.best_window.end_index:02d}:00" if day.best_window else "None"
+                        for day in range_assessment.ranked
+                    ],
+                    "Window Score": [
+                        round(day.best_window.mean_score, 1) if day.best_window else None
+                        for day in range_assessment.ranked
+                    ],
+                    "GO Hours": [day.go_hours for day in range_assessment.ranked],
+                    "Average Score": [
+                        round(day.mean_score, 1) if day.mean_score is not None else None
+                        for day in range_assessment.ranked
+                    ],
+                },
+                hide_index=True,
+                use_container_width=True
+            )
+
+            st.write("**Hourly safety calendar** (score per hour, colored by decision)")
+            st.dataframe(_build_range_heatmap(forecast_range, range_assessment), use_container_width=True)
+
+    except AppErrorWrapper as e:
+        st.error(f"**{e.error_code}:** {e.user_message}")
+    except Exception as e:
+        print(f"--- DEBUG: An unexpected exception occurred in app.py: {e} ---")
+        st.error(f"An unexpected error occurred: {e}")
+
+
+# === Route Mode: per-segment assessment along a GPX/GeoJSON track ===
+st.divider()
+st.subheader("🥾 Route Assessment")
+st.write("Upload a GPX or GeoJSON track to check every segment at the time you expect to reach it.")
+
+route_file = st.file_uploader("Route file", type=["gpx", "geojson", "json"], key="route_file")
+route_cols = st.columns(5)
+with route_cols[0]:
+    route_start_date = st.date_input("Start date", datetime.date.today(), key="route_start_date")
+with route_cols[1]:
+    route_start_time = st.time_input("Start time", datetime.time(9, 0), key="route_start_time")
+with route_cols[2]:
+    route_speed = st.number_input("Speed (km/h)", min_value=0.5, max_value=60.0, value=5.0, step=0.5, key="route_speed")
+with route_cols[3]:
+    route_spacing = st.number_input("Waypoint spacing (km)", min_value=0.5, max_value=50.0, value=2.0, step=0.5, key="route_spacing")
+with route_cols[4]:
+    route_grid = st.number_input("Grid size (°)", min_value=0.01, max_value=1.0, value=0.05, step=0.01, key="route_grid")
+
+if st.button("Assess Route", key="assess_route"):
+    try:
+        if route_file is None:
+            st.error("Please upload a GPX or GeoJSON route file.")
+        else:
+            with st.spinner("Fetching weather along the route..."):
+                route_points = parse_track(route_file.getvalue(), route_file.name)
+                route_assessment = assess_route(
+                    get_weather_client(),
+                    route_points,
+                    start_time=datetime.datetime.combine(route_start_date, route_start_time),
+                    speed_kmh=route_speed,
+                    spacing_km=route_spacing,
+                    grid_deg=route_grid
+                )
+
+            decision_display = {"GO": st.success, "MAYBE": st.warning, "NO-GO": st.error}
+            decision_display.get(route_assessment.overall_decision, st.info)(
+                f"**Overall route decision: {route_assessment.overall_decision}** "
+                f"({route_assessment.total_distance_km:.1f} km, {len(route_assessment.segments)} segments, "
+                f"{route_assessment.fetch_count} forecasts fetched)"
+            )
+
+            segments = pd.DataFrame({
+                "Km": [round(s.distance_km, 1) for s in route_assessment.segments],
+                "Arrival": [s.arrival_time for s in route_assessment.segments],
+                "Decision": [s.decision for s in route_assessment.segments],
+                "Score": [s.weighted_score for s in route_assessment.segments],
+                "Hard Stops": [", ".join(s.hard_stop_reasons) for s in route_assessment.segments],
+            })
+            st.write("**Decision strip** (one row per segment, in route order)")
+            st.dataframe(
+                segments.style.apply(lambda row: [HEATMAP_COLORS[row["Decision"]]] * len(row), axis=1)
+                .format({"Score": "{:.0f}"}, na_rep="–"),
+                hide_index=True,
+                use_container_width=True
+            )
+            st.map(pd.DataFrame({
+                "lat": [s.lat for s in route_assessment.segments],
+                "lon": [s.lon for s in route_assessment.segments],
+            }))
+
+    except AppErrorWrapper as e:
+        st.error(f"**{e.error_code}:** {e.user_message}")
+    except Exception as e:
+        print(f"--- DEBUG: An unexpected exception occurred in app.py: {e} ---")
+        st.error(f"An unexpected error occurred: {e}")
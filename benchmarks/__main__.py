@@ -0,0 +1,111 @@
+"""
+Command-line entry point for the benchmark suite.
+
+    python -m benchmarks list
+    python -m benchmarks run [--save benchmarks/baselines/baseline.json] [-k engine]
+    python -m benchmarks compare benchmarks/baselines/baseline.json [current.json] [--threshold 20]
+
+`compare` runs the suite itself when no current results file is given and
+exits with status 1 if any benchmark regressed beyond the threshold.
+"""
+import argparse
+import json
+import sys
+import warnings
+from pathlib import Path
+
+from .suite import BENCHMARKS, run_benchmarks, compare_results
+
+DEFAULT_BASELINE = Path(__file__).parent / "baselines" / "baseline.json"
+
+
+def _format_ns(ns) -> str:
+    if ns is None:
+        return "-"
+    for unit, scale in (("s", 1e9), ("ms", 1e6), ("us", 1e3)):
+        if ns >= scale:
+            return f"{ns / scale:.2f} {unit}"
+    return f"{ns:.0f} ns"
+
+
+def _select(pattern):
+    return [name for name in BENCHMARKS if not pattern or pattern in name]
+
+
+def _run(args) -> dict:
+    names = _select(args.k)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        return run_benchmarks(names, min_time=args.min_time, repeat=args.repeat)
+
+
+def cmd_list(args) -> int:
+    for name in BENCHMARKS:
+        print(name)
+    return 0
+
+
+def cmd_run(args) -> int:
+    results = _run(args)
+    width = max(len(name) for name in results["results"])
+    for name, stats in results["results"].items():
+        print(f"{name:<{width}}  {_format_ns(stats['ns_per_call']):>10}  (±{_format_ns(stats['stdev_ns'])})")
+    if args.save:
+        path = Path(args.save)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+        print(f"\nSaved results to {path}")
+    return 0
+
+
+def cmd_compare(args) -> int:
+    baseline = json.loads(Path(args.baseline).read_text(encoding="utf-8"))
+    if args.current:
+        current = json.loads(Path(args.current).read_text(encoding="utf-8"))
+    else:
+        current = _run(args)
+
+    rows = compare_results(baseline, current, args.threshold)
+    width = max(len(row["name"]) for row in rows)
+    print(f"{'benchmark':<{width}}  {'baseline':>10}  {'current':>10}  {'change':>8}")
+    for row in rows:
+        change = "-" if row["change_pct"] is None else f"{row['change_pct']:+.1f}%"
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(f"{row['name']:<{width}}  {_format_ns(row['baseline_ns']):>10}  {_format_ns(row['current_ns']):>10}  {change:>8}{flag}")
+
+    regressions = [row["name"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.threshold}%.")
+        return 1
+    print(f"\nNo regressions beyond {args.threshold}%.")
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="AllOut microbenchmark suite.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("list", help="List available benchmarks.").set_defaults(func=cmd_list)
+
+    for name, func, help_text in (
+        ("run", cmd_run, "Run the suite and optionally save the results."),
+        ("compare", cmd_compare, "Compare results against a baseline and flag regressions."),
+    ):
+        sub = subparsers.add_parser(name, help=help_text)
+        sub.set_defaults(func=func)
+        sub.add_argument("-k", help="Only run benchmarks whose name contains this string.")
+        sub.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds per repeat (default: 0.2).")
+        sub.add_argument("--repeat", type=int, default=5, help="Repeats per benchmark; the fastest is kept (default: 5).")
+
+    subparsers.choices["run"].add_argument("--save", help="Write results as JSON to this path.")
+    compare = subparsers.choices["compare"]
+    compare.add_argument("baseline", nargs="?", default=str(DEFAULT_BASELINE), help="Baseline results JSON.")
+    compare.add_argument("current", nargs="?", help="Current results JSON (runs the suite if omitted).")
+    compare.add_argument("--threshold", type=float, default=20.0, help="Allowed slowdown in percent (default: 20).")
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
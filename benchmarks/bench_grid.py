@@ -0,0 +1,122 @@
+"""
+Report: upstream fetches saved by grid mode in CachedWeatherApiClient.
+
+Replays query traffic through the real cached client (canonical location
+keys, grid snapping, cache) in front of a counting stand-in for WeatherAPI,
+and prints the distinct fetches needed without a grid and at several cell
+sizes. Two traffic sources:
+
+- logged: the locations and dates in data/assessment_log.json
+- hikers: coordinate queries scattered within a few kilometres of each
+  gazetteer place, as trailhead, village and postcode lookups are
+
+Run from the project root:
+    python -m benchmarks.bench_grid [--log data/assessment_log.json] [--radius-km 4] [--per-place 25]
+"""
+import argparse
+import json
+import math
+import random
+import sys
+import warnings
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from benchmarks.payloads import forecast_payload
+from services.forecast_cache import CachedWeatherApiClient
+from services.lean_weather_models import LeanWeatherApiResponse, Location
+from services.location_resolver import DEFAULT_GAZETTEER_FILE, Gazetteer, LocationResolver, normalize_query
+from services.weather_api import WeatherApiClient
+from utils.cache import TwoTierCache
+from utils.geo import format_coordinates
+
+CELL_SIZES = (0.02, 0.05, 0.1)
+DEFAULT_LOG = Path(__file__).parent.parent / "data" / "assessment_log.json"
+KM_PER_DEGREE = 111.32
+
+_RESPONSE = WeatherApiClient.__new__(WeatherApiClient)._parse_weather_data(forecast_payload())  # Parsing needs no API key
+
+Query = Tuple[str, Optional[str]]  # (location text, date)
+
+
+class CountingUpstream:
+    """Answers get_weather_data like WeatherAPI would, placing names via the gazetteer, and counts calls."""
+
+    def __init__(self, gazetteer: Gazetteer):
+        self.gazetteer = gazetteer
+        self.calls = 0
+
+    def get_weather_data(self, query: str, date: str = None) -> LeanWeatherApiResponse:
+        self.calls += 1
+        resolved = self.gazetteer.lookup(normalize_query(query))
+        coordinates = resolved.coordinates if resolved is not None else None
+        if coordinates is None and "," in query:
+            lat, lon = (float(part) for part in query.split(",")[:2])
+            coordinates = (lat, lon)
+        name = resolved.key.split("|")[0].title() if resolved is not None else query.strip().title()
+        lat, lon = coordinates or (None, None)
+        response = _RESPONSE.model_copy()
+        response.location = Location(name=name, region="", country="", lat=lat, lon=lon)
+        return response
+
+
+def logged_traffic(path: Path) -> List[Query]:
+    entries = json.loads(path.read_text(encoding="utf-8"))
+    return [(entry["location_name"], entry.get("assessment_date")) for entry in entries if entry.get("location_name")]
+
+
+def hiker_traffic(gazetteer_path: Path, per_place: int, radius_km: float, seed: int = 7) -> List[Query]:
+    """`per_place` coordinate queries uniformly spread within `radius_km` of each gazetteer place."""
+    rng = random.Random(seed)
+    gazetteer = Gazetteer.from_csv(gazetteer_path)
+    centres = {resolved.coordinates for resolved in gazetteer._index.values()}
+    queries = []
+    for lat, lon in sorted(centres):
+        for _ in range(per_place):
+            distance = radius_km * math.sqrt(rng.random())
+            bearing = rng.uniform(0, 2 * math.pi)
+            d_lat = distance * math.cos(bearing) / KM_PER_DEGREE
+            d_lon = distance * math.sin(bearing) / (KM_PER_DEGREE * math.cos(math.radians(lat)))
+            queries.append((format_coordinates(lat + d_lat, lon + d_lon), "2024-06-01"))
+    return queries
+
+
+def count_fetches(queries: List[Query], gazetteer: Gazetteer, grid_deg: Optional[float]) -> int:
+    upstream = CountingUpstream(gazetteer)
+    client = CachedWeatherApiClient(
+        upstream, TwoTierCache(memory_size=100_000), resolver=LocationResolver(gazetteer=gazetteer),
+        refresher=None, grid_deg=grid_deg
+    )
+    for location, date in queries:
+        client.get_weather_data(location, date)
+    return upstream.calls
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_grid", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--log", type=Path, default=DEFAULT_LOG, help="Assessment log to replay.")
+    parser.add_argument("--per-place", type=int, default=25, help="Synthetic queries per gazetteer place.")
+    parser.add_argument("--radius-km", type=float, default=4.0, help="Spread of synthetic queries around each place.")
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore", DeprecationWarning)
+    gazetteer = Gazetteer.from_csv(DEFAULT_GAZETTEER_FILE)
+    sources = [("hikers", hiker_traffic(DEFAULT_GAZETTEER_FILE, args.per_place, args.radius_km))]
+    if args.log.exists():
+        sources.insert(0, ("logged", logged_traffic(args.log)))
+
+    header = f"{'traffic':<8} {'queries':>8} {'no grid':>8}" + "".join(f" {f'{cell:g} deg':>16}" for cell in CELL_SIZES)
+    print(header)
+    for label, queries in sources:
+        baseline = count_fetches(queries, gazetteer, None)
+        cells = []
+        for cell in CELL_SIZES:
+            fetches = count_fetches(queries, gazetteer, cell)
+            cells.append(f" {fetches:>7} ({1 - fetches / baseline:>5.0%})" if baseline else f" {fetches:>16}")
+        print(f"{label:<8} {len(queries):>8} {baseline:>8}" + "".join(f"{cell:>17}" for cell in cells))
+    print("\nCells: fetches needed (reduction vs. no grid). 0.05 deg is about 5.5 km north-south.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
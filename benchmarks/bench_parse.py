@@ -0,0 +1,66 @@
+"""
+Benchmark: parse time and peak memory of WeatherAPI payload decoding.
+
+Compares the original path (`json.loads` of the whole body, then pydantic)
+with the lean paths (selective first-day decode, and full decode through
+`decode_payload`) on realistic 1-day and 14-day bodies.
+
+Run from the project root:
+    python -m benchmarks.bench_parse
+"""
+import json
+import timeit
+import tracemalloc
+import warnings
+
+from services.lean_decoder import decode_first_day, decode_payload, orjson
+from services.lean_weather_models import LeanForecastRange
+from services.weather_api import WeatherApiClient
+
+from .payloads import forecast_payload
+
+_client = WeatherApiClient.__new__(WeatherApiClient)  # Parsing needs no API key
+
+
+def _original_day(raw: bytes):
+    return _client._parse_weather_data(json.loads(raw))
+
+
+def _lean_day(raw: bytes):
+    return _client._parse_weather_data(decode_first_day(raw))
+
+
+def _original_range(raw: bytes):
+    return LeanForecastRange.from_payload(json.loads(raw))
+
+
+def _lean_range(raw: bytes):
+    return LeanForecastRange.from_payload(decode_payload(raw))
+
+
+def _measure(func, raw: bytes, number: int):
+    per_call = min(timeit.repeat(lambda: func(raw), number=number, repeat=5)) / number
+    tracemalloc.start()
+    func(raw)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return per_call, peak
+
+
+def main():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    print(f"Full decoder: {'orjson' if orjson is not None else 'json (install orjson for faster full decodes)'}\n")
+    print(f"{'case':<32} {'body':>9} {'time':>10} {'peak mem':>10}")
+    for days in (1, 14):
+        raw = json.dumps(forecast_payload(days=days)).encode("utf-8")
+        cases = [("range: json.loads + model", _original_range), ("range: decode_payload + model", _lean_range)]
+        if days == 1:  # Single-day assessments always request days=1
+            cases = [("day: json.loads + model", _original_day), ("day: lean first-day decode", _lean_day)] + cases
+        number = 200 if days == 1 else 20
+        for label, func in cases:
+            per_call, peak = _measure(func, raw, number)
+            print(f"{f'{days}d {label}':<32} {len(raw) / 1024:>7.0f}KB {per_call * 1e6:>8.0f}us {peak / 1024:>8.0f}KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Benchmark: compiled rule-table classifiers vs. the original hard-coded if-chains.
+
+Run from the project root:
+    python -m benchmarks.bench_rule_table
+"""
+import random
+import timeit
+
+from engine.rule_table import RuleTable
+
+
+# --- Reference: the if-chains the engine used before the rule table ---
+
+def _legacy_wind(wind_mph):
+    if wind_mph is None:
+        return None, None
+    if wind_mph >= 32:
+        return "Red", "Wind speed is at a dangerous level (>= 32 mph)."
+    if wind_mph >= 20:
+        return "Amber", None
+    return "Green", None
+
+
+def _legacy_thermal(feelslike_c):
+    if feelslike_c is None:
+        return None, None
+    if feelslike_c >= 41:
+        return "Red", "Extreme heat warning (feels like >= 41°C)."
+    if feelslike_c >= 27:
+        return "Amber", None
+    if feelslike_c <= -28:
+        return "Red", "Extreme cold warning (feels like <= -28°C)."
+    if feelslike_c <= -10:
+        return "Amber", None
+    return "Green", None
+
+
+def _legacy_precip(pop_percent, precip_rate_mmhr):
+    if pop_percent is None:
+        return None, None
+    if pop_percent <= 20:
+        return "Green", None
+    if precip_rate_mmhr is None:
+        return "Amber", None
+    if precip_rate_mmhr > 4.0:
+        return "Red", "Heavy precipitation rate (> 4.0 mm/hr)."
+    if precip_rate_mmhr >= 0.5:
+        return "Amber", None
+    return "Green", None
+
+
+def _legacy_uv(uv_index):
+    if uv_index is None:
+        return None, None
+    if uv_index >= 8:
+        return "Red", None
+    if uv_index >= 3:
+        return "Amber", None
+    return "Green", None
+
+
+def _samples(n=10_000, seed=42):
+    rng = random.Random(seed)
+    return [
+        (
+            round(rng.uniform(0, 45), 1),
+            round(rng.uniform(-35, 45), 1),
+            rng.randint(0, 100),
+            round(rng.uniform(0, 6), 1),
+            round(rng.uniform(0, 11), 1),
+        )
+        for _ in range(n)
+    ]
+
+
+def main(repeat: int = 5):
+    samples = _samples()
+    table = RuleTable.from_config()
+
+    def legacy():
+        for wind, feels, pop, rate, uv in samples:
+            _legacy_wind(wind)
+            _legacy_thermal(feels)
+            _legacy_precip(pop, rate)
+            _legacy_uv(uv)
+
+    def compiled():
+        for wind, feels, pop, rate, uv in samples:
+            table.categorize_wind(wind)
+            table.categorize_thermal_stress(feels)
+            table.categorize_precip(pop, rate)
+            table.categorize_uv(uv)
+
+    # Both implementations must agree before timing them
+    for wind, feels, pop, rate, uv in samples:
+        assert table.categorize_wind(wind) == _legacy_wind(wind)
+        assert table.categorize_thermal_stress(feels) == _legacy_thermal(feels)
+        assert table.categorize_precip(pop, rate) == _legacy_precip(pop, rate)
+        assert table.categorize_uv(uv) == _legacy_uv(uv)
+
+    # Alternate the two so a shift in machine load hits both alike
+    legacy_s = compiled_s = float("inf")
+    for _ in range(repeat):
+        legacy_s = min(legacy_s, timeit.timeit(legacy, number=1))
+        compiled_s = min(compiled_s, timeit.timeit(compiled, number=1))
+    per_call = 1e9 / len(samples)
+    print(f"if-chains:  {legacy_s * per_call:8.1f} ns per assessment")
+    print(f"rule table: {compiled_s * per_call:8.1f} ns per assessment")
+    print(f"ratio:      {legacy_s / compiled_s:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+Load driver: runs the real WeatherAPI and Gemini clients against the local
+stand-in server at a target request rate and reports throughput and latency
+percentiles.
+
+Arrivals are open-loop: request i is due at start + i / rps whether or not
+earlier requests have finished, and its latency is measured from when it was
+due. A saturated client therefore shows up as queueing in the percentiles
+instead of silently lowering the offered rate.
+
+Run from the project root, e.g.:
+    python -m benchmarks.load --target forecast --rps 100 --duration 10
+    python -m benchmarks.load --target gemini --rps 5 --latency-median 0.8 --throttle 20,3
+    python -m benchmarks.load --target gemini --rps 5 --latency-median 0.8 --budget-ms 1500
+
+With --budget-ms, Gemini calls go through CachedGeminiClient with that latency
+budget (every request a cache miss), and the report counts how many answers
+were the local template.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+import warnings
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+import numpy as np
+
+from .stand_in_server import StandInServer, lognormal_latency
+
+TARGETS = ("forecast", "bulk", "gemini")
+BULK_SIZE = 20  # Locations per bulk call
+
+
+def run_load(call: Callable[[int], Any], rps: float, duration: float, concurrency: int = 32) -> Dict[str, Any]:
+    """
+    Calls `call(i)` for i = 0 .. rps * duration - 1 at `rps` per second on up
+    to `concurrency` threads. Errors are counted by their `error_code` (or
+    exception type); latencies are those of successful calls.
+    """
+    if rps <= 0 or duration <= 0:
+        raise ValueError("rps and duration must be positive.")
+    total = max(1, int(rps * duration))
+    latencies, errors = [], Counter()
+    lock = threading.Lock()
+
+    def timed(i: int, due: float):
+        try:
+            call(i)
+        except Exception as e:
+            with lock:
+                errors[getattr(e, "error_code", type(e).__name__)] += 1
+        else:
+            with lock:
+                latencies.append(time.perf_counter() - due)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for i in range(total):
+            due = start + i / rps
+            pause = due - time.perf_counter()
+            if pause > 0:
+                time.sleep(pause)
+            pool.submit(timed, i, due)
+    elapsed = time.perf_counter() - start
+
+    report = {
+        "offered_rps": rps,
+        "requests": total,
+        "succeeded": len(latencies),
+        "errors": dict(errors),
+        "elapsed_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed,
+    }
+    if latencies:
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+        report.update(p50_ms=p50, p95_ms=p95, p99_ms=p99, max_ms=max(latencies) * 1000)
+    return report
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    lines = [
+        f"requests     {report['requests']} offered at {report['offered_rps']:g}/s over {report['elapsed_s']:.1f}s",
+        f"succeeded    {report['succeeded']} ({report['throughput_rps']:.1f}/s)",
+        f"errors       {', '.join(f'{code}: {count}' for code, count in sorted(report['errors'].items())) or 'none'}",
+    ]
+    if "p50_ms" in report:
+        lines.append(
+            f"latency      p50 {report['p50_ms']:.1f} ms   p95 {report['p95_ms']:.1f} ms   "
+            f"p99 {report['p99_ms']:.1f} ms   max {report['max_ms']:.1f} ms"
+        )
+    return "\n".join(lines)
+
+
+def sample_gemini_input():
+    """A typical explanation request."""
+    from engine.models import HeuristicOutput
+    from services.models import GeminiInput, CurrentWeatherForGemini, DayForecastForGemini
+
+    return GeminiInput(
+        location_name="Coventry",
+        current_weather=CurrentWeatherForGemini(temp_c=18.0, feelslike_c=17.0, wind_mph=9.0, precip_mm=0.0, uv=4.0),
+        day_forecast=DayForecastForGemini(daily_chance_of_rain=20),
+        heuristic_output=HeuristicOutput(decision="GO", weighted_score=82.0, notes="Good conditions.", reasons=[]),
+    )
+
+
+def build_call(
+    target: str, server: StandInServer, quota, concurrency: int = 32, budget: Optional[float] = None
+) -> Callable[[int], Any]:
+    """
+    A callable making one `target` request through the real client, pointed at
+    `server`. A `budget` (seconds) puts Gemini calls behind CachedGeminiClient,
+    with a distinct location per call so that none is a cache hit.
+    """
+    if target == "gemini":
+        os.environ["GEMINI_API_KEY"] = "stand-in"
+        os.environ["ALLOUT_GEMINI_ENDPOINT"] = server.gemini_endpoint
+        from services.gemini_llm import GeminiLLMClient
+
+        client = GeminiLLMClient(quota=quota)
+        gemini_input = sample_gemini_input()
+        if budget is None:
+            return lambda i: client.get_explanation(gemini_input)
+
+        from services.explanation_cache import CachedGeminiClient
+        from utils.cache import TwoTierCache
+        from utils.single_flight import SingleFlight
+
+        cached = CachedGeminiClient(client, TwoTierCache(memory_size=100_000), SingleFlight(), budget=budget)
+        return lambda i: cached.get_explanation(gemini_input.model_copy(update={"location_name": f"Town {i}"}))
+
+    os.environ["WEATHERAPI_KEY"] = "stand-in"
+    from services.weather_api import WeatherApiClient
+
+    client = WeatherApiClient(pool_size=concurrency, quota=quota)  # A smaller pool churns connections
+    client.BASE_URL = server.base_url
+    if target == "bulk":
+        return lambda i: client.get_weather_data_bulk([f"Town {i}-{j}" for j in range(BULK_SIZE)])
+    return lambda i: client.get_weather_data(f"Town {i % 50}")
+
+
+def _quota(kind: str):
+    from services.quota import GEMINI_BUCKET, WEATHERAPI_BUCKET, default_buckets
+    from utils.token_bucket import BucketConfig, QuotaManager
+
+    if kind == "default":
+        return QuotaManager(default_buckets())  # The production limits, private to this run
+    unlimited = BucketConfig(rate=1e9, capacity=1e9)
+    return QuotaManager({WEATHERAPI_BUCKET: unlimited, GEMINI_BUCKET: unlimited})
+
+
+def _throttle(value: str):
+    period, burst = (float(part) for part in value.split(","))
+    return period, burst
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.load", description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", choices=TARGETS, default="forecast")
+    parser.add_argument("--rps", type=float, default=50.0, help="Offered requests per second (default: 50).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds of load (default: 10).")
+    parser.add_argument("--concurrency", type=int, default=32, help="Client threads (default: 32).")
+    parser.add_argument("--latency-median", type=float, default=0.05, help="Median server latency in seconds.")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Log-normal spread of server latency.")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of responses that are 503s.")
+    parser.add_argument("--throttle", type=_throttle, help="PERIOD,BURST: 429s for BURST seconds of every PERIOD.")
+    parser.add_argument("--quota", choices=("unlimited", "default"), default="unlimited",
+                        help="Client-side request budget: none, or the production limits.")
+    parser.add_argument("--budget-ms", type=float, help="Gemini latency budget; past it, the template answers.")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    budget = args.budget_ms / 1000 if args.budget_ms else None
+
+    warnings.simplefilter("ignore")  # Deprecation noise from pydantic and the Gemini SDK
+    latency = lognormal_latency(args.latency_median, args.latency_sigma) if args.latency_median > 0 else 0.0
+    with StandInServer(latency=latency, error_rate=args.error_rate, throttle=args.throttle, seed=args.seed) as server:
+        call = build_call(args.target, server, _quota(args.quota), args.concurrency, budget)
+        sources = Counter()
+        if args.target == "gemini":
+            explain = call
+            call = lambda i: sources.update([explain(i).source])
+        print(f"Target: {args.target} via {server.gemini_endpoint}\n")
+        print(format_report(run_load(call, args.rps, args.duration, args.concurrency)))
+        if sources:
+            print(f"answers      {', '.join(f'{source}: {count}' for source, count in sorted(sources.items()))}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Realistic WeatherAPI `forecast.json` payloads for offline benchmarks.
+
+Shapes follow the live API: every forecast day carries a `day` summary,
+`astro` data and 24 hourly objects with their full set of ~30 fields.
+"""
+import random
+from datetime import date, timedelta
+from typing import Any, Dict
+
+CONDITION = {"text": "Partly cloudy", "icon": "//cdn.weatherapi.com/weather/64x64/day/116.png", "code": 1003}
+
+
+def _hour(rng: random.Random, day: date, hour: int) -> Dict[str, Any]:
+    temp_c = round(rng.uniform(2, 28), 1)
+    wind_mph = round(rng.uniform(0, 30), 1)
+    precip_mm = round(max(0.0, rng.gauss(0.2, 0.8)), 2)
+    return {
+        "time_epoch": 1700000000 + hour * 3600,
+        "time": f"{day.isoformat()} {hour:02d}:00",
+        "temp_c": temp_c,
+        "temp_f": round(temp_c * 9 / 5 + 32, 1),
+        "is_day": int(6 <= hour < 20),
+        "condition": dict(CONDITION),
+        "wind_mph": wind_mph,
+        "wind_kph": round(wind_mph * 1.609, 1),
+        "wind_degree": rng.randint(0, 359),
+        "wind_dir": rng.choice(["N", "NE", "E", "SE", "S", "SW", "W", "NW"]),
+        "pressure_mb": rng.randint(990, 1030),
+        "pressure_in": round(rng.uniform(29.2, 30.4), 2),
+        "precip_mm": precip_mm,
+        "precip_in": round(precip_mm / 25.4, 2),
+        "snow_cm": 0.0,
+        "humidity": rng.randint(40, 100),
+        "cloud": rng.randint(0, 100),
+        "feelslike_c": round(temp_c - rng.uniform(0, 4), 1),
+        "feelslike_f": round(temp_c * 9 / 5 + 30, 1),
+        "windchill_c": round(temp_c - rng.uniform(0, 4), 1),
+        "windchill_f": round(temp_c * 9 / 5 + 30, 1),
+        "heatindex_c": temp_c,
+        "heatindex_f": round(temp_c * 9 / 5 + 32, 1),
+        "dewpoint_c": round(temp_c - rng.uniform(1, 8), 1),
+        "dewpoint_f": round(temp_c * 9 / 5 + 25, 1),
+        "will_it_rain": int(precip_mm > 0.1),
+        "chance_of_rain": rng.randint(0, 100),
+        "will_it_snow": 0,
+        "chance_of_snow": 0,
+        "vis_km": 10.0,
+        "vis_miles": 6.0,
+        "gust_mph": round(wind_mph * 1.4, 1),
+        "gust_kph": round(wind_mph * 2.25, 1),
+        "uv": round(rng.uniform(0, 9), 1) if 6 <= hour < 20 else 0.0,
+    }
+
+
+def _forecast_day(rng: random.Random, day: date) -> Dict[str, Any]:
+    hours = [_hour(rng, day, h) for h in range(24)]
+    temps = [h["temp_c"] for h in hours]
+    return {
+        "date": day.isoformat(),
+        "date_epoch": 1700000000,
+        "day": {
+            "maxtemp_c": max(temps),
+            "maxtemp_f": round(max(temps) * 9 / 5 + 32, 1),
+            "mintemp_c": min(temps),
+            "mintemp_f": round(min(temps) * 9 / 5 + 32, 1),
+            "avgtemp_c": round(sum(temps) / 24, 1),
+            "avgtemp_f": round(sum(temps) / 24 * 9 / 5 + 32, 1),
+            "maxwind_mph": max(h["wind_mph"] for h in hours),
+            "maxwind_kph": max(h["wind_kph"] for h in hours),
+            "totalprecip_mm": round(sum(h["precip_mm"] for h in hours), 2),
+            "totalprecip_in": round(sum(h["precip_in"] for h in hours), 2),
+            "totalsnow_cm": 0.0,
+            "avgvis_km": 10.0,
+            "avgvis_miles": 6.0,
+            "avghumidity": 75,
+            "daily_will_it_rain": 1,
+            "daily_chance_of_rain": max(h["chance_of_rain"] for h in hours),
+            "daily_will_it_snow": 0,
+            "daily_chance_of_snow": 0,
+            "condition": dict(CONDITION),
+            "uv": max(h["uv"] for h in hours),
+        },
+        "astro": {
+            "sunrise": "07:12 AM",
+            "sunset": "04:31 PM",
+            "moonrise": "11:02 PM",
+            "moonset": "12:44 PM",
+            "moon_phase": "Waning Gibbous",
+            "moon_illumination": 78,
+            "is_moon_up": 0,
+            "is_sun_up": 0,
+        },
+        "hour": hours,
+    }
+
+
+def forecast_payload(days: int = 1, seed: int = 7, start: date = date(2024, 6, 1)) -> Dict[str, Any]:
+    """Builds a deterministic `forecast.json` payload covering `days` days."""
+    rng = random.Random(seed)
+    return {
+        "location": {
+            "name": "Coventry",
+            "region": "West Midlands",
+            "country": "United Kingdom",
+            "lat": 52.42,
+            "lon": -1.5,
+            "tz_id": "Europe/London",
+            "localtime_epoch": 1700000000,
+            "localtime": f"{start.isoformat()} 09:00",
+        },
+        "forecast": {"forecastday": [_forecast_day(rng, start + timedelta(days=i)) for i in range(days)]},
+    }
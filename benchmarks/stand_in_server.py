@@ -0,0 +1,261 @@
+"""
+Local stand-in for the WeatherAPI and Gemini endpoints the app calls.
+
+Serves realistic payloads over HTTP/1.1 with keep-alive on 127.0.0.1, so
+client benchmarks and load tests exercise connection handling, timeouts and
+parsing without touching the real APIs or needing keys:
+
+- WeatherAPI `forecast.json`: single GETs and bulk POSTs (q=bulk), with bodies
+  from `payloads.forecast_payload`.
+- Gemini `models/{model}:generateContent`, in the REST shape the SDK parses
+  (point it here with ALLOUT_GEMINI_ENDPOINT=`gemini_endpoint`), and
+  `:streamGenerateContent`, which sends the explanation in chunks spread over
+  the response latency.
+
+Faults are configurable per server: a latency distribution, a rate of 503
+errors, and periodic bursts of 429s carrying a Retry-After header.
+"""
+import json
+import math
+import random
+import threading
+import time
+from datetime import date
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple, Union
+from urllib.parse import urlparse, parse_qs
+
+from .payloads import forecast_payload
+
+Latency = Union[float, Callable[[random.Random], float]]
+
+GEMINI_EXPLANATION = (
+    "**Weather Summary:** Mild temperatures and light winds make conditions suitable, "
+    "with only a small chance of showers later in the day.\n\n"
+    "**Practical Recommendations:**\n"
+    "1. **Clothing:** Wear breathable layers and pack a light waterproof jacket.\n"
+    "2. **Safety Tip:** Tell someone your route and expected return time.\n"
+    "3. **Activity Tip:** Start early to finish before the afternoon cloud builds."
+)
+
+
+def lognormal_latency(median: float, sigma: float = 0.5) -> Callable[[random.Random], float]:
+    """Right-skewed latency around `median` seconds, like real API response times."""
+    return lambda rng: rng.lognormvariate(math.log(median), sigma)
+
+
+def uniform_latency(low: float, high: float) -> Callable[[random.Random], float]:
+    return lambda rng: rng.uniform(low, high)
+
+
+@lru_cache(maxsize=64)
+def _encoded_payload(days: int, dt: str) -> bytes:
+    start = date.fromisoformat(dt) if dt else date(2024, 6, 1)
+    return json.dumps(forecast_payload(days=days, start=start)).encode("utf-8")
+
+
+@lru_cache(maxsize=1)
+def _gemini_payload() -> bytes:
+    return json.dumps({
+        "candidates": [{
+            "content": {"parts": [{"text": GEMINI_EXPLANATION}], "role": "model"},
+            "finishReason": "STOP",
+            "index": 0,
+        }],
+        "usageMetadata": {"promptTokenCount": 230, "candidatesTokenCount": 80, "totalTokenCount": 310},
+    }).encode("utf-8")
+
+
+STREAM_CHUNKS = 8
+FIRST_CHUNK_SHARE = 0.25  # Share of a streamed response's latency before its first chunk
+
+
+@lru_cache(maxsize=1)
+def _gemini_stream_parts() -> Tuple[bytes, ...]:
+    """The explanation as streamed response objects, the last carrying the finish reason."""
+    words = GEMINI_EXPLANATION.split(" ")
+    size = math.ceil(len(words) / STREAM_CHUNKS)
+    texts = [" ".join(words[i:i + size]) + " " for i in range(0, len(words), size)]
+    texts[-1] = texts[-1].rstrip()
+    parts = []
+    for i, text in enumerate(texts):
+        candidate = {"content": {"parts": [{"text": text}], "role": "model"}, "index": 0}
+        part = {"candidates": [candidate]}
+        if i == len(texts) - 1:
+            candidate["finishReason"] = "STOP"
+            part["usageMetadata"] = {"promptTokenCount": 230, "candidatesTokenCount": 80, "totalTokenCount": 310}
+        parts.append(json.dumps(part).encode("utf-8"))
+    return tuple(parts)
+
+
+_NOT_FOUND = b'{"error": {"code": 1005, "message": "API URL is invalid."}}'
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep connections open between requests
+    disable_nagle_algorithm = True  # Headers and body go out in separate writes
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path != "/v1/forecast.json":
+            self._send(404, _NOT_FOUND)
+            return
+        if self._inject_fault():
+            return
+        query = parse_qs(url.query)
+        days = int(query.get("days", ["1"])[0])
+        self._send(200, _encoded_payload(days, query.get("dt", [""])[0]))
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        if url.path.startswith("/v1beta/models/") and url.path.endswith(":generateContent"):
+            if not self._inject_fault():
+                self._send(200, _gemini_payload())
+            return
+        if url.path.startswith("/v1beta/models/") and url.path.endswith(":streamGenerateContent"):
+            if not self._inject_fault(FIRST_CHUNK_SHARE):
+                self._send_stream(_gemini_stream_parts())
+            return
+        query = parse_qs(url.query)
+        if url.path != "/v1/forecast.json" or query.get("q") != ["bulk"]:
+            self._send(404, _NOT_FOUND)
+            return
+        if self._inject_fault():
+            return
+        payload = json.loads(_encoded_payload(int(query.get("days", ["1"])[0]), query.get("dt", [""])[0]))
+        items = [{"query": dict(payload, q=item["q"], custom_id=item.get("custom_id"))}
+                 for item in json.loads(body)["locations"]]
+        self._send(200, json.dumps({"bulk": items}).encode("utf-8"))
+
+    def _inject_fault(self, share: float = 1.0) -> bool:
+        """
+        Waits out `share` of the simulated latency and sends a fault response if
+        one is due; True if it did. The rest of the latency is left in
+        `remaining_latency` for a streamed response to spread over its chunks.
+        """
+        delay, status, retry_after = self.server.draw()
+        self.remaining_latency = delay * (1 - share)
+        if delay:
+            time.sleep(delay * share)  # Simulated upstream processing time
+        if status == 429:
+            self._send(429, b'{"error": {"code": 429, "message": "Too many requests."}}', {"Retry-After": str(retry_after)})
+        elif status == 503:
+            self._send(503, b'{"error": {"code": 503, "message": "Service unavailable."}}')
+        return status is not None
+
+    def _send(self, status: int, body: bytes, headers: Optional[dict] = None):
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_stream(self, parts: Tuple[bytes, ...]):
+        """Sends `parts` as a JSON array with chunked transfer encoding, pausing between parts."""
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        pause = self.remaining_latency / max(1, len(parts) - 1)
+        for i, part in enumerate(parts):
+            if i and pause:
+                time.sleep(pause)
+            self._write_chunk((b"[" if i == 0 else b",") + part)
+        self._write_chunk(b"]")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _write_chunk(self, data: bytes):
+        self.wfile.write(b"%X\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+
+class _StandInHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency: Latency, error_rate: float, throttle: Optional[Tuple[float, float]], seed: int):
+        super().__init__(address, _StandInHandler)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle = throttle
+        self.started_at = time.monotonic()
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+
+    def draw(self) -> Tuple[float, Optional[int], int]:
+        """(delay seconds, fault status or None, Retry-After seconds) for the next response."""
+        with self._rng_lock:
+            delay = self.latency(self._rng) if callable(self.latency) else self.latency
+            failed = self.error_rate and self._rng.random() < self.error_rate
+        if self.throttle:
+            period, burst = self.throttle
+            into_period = (time.monotonic() - self.started_at) % period
+            if into_period < burst:
+                return delay, 429, max(1, math.ceil(burst - into_period))
+        return delay, 503 if failed else None, 0
+
+
+class StandInServer:
+    """
+    A threaded stand-in server on a free local port; use as a context manager or call start/stop.
+
+    `latency` is a fixed delay in seconds or a function drawing one from a
+    random.Random (see `lognormal_latency`). `error_rate` is the fraction of
+    requests answered 503. `throttle=(period, burst)` answers every request
+    with 429 during the first `burst` seconds of each `period`.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: Latency = 0.0,
+        error_rate: float = 0.0,
+        throttle: Optional[Tuple[float, float]] = None,
+        seed: int = 0,
+    ):
+        self.httpd = _StandInHTTPServer((host, port), latency, error_rate, throttle, seed)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """WeatherAPI base URL (use in place of WeatherApiClient.BASE_URL)."""
+        return f"{self.gemini_endpoint}/v1"
+
+    @property
+    def gemini_endpoint(self) -> str:
+        """Gemini API endpoint (set as ALLOUT_GEMINI_ENDPOINT)."""
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StandInServer":
+        self.httpd.started_at = time.monotonic()
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self) -> "StandInServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+_shared_servers = {}
+
+
+def shared_server(latency: float = 0.0) -> StandInServer:
+    """One fault-free server per fixed latency per process for benchmarks that need it; runs until exit."""
+    if latency not in _shared_servers:
+        _shared_servers[latency] = StandInServer(latency=latency).start()
+    return _shared_servers[latency]
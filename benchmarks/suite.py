@@ -0,0 +1,405 @@
+"""
+Offline microbenchmark suite for the engine, models and serialization.
+
+Each benchmark is a setup function registered with `@benchmark`; it returns
+the zero-argument callable to time. Results are plain JSON so they can be
+stored as baselines and compared later (see `python -m benchmarks --help`).
+"""
+import asyncio
+import copy
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import requests
+
+from engine.batch_engine import run_heuristic_engine_batch
+from engine.ensemble_engine import run_ensemble_assessment
+from engine.heuristic_engine import run_heuristic_engine, run_heuristic_engine_trusted
+from engine.models import HeuristicInput, HeuristicOutput, HeuristicRecord
+from services.lean_decoder import decode_first_day, decode_payload
+from services.lean_weather_models import LeanWeatherApiResponse, LeanForecastRange, Location
+from services.models import AssessmentReport, GeminiInput, GeminiOutput, CurrentWeatherForGemini, DayForecastForGemini
+from services.report_generator import generate_report, format_report_as_text
+from services.async_weather_api import AsyncWeatherApiClient
+from services.clients import ClientRegistry
+from services.explanation_cache import CachedGeminiClient
+from services.forecast_cache import CachedWeatherApiClient
+from services.gemini_llm import GeminiLLMClient
+from services.location_resolver import DEFAULT_GAZETTEER_FILE, Gazetteer, LocationResolver
+from services.quota import WEATHERAPI_BUCKET
+from services.weather_api import WeatherApiClient, build_session
+from utils.cache import TwoTierCache
+from utils.token_bucket import BucketConfig, QuotaManager
+
+from .payloads import forecast_payload
+from .stand_in_server import shared_server
+
+BENCHMARKS: Dict[str, Callable[[], Callable[[], Any]]] = {}
+
+
+def benchmark(name: str):
+    """Registers a setup function under `name`; the setup returns the callable to time."""
+    def register(setup: Callable[[], Callable[[], Any]]):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+# --- Shared fixtures ---
+
+INPUT_FIELDS = {
+    "temp_c": 18.0,
+    "feelslike_c": 17.2,
+    "wind_mph": 12.4,
+    "precip_mm": 0.3,
+    "uv_index": 4.0,
+    "daily_chance_of_rain": 35,
+    "heat_index_c": 17.2,
+    "wind_chill_c": 17.2,
+    "pop_percent": 35,
+    "precip_rate_mmhr": 0.3,
+}
+
+OUTPUT_FIELDS = {
+    "decision": "MAYBE",
+    "notes": "Conditions are marginal. Proceed with caution and be prepared for changes.",
+    "weighted_score": 67.5,
+    "hard_stop_reasons": [],
+    "reasons": [],
+}
+
+EXPLANATION = " ".join(["Conditions look manageable with light wind and a modest chance of rain."] * 12)
+
+
+def _weather_payload() -> Dict[str, Any]:
+    """A realistic 24-hour payload with 'current' built the way WeatherApiClient builds it."""
+    payload = forecast_payload(days=1)
+    first_hour = payload["forecast"]["forecastday"][0]["hour"][0]
+    payload["current"] = {key: first_hour[key] for key in ("temp_c", "feelslike_c", "wind_mph", "precip_mm", "uv")}
+    return payload
+
+
+def _report() -> AssessmentReport:
+    return generate_report(
+        location_name="Coventry",
+        assessment_date="2024-06-01",
+        weather_data=LeanWeatherApiResponse.model_validate(_weather_payload()),
+        heuristic_output=HeuristicOutput(**OUTPUT_FIELDS),
+        ai_explanation=GeminiOutput(explanation=EXPLANATION),
+    )
+
+
+# --- Benchmarks ---
+
+@benchmark("engine.run_heuristic_engine")
+def _bench_engine():
+    heuristic_input = HeuristicInput(**INPUT_FIELDS)
+    return lambda: run_heuristic_engine(heuristic_input)
+
+
+@benchmark("engine.per_call[validated]")
+def _bench_engine_validated_per_call():
+    # What a batch job pays per row today: validate the input, run, validate the output
+    return lambda: run_heuristic_engine(HeuristicInput(**INPUT_FIELDS))
+
+
+@benchmark("engine.per_call[trusted]")
+def _bench_engine_trusted_per_call():
+    fields = INPUT_FIELDS
+    return lambda: run_heuristic_engine_trusted(HeuristicRecord(
+        fields["wind_mph"], fields["heat_index_c"], fields["pop_percent"],
+        fields["precip_rate_mmhr"], fields["uv_index"]
+    ))
+
+
+@benchmark("engine.run_heuristic_engine_batch[10k]")
+def _bench_engine_batch():
+    rng = np.random.default_rng(0)
+    n = 10_000
+    columns = (
+        rng.uniform(0, 40, n), rng.uniform(-30, 45, n), rng.integers(0, 100, n).astype(float),
+        rng.uniform(0, 6, n), rng.uniform(0, 11, n),
+    )
+    return lambda: run_heuristic_engine_batch(*columns)
+
+
+@benchmark("engine.run_ensemble_assessment[10k]")
+def _bench_ensemble():
+    heuristic_input = HeuristicInput(**INPUT_FIELDS)
+    return lambda: run_ensemble_assessment(heuristic_input, n_samples=10_000, seed=0)
+
+
+@benchmark("models.HeuristicInput")
+def _bench_heuristic_input():
+    return lambda: HeuristicInput(**INPUT_FIELDS)
+
+
+@benchmark("models.HeuristicOutput")
+def _bench_heuristic_output():
+    return lambda: HeuristicOutput(**OUTPUT_FIELDS)
+
+
+@benchmark("models.AssessmentReport")
+def _bench_assessment_report():
+    weather_data = LeanWeatherApiResponse.model_validate(_weather_payload())
+    heuristic_output = HeuristicOutput(**OUTPUT_FIELDS)
+    ai_explanation = GeminiOutput(explanation=EXPLANATION)
+    return lambda: AssessmentReport(
+        location_name="Coventry",
+        assessment_date="2024-06-01",
+        weather_data=weather_data,
+        heuristic_output=heuristic_output,
+        ai_explanation=ai_explanation,
+    )
+
+
+@benchmark("parse.LeanWeatherApiResponse.parse_obj[24h]")
+def _bench_parse_obj():
+    payload = _weather_payload()
+    return lambda: LeanWeatherApiResponse.model_validate(payload)
+
+
+@benchmark("parse.WeatherApiClient._parse_weather_data[24h]")
+def _bench_client_parse():
+    payload = forecast_payload(days=1)
+    client = WeatherApiClient.__new__(WeatherApiClient)  # Parsing needs no API key
+    # _parse_weather_data adds 'current' to the payload, so time it on a fresh copy each call
+    return lambda: client._parse_weather_data(copy.copy(payload))
+
+
+@benchmark("parse.get_weather_data[1d bytes]")
+def _bench_lean_day_parse():
+    raw = json.dumps(forecast_payload(days=1)).encode("utf-8")
+    client = WeatherApiClient.__new__(WeatherApiClient)
+    return lambda: client._parse_weather_data(decode_first_day(raw))
+
+
+@benchmark("parse.LeanForecastRange[14d bytes]")
+def _bench_range_parse():
+    raw = json.dumps(forecast_payload(days=14)).encode("utf-8")
+    return lambda: LeanForecastRange.from_payload(decode_payload(raw))
+
+
+@benchmark("report.format_report_as_text")
+def _bench_format_text():
+    report = _report()
+    return lambda: format_report_as_text(report)
+
+
+@benchmark("report.model_dump_json")
+def _bench_model_dump_json():
+    report = _report()
+    return lambda: report.model_dump_json(indent=2)
+
+
+def _stand_in_client(session=None, latency: float = 0.0) -> WeatherApiClient:
+    """A client pointed at the local stand-in server; no API key needed."""
+    client = WeatherApiClient.__new__(WeatherApiClient)
+    client.api_key, client.BASE_URL = "bench", shared_server(latency).base_url
+    client.session, client.max_retries, client.backoff_base, client.timeout = session, 0, 0.0, 10
+    client.quota, client.priority = _UNLIMITED_QUOTA, "interactive"  # Measure the client, not the budget
+    return client
+
+
+_UNLIMITED_QUOTA = QuotaManager({WEATHERAPI_BUCKET: BucketConfig(rate=1e9, capacity=1e9)})
+
+
+@benchmark("quota.acquire[shared sqlite]")
+def _bench_quota_acquire():
+    path = Path(tempfile.mkdtemp()) / "quota.sqlite3"
+    quota = QuotaManager({WEATHERAPI_BUCKET: BucketConfig(rate=1e9, capacity=1e9)}, path)
+    return lambda: quota.acquire(WEATHERAPI_BUCKET)
+
+
+@benchmark("http.forecast[fresh connection]")
+def _bench_http_fresh_connection():
+    # The old client: module-level requests.get opens a new TCP connection per call
+    url = f"{shared_server().base_url}/forecast.json"
+    params = {"key": "bench", "q": "Coventry", "days": 1, "aqi": "no"}
+    return lambda: requests.get(url, params=params, timeout=10).json()
+
+
+@benchmark("http.forecast[pooled session]")
+def _bench_http_pooled_session():
+    client = _stand_in_client(build_session())
+    return lambda: client._fetch_forecast("Coventry")
+
+
+@benchmark("cache.get_weather_data[memory hit]")
+def _bench_cache_memory_hit():
+    client = CachedWeatherApiClient(_stand_in_client(build_session()), TwoTierCache(), resolver=LocationResolver())
+    client.get_weather_data("Coventry", "2024-06-01")
+    return lambda: client.get_weather_data("Coventry", "2024-06-01")
+
+
+@benchmark("cache.get_weather_data[disk hit]")
+def _bench_cache_disk_hit():
+    path = Path(tempfile.mkdtemp()) / "forecast.sqlite3"
+    client = CachedWeatherApiClient(
+        _stand_in_client(build_session()), TwoTierCache(memory_size=1, path=path), resolver=LocationResolver()
+    )
+    client.get_weather_data("Coventry", "2024-06-01")
+    client.get_weather_data("Coventry", "2024-06-02")
+    dates = itertools.cycle(["2024-06-01", "2024-06-02"])  # Alternate so memory (size 1) always misses
+    return lambda: client.get_weather_data("Coventry", next(dates))
+
+
+@benchmark("resolver.resolve[alias hit]")
+def _bench_resolver_alias_hit():
+    resolver = LocationResolver(gazetteer=Gazetteer.from_csv(DEFAULT_GAZETTEER_FILE))
+    resolver.learn("Coventry, UK", Location.model_validate(forecast_payload()["location"]))
+    return lambda: resolver.resolve("Coventry, UK")
+
+
+@benchmark("resolver.resolve[gazetteer hit]")
+def _bench_resolver_gazetteer_hit():
+    resolver = LocationResolver(gazetteer=Gazetteer.from_csv(DEFAULT_GAZETTEER_FILE))
+    return lambda: resolver.resolve("Leeds West Yorkshire")
+
+
+class _CannedGemini:
+    """Answers every explanation request at once, so only the cache is timed."""
+
+    def get_explanation(self, gemini_input: GeminiInput) -> GeminiOutput:
+        return GeminiOutput(explanation=EXPLANATION)
+
+
+def _gemini_input() -> GeminiInput:
+    return GeminiInput(
+        location_name="Coventry",
+        current_weather=CurrentWeatherForGemini(temp_c=18.0, feelslike_c=17.2, wind_mph=12.4, precip_mm=0.3, uv=4.0),
+        day_forecast=DayForecastForGemini(daily_chance_of_rain=35),
+        heuristic_output=HeuristicOutput(**OUTPUT_FIELDS),
+    )
+
+
+@benchmark("explain.get_explanation[memory hit]")
+def _bench_explanation_memory_hit():
+    client = CachedGeminiClient(_CannedGemini(), TwoTierCache())
+    gemini_input = _gemini_input()
+    client.get_explanation(gemini_input)
+    return lambda: client.get_explanation(gemini_input)
+
+
+@benchmark("explain.get_explanation[disk hit]")
+def _bench_explanation_disk_hit():
+    path = Path(tempfile.mkdtemp()) / "explanations.sqlite3"
+    client = CachedGeminiClient(_CannedGemini(), TwoTierCache(memory_size=1, path=path))
+    inputs = [_gemini_input(), _gemini_input().model_copy(update={"location_name": "Leeds"})]
+    for gemini_input in inputs:
+        client.get_explanation(gemini_input)
+    cycle = itertools.cycle(inputs)  # Alternate so memory (size 1) always misses
+    return lambda: client.get_explanation(next(cycle))
+
+
+def _build_app_clients():
+    """What app.py used to do on every click: build both clients (in-memory caches, no refresher)."""
+    os.environ.setdefault("WEATHERAPI_KEY", "bench")
+    os.environ.setdefault("GEMINI_API_KEY", "bench")
+    weather = CachedWeatherApiClient(
+        WeatherApiClient(quota=_UNLIMITED_QUOTA), TwoTierCache(), resolver=LocationResolver(), refresher=None
+    )
+    gemini = CachedGeminiClient(GeminiLLMClient(quota=_UNLIMITED_QUOTA), TwoTierCache())
+    return weather, gemini
+
+
+@benchmark("clients.per_click[construct]")
+def _bench_clients_construct():
+    return _build_app_clients
+
+
+@benchmark("clients.per_click[registry]")
+def _bench_clients_registry():
+    registry = ClientRegistry({"app": _build_app_clients})
+    registry.get("app")
+    return lambda: registry.get("app")
+
+
+COMPARE_LOCATIONS = [f"Town {i}" for i in range(20)]
+COMPARE_LATENCY = 0.02  # Seconds of simulated upstream time per request
+
+
+@benchmark("http.20_locations[sequential]")
+def _bench_locations_sequential():
+    client = _stand_in_client(build_session(), latency=COMPARE_LATENCY)
+    return lambda: [client.get_weather_data(location) for location in COMPARE_LOCATIONS]
+
+
+@benchmark("http.20_locations[bulk]")
+def _bench_locations_bulk():
+    client = _stand_in_client(build_session(), latency=COMPARE_LATENCY)
+    return lambda: client.get_weather_data_bulk(COMPARE_LOCATIONS)
+
+
+@benchmark("http.20_locations[gather_many]")
+def _bench_locations_gather_many():
+    async_client = AsyncWeatherApiClient(_stand_in_client(build_session(pool_size=20), latency=COMPARE_LATENCY))
+    return lambda: asyncio.run(async_client.gather_many(COMPARE_LOCATIONS))
+
+
+# --- Runner ---
+
+def _time(func: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, float]:
+    """Times `func`, autoranging the loop count so one repeat lasts at least `min_time` seconds."""
+    timer = timeit.Timer(func)
+    number, elapsed = timer.autorange()
+    if elapsed < min_time:
+        number = max(number, int(number * min_time / max(elapsed, 1e-9)))
+    runs = [t / number * 1e9 for t in timer.repeat(repeat=repeat, number=number)]
+    return {
+        "ns_per_call": min(runs),
+        "mean_ns": statistics.mean(runs),
+        "stdev_ns": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+        "loops": number,
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(names: Optional[Iterable[str]] = None, min_time: float = 0.2, repeat: int = 5) -> Dict[str, Any]:
+    """Runs the selected benchmarks (all by default) and returns a JSON-ready result document."""
+    selected = list(names) if names else list(BENCHMARKS)
+    unknown = [name for name in selected if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f"Unknown benchmarks: {', '.join(unknown)}")
+    return {
+        "meta": {
+            "created_utc": datetime.now(timezone.utc).isoformat(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "machine": platform.machine(),
+        },
+        "results": {name: _time(BENCHMARKS[name](), min_time, repeat) for name in selected},
+    }
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any], threshold_pct: float = 10.0) -> List[Dict[str, Any]]:
+    """
+    Compares two result documents on `ns_per_call`.
+
+    A benchmark regresses when it is more than `threshold_pct` percent slower than
+    the baseline. Benchmarks missing from either side are reported but never regress.
+    """
+    rows = []
+    base_results, new_results = baseline["results"], current["results"]
+    for name in sorted(set(base_results) | set(new_results)):
+        base = base_results.get(name, {}).get("ns_per_call")
+        new = new_results.get(name, {}).get("ns_per_call")
+        change_pct = (new - base) / base * 100 if base and new is not None else None
+        rows.append({
+            "name": name,
+            "baseline_ns": base,
+            "current_ns": new,
+            "change_pct": change_pct,
+            "regressed": change_pct is not None and change_pct > threshold_pct,
+        })
+    return rows
@@ -0,0 +1,224 @@
+"""
+Activity profiles evaluated in a single pass.
+
+Each profile is a set of rule-table overrides (weights and thresholds) on top
+of the current rule table. All profiles are compiled into stacked NumPy
+matrices, so one call scores every profile for every row at once; results
+match `run_heuristic_engine_batch` with the profile's own rule table.
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from .batch_engine import (
+    HeuristicBatchOutput, compile_rules, as_column, MISSING_CATEGORY,
+    GO, MAYBE, NO_GO, INSUFFICIENT_DATA, NO_DATA, DECISIONS,
+)
+from .models import HeuristicOutput, HeuristicRecord
+from .rule_table import RuleTable, get_rule_table, merge_config, CATEGORIES, AMBER, GREEN, METRICS
+
+# Rule-table overrides per activity; keys follow DEFAULT_RULE_CONFIG. Weights sum to 1.
+ACTIVITY_PROFILES: Dict[str, Dict[str, Any]] = {
+    "hiking": {},  # The generic rules in utils/constants.py
+    "cycling": {
+        "weights": {"wind": 0.40, "thermal": 0.25, "precip": 0.30, "uv": 0.05},
+        "wind": {"amber": 15, "red": 25},
+    },
+    "running": {
+        "weights": {"wind": 0.15, "thermal": 0.50, "precip": 0.30, "uv": 0.05},
+        "thermal": {"heat_amber": 24, "heat_red": 35},
+    },
+    "camping": {
+        "weights": {"wind": 0.30, "thermal": 0.30, "precip": 0.35, "uv": 0.05},
+        "wind": {"amber": 18, "red": 30},
+        "thermal": {"cold_amber": -5, "cold_red": -20},
+        "precip": {"rate_amber": 0.3, "rate_red": 3.0},
+    },
+    "watersports": {
+        "weights": {"wind": 0.35, "thermal": 0.20, "precip": 0.15, "uv": 0.30},
+        "wind": {"amber": 12, "red": 22},
+        "uv": {"amber": 3, "red": 6},
+    },
+}
+
+
+def register_profile(name: str, overrides: Dict[str, Any]):
+    """Adds or replaces an activity profile. Unknown rule keys raise ValueError."""
+    merge_config(get_rule_table().config, overrides)  # Validate the keys up front
+    ACTIVITY_PROFILES[name] = overrides
+    _profile_tables.cache_clear()
+    _compile_profiles.cache_clear()
+
+
+@lru_cache(maxsize=8)
+def _profile_tables(base: RuleTable, names: Tuple[str, ...]) -> Tuple[RuleTable, ...]:
+    return tuple(
+        RuleTable(merge_config(base.config, ACTIVITY_PROFILES[name]), source=f"{base.source}:{name}") for name in names
+    )
+
+
+def get_profile_rule_table(name: str, rule_table: Optional[RuleTable] = None) -> RuleTable:
+    """The rule table of one profile, for use with `run_heuristic_engine(..., rule_table=...)`."""
+    if name not in ACTIVITY_PROFILES:
+        raise KeyError(f"Unknown activity profile: '{name}'")
+    return _profile_tables(rule_table or get_rule_table(), (name,))[0]
+
+
+class _StackedBands:
+    """The same classifier of every profile, stacked: edges (P, k), codes and reason columns (P, k + 1)."""
+    __slots__ = ("edges", "codes", "reason_columns")
+
+    def __init__(self, bands):
+        self.edges = np.stack([b.edges for b in bands])
+        self.codes = np.stack([b.codes for b in bands])
+        self.reason_columns = np.stack([b.reason_columns for b in bands])
+
+    def classify(self, values: np.ndarray, missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(P, n) category codes and hard-stop columns, -1 where missing or no hard-stop."""
+        # Counting edges <= value per profile is searchsorted(side="right") on every row of edges
+        band = (values[None, :, None] >= self.edges[:, None, :]).sum(axis=2)
+        category = np.where(missing, MISSING_CATEGORY, np.take_along_axis(self.codes, band, axis=1))
+        reason = np.where(missing, -1, np.take_along_axis(self.reason_columns, band, axis=1))
+        return category, reason
+
+
+class _CompiledProfiles:
+    """Every profile's rule arrays stacked along a leading profile axis."""
+
+    def __init__(self, names: Tuple[str, ...], tables: Tuple[RuleTable, ...]):
+        compiled = [compile_rules(table) for table in tables]
+        self.names = names
+        self.hard_stop_reasons = tuple(c.hard_stop_reasons for c in compiled)
+        self.wind = _StackedBands([c.wind for c in compiled])
+        self.thermal = _StackedBands([c.thermal for c in compiled])
+        self.precip_rate = _StackedBands([c.precip_rate for c in compiled])
+        self.uv = _StackedBands([c.uv for c in compiled])
+        self.pop_ignore_rate = np.array([c.pop_ignore_rate for c in compiled])[:, None]
+        self.scores = np.stack([c.scores for c in compiled])
+        self.weights = np.array([[c.weights[m] for m in METRICS] for c in compiled])
+        self.go_threshold = np.array([c.go_threshold for c in compiled])[:, None]
+        self.maybe_threshold = np.array([c.maybe_threshold for c in compiled])[:, None]
+        self.min_metrics_for_decision = np.array([c.min_metrics_for_decision for c in compiled])[:, None]
+
+
+@lru_cache(maxsize=8)
+def _compile_profiles(base: RuleTable, names: Tuple[str, ...]) -> _CompiledProfiles:
+    return _CompiledProfiles(names, _profile_tables(base, names))
+
+
+class ProfileBatchOutput(BaseModel):
+    """Batch results for every profile: arrays are indexed [profile, row]."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    profiles: Tuple[str, ...]
+    decision_codes: np.ndarray   # int8, shape (P, n)
+    weighted_scores: np.ndarray  # float64, shape (P, n), NaN where NO DATA
+    hard_stop_mask: np.ndarray   # bool, shape (P, n, 4)
+    hard_stop_reasons: Tuple[Tuple[str, ...], ...]  # per profile, column labels of hard_stop_mask
+
+    def for_profile(self, name: str) -> HeuristicBatchOutput:
+        """The batch output of one profile."""
+        p = self.profiles.index(name)
+        return HeuristicBatchOutput(
+            decision_codes=self.decision_codes[p],
+            weighted_scores=self.weighted_scores[p],
+            hard_stop_mask=self.hard_stop_mask[p],
+            hard_stop_reasons=self.hard_stop_reasons[p]
+        )
+
+    def decisions(self, index: int = 0) -> Dict[str, str]:
+        """Decision of every profile for one row."""
+        return {name: DECISIONS[code] for name, code in zip(self.profiles, self.decision_codes[:, index])}
+
+    def to_outputs(self, index: int = 0) -> Dict[str, HeuristicOutput]:
+        """A `HeuristicOutput` per profile for one row."""
+        return {name: self.for_profile(name).to_output(index) for name in self.profiles}
+
+
+def run_profiles_batch(
+    wind_mph,
+    feelslike_c,
+    pop_percent,
+    precip_rate_mmhr,
+    uv_index,
+    profiles: Optional[Sequence[str]] = None,
+    rule_table: Optional[RuleTable] = None,
+) -> ProfileBatchOutput:
+    """
+    Scores columnar weather data for several activity profiles in one pass.
+
+    Takes the same columns as `run_heuristic_engine_batch`; `profiles` defaults
+    to every registered profile, in registry order.
+    """
+    names = tuple(profiles) if profiles is not None else tuple(ACTIVITY_PROFILES)
+    unknown = [name for name in names if name not in ACTIVITY_PROFILES]
+    if unknown:
+        raise KeyError(f"Unknown activity profiles: {', '.join(unknown)}")
+    rules = _compile_profiles(rule_table or get_rule_table(), names)
+
+    columns = [wind_mph, feelslike_c, pop_percent, precip_rate_mmhr, uv_index]
+    n = next((len(c) for c in columns if c is not None), 0)
+    wind, feelslike, pop, rate, uv = (as_column(c, n) for c in columns)
+    if not all(len(c) == n for c in (wind, feelslike, pop, rate, uv)):
+        raise ValueError("All batch input columns must have the same length.")
+    p = len(names)
+
+    # 1. Categorize every metric for every profile
+    wind_category, wind_reason = rules.wind.classify(wind, np.isnan(wind))
+    thermal_category, thermal_reason = rules.thermal.classify(feelslike, np.isnan(feelslike))
+    uv_category, _ = rules.uv.classify(uv, np.isnan(uv))
+
+    pop_missing = np.isnan(pop)
+    rate_applies = ~pop_missing & (pop > rules.pop_ignore_rate)
+    rate_category, precip_reason = rules.precip_rate.classify(rate, ~rate_applies | np.isnan(rate))
+    precip_category = np.select(
+        [np.broadcast_to(pop_missing, (p, n)), ~rate_applies, np.broadcast_to(np.isnan(rate), (p, n))],
+        [MISSING_CATEGORY, CATEGORIES.index(GREEN), CATEGORIES.index(AMBER)],
+        default=rate_category
+    )
+
+    hard_stop_mask = np.zeros((p, n, len(rules.hard_stop_reasons[0])), dtype=bool)
+    for reason in (wind_reason, thermal_reason, precip_reason):
+        profile_rows, rows = np.nonzero(reason >= 0)
+        hard_stop_mask[profile_rows, rows, reason[profile_rows, rows]] = True
+
+    # 2. Weighted score, summed in the same metric order as the scalar engine
+    total_score = np.zeros((p, n))
+    available = np.zeros((p, n), dtype=np.int8)
+    for column, category in enumerate((wind_category, thermal_category, precip_category, uv_category)):
+        present = category != MISSING_CATEGORY
+        score = np.take_along_axis(rules.scores, np.where(present, category, 0), axis=1)
+        total_score = total_score + np.where(present, score * rules.weights[:, column:column + 1], 0.0)
+        available += present
+
+    # 3. Final decision logic
+    decision_codes = np.select(
+        [
+            available == 0,
+            hard_stop_mask.any(axis=2),
+            available < rules.min_metrics_for_decision,
+            total_score >= rules.go_threshold,
+            total_score >= rules.maybe_threshold,
+        ],
+        [NO_DATA, NO_GO, INSUFFICIENT_DATA, GO, MAYBE],
+        default=NO_GO
+    ).astype(np.int8)
+
+    return ProfileBatchOutput(
+        profiles=names,
+        decision_codes=decision_codes,
+        weighted_scores=np.where(available == 0, np.nan, total_score),
+        hard_stop_mask=hard_stop_mask,
+        hard_stop_reasons=rules.hard_stop_reasons
+    )
+
+
+def run_profiles(record: HeuristicRecord, profiles: Optional[Sequence[str]] = None,
+                 rule_table: Optional[RuleTable] = None) -> Dict[str, HeuristicOutput]:
+    """Scores one set of conditions for every profile; see `HeuristicInput.to_record()`."""
+    return run_profiles_batch(
+        [record.wind_mph], [record.heat_index_c], [record.pop_percent],
+        [record.precip_rate_mmhr], [record.uv_index], profiles=profiles, rule_table=rule_table
+    ).to_outputs(0)
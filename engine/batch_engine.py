@@ -0,0 +1,203 @@
+"""
+Vectorized batch mode for the heuristic engine.
+
+Scores many assessments in a single NumPy pass over columnar inputs. The
+rules come from the same rule table as `run_heuristic_engine` and results
+match it exactly; use `to_outputs()` when per-row `HeuristicOutput` models
+are needed.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+
+from .models import HeuristicOutput
+from .rule_table import RuleTable, BandClassifier, get_rule_table, CATEGORIES, AMBER, GREEN
+
+# Decision codes returned by the batch engine, indexable into DECISIONS
+GO, MAYBE, NO_GO, INSUFFICIENT_DATA, NO_DATA = range(5)
+DECISIONS = ("GO", "MAYBE", "NO-GO", "INSUFFICIENT DATA", "NO DATA")
+
+DECISION_NOTES = {
+    "GO": "Conditions are favorable for your activity.",
+    "MAYBE": "Conditions are marginal. Proceed with caution and be prepared for changes.",
+    "NO-GO": "Conditions are unfavorable. It is not recommended to proceed.",
+    "HARD-STOP": "Assessment resulted in a NO-GO due to one or more hard-stop conditions.",
+    "INSUFFICIENT DATA": "Only one weather metric was available. The assessment may not be reliable.",
+    "NO DATA": "No weather metrics were available for assessment.",
+}
+
+# Category code for a missing metric; other codes index rule_table.CATEGORIES
+MISSING_CATEGORY = -1
+
+
+class HeuristicBatchOutput(BaseModel):
+    """Columnar output of the batch engine, one row per assessment."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    decision_codes: np.ndarray   # int8, index into DECISIONS
+    weighted_scores: np.ndarray  # float64, NaN where the decision is NO DATA
+    hard_stop_mask: np.ndarray   # bool, shape (n, len(hard_stop_reasons))
+    hard_stop_reasons: Tuple[str, ...]  # column labels of hard_stop_mask
+
+    def __len__(self) -> int:
+        return len(self.decision_codes)
+
+    @property
+    def decisions(self) -> List[str]:
+        """Decision strings for every row."""
+        return [DECISIONS[code] for code in self.decision_codes]
+
+    def to_output(self, index: int) -> HeuristicOutput:
+        """Builds the `HeuristicOutput` the scalar engine would return for one row."""
+        decision = DECISIONS[self.decision_codes[index]]
+        reasons = [r for r, hit in zip(self.hard_stop_reasons, self.hard_stop_mask[index]) if hit]
+        if decision == "NO DATA":
+            return HeuristicOutput(decision=decision, notes=DECISION_NOTES[decision], weighted_score=None, reasons=[], hard_stop_reasons=[])
+        if decision == "NO-GO" and reasons:
+            notes = DECISION_NOTES["HARD-STOP"]
+        else:
+            notes = DECISION_NOTES[decision]
+        return HeuristicOutput(
+            decision=decision,
+            notes=notes,
+            weighted_score=float(self.weighted_scores[index]),
+            reasons=[],
+            hard_stop_reasons=reasons
+        )
+
+    def to_outputs(self) -> List[HeuristicOutput]:
+        """Builds a `HeuristicOutput` for every row."""
+        return [self.to_output(i) for i in range(len(self))]
+
+
+class CompiledBands:
+    """NumPy form of a BandClassifier: edges, per-band category codes and hard-stop columns."""
+    __slots__ = ("edges", "codes", "reason_columns")
+
+    def __init__(self, classifier: BandClassifier, hard_stop_reasons: Tuple[str, ...]):
+        self.edges = np.array(classifier.edges)
+        self.codes = np.array([CATEGORIES.index(c) for c in classifier.categories], dtype=np.int8)
+        self.reason_columns = np.array(
+            [hard_stop_reasons.index(r) if r else -1 for r in classifier.reasons], dtype=np.int8
+        )
+
+    def bands(self, values: np.ndarray) -> np.ndarray:
+        return np.searchsorted(self.edges, values, side="right")
+
+
+class CompiledRules:
+    """Rule table arrays, built once per rule table version."""
+
+    def __init__(self, rules: RuleTable):
+        self.hard_stop_reasons = rules.hard_stop_reasons
+        self.wind = CompiledBands(rules.wind, self.hard_stop_reasons)
+        self.thermal = CompiledBands(rules.thermal, self.hard_stop_reasons)
+        self.precip_rate = CompiledBands(rules.precip_rate, self.hard_stop_reasons)
+        self.uv = CompiledBands(rules.uv, self.hard_stop_reasons)
+        self.pop_ignore_rate = rules.pop_ignore_rate
+        self.scores = np.array([rules.scores[c] for c in CATEGORIES])
+        self.weights = rules.weights
+        self.go_threshold = rules.go_threshold
+        self.maybe_threshold = rules.maybe_threshold
+        self.min_metrics_for_decision = rules.min_metrics_for_decision
+
+
+@lru_cache(maxsize=8)
+def compile_rules(rules: RuleTable) -> CompiledRules:
+    """The NumPy arrays of `rules`, cached per table; shared with the profile engine."""
+    return CompiledRules(rules)
+
+
+def as_column(values, n: int) -> np.ndarray:
+    """Converts a column to float64, mapping None to NaN (missing)."""
+    if values is None:
+        return np.full(n, np.nan)
+    if isinstance(values, np.ndarray):
+        return values.astype(np.float64, copy=False)
+    return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+
+
+def _classify(bands: CompiledBands, values: np.ndarray, missing: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Returns (category codes, hard-stop columns) with -1 where missing or no hard-stop."""
+    band = bands.bands(values)
+    category = np.where(missing, MISSING_CATEGORY, bands.codes[band])
+    reason = np.where(missing, -1, bands.reason_columns[band])
+    return category, reason
+
+
+def run_heuristic_engine_batch(
+    wind_mph,
+    feelslike_c,
+    pop_percent,
+    precip_rate_mmhr,
+    uv_index,
+    rule_table: Optional[RuleTable] = None,
+) -> HeuristicBatchOutput:
+    """
+    Runs the heuristic safety assessment over columnar weather data.
+
+    Each argument is a sequence (or NumPy array) of equal length; None or NaN
+    marks a missing metric. `feelslike_c` plays the role of `heat_index_c`
+    in the scalar engine. Results match `run_heuristic_engine` row for row.
+    """
+    rules = compile_rules(rule_table or get_rule_table())
+    columns = [wind_mph, feelslike_c, pop_percent, precip_rate_mmhr, uv_index]
+    n = next((len(c) for c in columns if c is not None), 0)
+    wind, feelslike, pop, rate, uv = (as_column(c, n) for c in columns)
+    if not all(len(c) == n for c in (wind, feelslike, pop, rate, uv)):
+        raise ValueError("All batch input columns must have the same length.")
+
+    # 1. Categorize every metric
+    wind_category, wind_reason = _classify(rules.wind, wind, np.isnan(wind))
+    thermal_category, thermal_reason = _classify(rules.thermal, feelslike, np.isnan(feelslike))
+    uv_category, _ = _classify(rules.uv, uv, np.isnan(uv))
+
+    # Precip: PoP at or below the ignore threshold is Green, otherwise rate dominates;
+    # an unavailable rate defaults to Amber
+    pop_missing = np.isnan(pop)
+    rate_applies = ~pop_missing & (pop > rules.pop_ignore_rate)
+    rate_category, precip_reason = _classify(rules.precip_rate, rate, ~rate_applies | np.isnan(rate))
+    precip_category = np.select(
+        [pop_missing, ~rate_applies, np.isnan(rate)],
+        [MISSING_CATEGORY, CATEGORIES.index(GREEN), CATEGORIES.index(AMBER)],
+        default=rate_category
+    )
+
+    hard_stop_mask = np.zeros((n, len(rules.hard_stop_reasons)), dtype=bool)
+    for reason in (wind_reason, thermal_reason, precip_reason):
+        rows = np.flatnonzero(reason >= 0)
+        hard_stop_mask[rows, reason[rows]] = True
+
+    # 2. Weighted score, summed in the same order as the scalar engine
+    total_score = np.zeros(n)
+    available = np.zeros(n, dtype=np.int8)
+    categories = {"wind": wind_category, "thermal": thermal_category, "precip": precip_category, "uv": uv_category}
+    for metric, category in categories.items():
+        present = category != MISSING_CATEGORY
+        score = rules.scores[np.where(present, category, 0)]
+        total_score = total_score + np.where(present, score * rules.weights[metric], 0.0)
+        available += present
+
+    # 3. Final decision logic
+    hard_stop = hard_stop_mask.any(axis=1)
+    decision_codes = np.select(
+        [
+            available == 0,
+            hard_stop,
+            available < rules.min_metrics_for_decision,
+            total_score >= rules.go_threshold,
+            total_score >= rules.maybe_threshold,
+        ],
+        [NO_DATA, NO_GO, INSUFFICIENT_DATA, GO, MAYBE],
+        default=NO_GO
+    ).astype(np.int8)
+    weighted_scores = np.where(available == 0, np.nan, total_score)
+
+    return HeuristicBatchOutput(
+        decision_codes=decision_codes,
+        weighted_scores=weighted_scores,
+        hard_stop_mask=hard_stop_mask,
+        hard_stop_reasons=rules.hard_stop_reasons
+    )
@@ -0,0 +1,130 @@
+"""
+Monte Carlo forecast-uncertainty mode for the heuristic engine.
+
+Perturbs the rule inputs of a single assessment with configurable noise
+models and scores every sample in one batch-engine pass, so the result
+shows how likely each decision and each hard stop is, not just the
+deterministic answer.
+"""
+from typing import Dict, Literal, Mapping, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from .batch_engine import run_heuristic_engine_batch, DECISIONS
+from .heuristic_engine import run_heuristic_engine
+from .models import HeuristicInput, HeuristicOutput
+from .rule_table import RuleTable, get_rule_table
+
+DEFAULT_SAMPLES = 10_000
+
+
+class NoiseModel(BaseModel):
+    """
+    How one rule input is perturbed.
+
+    "normal" adds Gaussian noise with standard deviation `scale` (in the input's
+    units), "relative" multiplies by log-normal noise with sigma `scale` (mean
+    preserving) and "none" keeps the value fixed. Samples are clipped to
+    [minimum, maximum].
+    """
+    kind: Literal["normal", "relative", "none"] = "normal"
+    scale: float = 0.0
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+
+    def sample(self, rng: np.random.Generator, value: Optional[float], n: int) -> np.ndarray:
+        if value is None:
+            return np.full(n, np.nan)  # Missing stays missing in every sample
+        if self.kind == "none" or self.scale <= 0:
+            samples = np.full(n, float(value))
+        elif self.kind == "normal":
+            samples = rng.normal(value, self.scale, n)
+        else:
+            samples = value * rng.lognormal(-0.5 * self.scale ** 2, self.scale, n)
+        if self.minimum is not None or self.maximum is not None:
+            np.clip(samples, self.minimum, self.maximum, out=samples)
+        return samples
+
+
+# Typical day-ahead forecast errors for the perturbed inputs; UV is not perturbed
+DEFAULT_NOISE: Dict[str, NoiseModel] = {
+    "wind_mph": NoiseModel(kind="normal", scale=4.0, minimum=0.0),
+    "heat_index_c": NoiseModel(kind="normal", scale=2.0),
+    "pop_percent": NoiseModel(kind="normal", scale=15.0, minimum=0.0, maximum=100.0),
+    "precip_rate_mmhr": NoiseModel(kind="relative", scale=0.5, minimum=0.0),
+    "uv_index": NoiseModel(kind="none"),
+}
+
+
+class EnsembleOutput(BaseModel):
+    """Decision and hard-stop probabilities over the ensemble, next to the deterministic result."""
+    n_samples: int
+    deterministic: HeuristicOutput
+    decision_probabilities: Dict[str, float]
+    hard_stop_probabilities: Dict[str, float]
+    score_mean: Optional[float] = None
+    score_p10: Optional[float] = None
+    score_p90: Optional[float] = None
+
+    @property
+    def most_likely_decision(self) -> str:
+        return max(self.decision_probabilities, key=self.decision_probabilities.get)
+
+    @property
+    def flip_probability(self) -> float:
+        """Probability that the decision differs from the deterministic one."""
+        return 1.0 - self.decision_probabilities.get(self.deterministic.decision, 0.0)
+
+
+def _resolve_noise(noise: Optional[Mapping[str, NoiseModel]]) -> Dict[str, NoiseModel]:
+    models = dict(DEFAULT_NOISE)
+    if noise:
+        unknown = set(noise) - set(models)
+        if unknown:
+            raise ValueError(f"Unknown ensemble inputs: {', '.join(sorted(unknown))}")
+        models.update(noise)
+    return models
+
+
+def run_ensemble_assessment(
+    heuristic_input: HeuristicInput,
+    n_samples: int = DEFAULT_SAMPLES,
+    noise: Optional[Mapping[str, NoiseModel]] = None,
+    seed: Optional[int] = None,
+    rule_table: Optional[RuleTable] = None,
+) -> EnsembleOutput:
+    """
+    Runs the heuristic engine on `n_samples` perturbed copies of the input.
+
+    `noise` overrides DEFAULT_NOISE per rule input (wind_mph, heat_index_c,
+    pop_percent, precip_rate_mmhr, uv_index). Pass `seed` for reproducible results.
+    """
+    if n_samples < 1:
+        raise ValueError("The ensemble needs at least one sample.")
+    rules = rule_table or get_rule_table()
+    models = _resolve_noise(noise)
+    rng = np.random.default_rng(seed)
+    record = heuristic_input.to_record()
+    samples = {field: models[field].sample(rng, getattr(record, field), n_samples) for field in models}
+
+    batch = run_heuristic_engine_batch(
+        samples["wind_mph"], samples["heat_index_c"], samples["pop_percent"],
+        samples["precip_rate_mmhr"], samples["uv_index"], rule_table=rules
+    )
+
+    counts = np.bincount(batch.decision_codes, minlength=len(DECISIONS))
+    scores = batch.weighted_scores[~np.isnan(batch.weighted_scores)]
+    if len(scores):
+        score_p10, score_p90 = np.percentile(scores, [10, 90])
+    return EnsembleOutput(
+        n_samples=n_samples,
+        deterministic=run_heuristic_engine(heuristic_input, rule_table=rules),
+        decision_probabilities={decision: float(count) / n_samples for decision, count in zip(DECISIONS, counts)},
+        hard_stop_probabilities={
+            reason: float(p) for reason, p in zip(batch.hard_stop_reasons, batch.hard_stop_mask.mean(axis=0))
+        },
+        score_mean=float(scores.mean()) if len(scores) else None,
+        score_p10=float(score_p10) if len(scores) else None,
+        score_p90=float(score_p90) if len(scores) else None
+    )
@@ -0,0 +1,90 @@
+"""
+Hourly-resolution assessment across a forecast day.
+
+Scores every hour in one vectorized pass (see `batch_engine`) and finds the
+best contiguous run of GO hours for an activity of a given length.
+"""
+from typing import List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from .batch_engine import run_heuristic_engine_batch, HeuristicBatchOutput, GO
+
+
+class GoWindow(BaseModel):
+    """A contiguous run of GO hours, `start_index` inclusive and `end_index` exclusive."""
+    start_index: int
+    end_index: int
+    mean_score: float
+
+    @property
+    def hours(self) -> int:
+        return self.end_index - self.start_index
+
+
+class HourlyAssessment(BaseModel):
+    """Per-hour decisions for one day plus the best GO window found."""
+    hourly: HeuristicBatchOutput
+    activity_hours: int
+    best_window: Optional[GoWindow] = None
+
+    @property
+    def decisions(self) -> List[str]:
+        return self.hourly.decisions
+
+
+def find_best_go_window(
+    decision_codes: np.ndarray,
+    weighted_scores: np.ndarray,
+    activity_hours: int,
+    eligible: Optional[np.ndarray] = None,
+) -> Optional[GoWindow]:
+    """
+    Finds the contiguous window of `activity_hours` GO hours with the highest mean score.
+
+    `eligible` optionally restricts which hours may be part of the window (e.g. daylight).
+    Ties go to the earliest window. Returns None when no such window exists.
+    """
+    if activity_hours < 1:
+        raise ValueError("activity_hours must be at least 1.")
+    n = len(decision_codes)
+    if activity_hours > n:
+        return None
+
+    go = decision_codes == GO
+    if eligible is not None:
+        go &= np.asarray(eligible, dtype=bool)
+    scores = np.where(go, weighted_scores, 0.0)
+
+    # Window sums via cumulative sums: a window is valid when every hour in it is GO
+    go_counts = np.concatenate(([0], np.cumsum(go)))
+    score_sums = np.concatenate(([0.0], np.cumsum(scores)))
+    window_go = go_counts[activity_hours:] - go_counts[:-activity_hours]
+    window_mean = (score_sums[activity_hours:] - score_sums[:-activity_hours]) / activity_hours
+
+    valid = window_go == activity_hours
+    if not valid.any():
+        return None
+    start = int(np.argmax(np.where(valid, window_mean, -np.inf)))
+    return GoWindow(start_index=start, end_index=start + activity_hours, mean_score=float(window_mean[start]))
+
+
+def run_hourly_assessment(
+    wind_mph,
+    feelslike_c,
+    pop_percent,
+    precip_rate_mmhr,
+    uv_index,
+    activity_hours: int = 1,
+    eligible: Optional[np.ndarray] = None,
+) -> HourlyAssessment:
+    """
+    Scores every hour of a day and finds the best GO window for the activity length.
+
+    Columns follow `run_heuristic_engine_batch`; for WeatherAPI hourly data the
+    hour's `chance_of_rain` is the PoP and its `precip_mm` is the precipitation rate.
+    """
+    hourly = run_heuristic_engine_batch(wind_mph, feelslike_c, pop_percent, precip_rate_mmhr, uv_index)
+    best_window = find_best_go_window(hourly.decision_codes, hourly.weighted_scores, activity_hours, eligible)
+    return HourlyAssessment(hourly=hourly, activity_hours=activity_hours, best_window=best_window)
@@ -0,0 +1,100 @@
+"""
+Optional bounded LRU memoization in front of `run_heuristic_engine`.
+
+Weather readings repeat heavily across locations and hours, so batch jobs can
+wrap the engine in a `MemoizedHeuristicEngine` and skip repeated work. The
+cache is cleared automatically whenever the rule table changes.
+"""
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from .heuristic_engine import run_heuristic_engine
+from .models import HeuristicInput, HeuristicOutput, HeuristicRecord
+from .rule_table import get_rule_table
+
+# The only HeuristicInput fields the engine's rules read
+KEY_FIELDS = HeuristicRecord._fields
+
+
+class MemoizedHeuristicEngine:
+    """
+    Memoizes engine results keyed on a normalized tuple of the rule inputs.
+
+    With `decimals` set, inputs are rounded to that precision before both keying
+    and evaluation, so every input in a bucket gets the result for the rounded
+    reading. Leave it as None (the default) for results identical to the engine.
+    Returned outputs are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, maxsize: int = 4096, decimals: Optional[int] = None):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = maxsize
+        self.decimals = decimals
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._cache: "OrderedDict[Tuple, HeuristicOutput]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._rules_version: Optional[int] = None
+
+    def make_key(self, heuristic_input: HeuristicInput) -> Tuple:
+        """
+        Normalizes the rule inputs, in KEY_FIELDS order, None kept and optionally rounded.
+        Equal ints and floats hash alike, so 20 and 20.0 already share a key.
+        """
+        i = heuristic_input
+        key = (i.wind_mph, i.heat_index_c, i.pop_percent, i.precip_rate_mmhr, i.uv_index)
+        if self.decimals is None:
+            return key
+        return tuple(None if v is None else round(float(v), self.decimals) for v in key)
+
+    def __call__(self, heuristic_input: HeuristicInput) -> HeuristicOutput:
+        rules = get_rule_table()
+        key = self.make_key(heuristic_input)
+        with self._lock:
+            if rules.version != self._rules_version:
+                if self._cache:
+                    self.invalidations += 1
+                self._cache.clear()
+                self._rules_version = rules.version
+            output = self._cache.get(key)
+            if output is not None:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return output
+            self.misses += 1
+
+        if self.decimals is not None:
+            heuristic_input = heuristic_input.model_copy(update=dict(zip(KEY_FIELDS, key)))
+        output = run_heuristic_engine(heuristic_input, rule_table=rules)
+
+        with self._lock:
+            if self._rules_version == rules.version:
+                self._cache[key] = output
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.maxsize:
+                    self._cache.popitem(last=False)
+                    self.evictions += 1
+        return output
+
+    def clear(self):
+        """Empties the cache; counters are kept."""
+        with self._lock:
+            self._cache.clear()
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss/eviction counters plus the current size and hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+                "size": len(self._cache),
+                "maxsize": self.maxsize,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
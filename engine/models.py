@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import List, NamedTuple, Optional
 
 # This is the input model for the engine, now with Optional fields
 class HeuristicInput(BaseModel):
@@ -14,10 +14,41 @@ class HeuristicInput(BaseModel):
     pop_percent: Optional[int] = None  # FIX: Make Optional
     precip_rate_mmhr: Optional[float] = None  # FIX: Make Optional
 
+    def to_record(self) -> "HeuristicRecord":
+        """The five values the engine's rules read, as a lightweight record."""
+        return HeuristicRecord(self.wind_mph, self.heat_index_c, self.pop_percent, self.precip_rate_mmhr, self.uv_index)
+
 # This is the output model for the engine
 class HeuristicOutput(BaseModel):
     decision: str
     notes: str
     weighted_score: Optional[float] = None
     hard_stop_reasons: List[str] = Field(default_factory=list)
-    reasons: List[str] = Field(default_factory=list)
\ No newline at end of file
+    reasons: List[str] = Field(default_factory=list)
+
+
+# Internal record for the trusted fast path: no validation, no per-instance dict.
+# Only for values already validated upstream (e.g. from a parsed weather response).
+class HeuristicRecord(NamedTuple):
+    wind_mph: Optional[float]
+    heat_index_c: Optional[float]
+    pop_percent: Optional[int]
+    precip_rate_mmhr: Optional[float]
+    uv_index: Optional[float]
+
+
+# Internal result of the trusted fast path; convert with to_output() at the API boundary.
+class HeuristicResult(NamedTuple):
+    decision: str
+    notes: str
+    weighted_score: Optional[float]
+    hard_stop_reasons: List[str]
+
+    def to_output(self) -> HeuristicOutput:
+        return HeuristicOutput(
+            decision=self.decision,
+            notes=self.notes,
+            weighted_score=self.weighted_score,
+            reasons=[],
+            hard_stop_reasons=self.hard_stop_reasons
+        )
@@ -0,0 +1,112 @@
+"""
+Multi-day horizon assessment with best-day search.
+
+Scores every hour of every day in one vectorized pass, summarizes each day
+over the planning hours and ranks the days by their best GO window.
+"""
+from typing import Dict, List, Optional
+
+import numpy as np
+from pydantic import BaseModel
+
+from .batch_engine import run_heuristic_engine_batch, HeuristicBatchOutput, DECISIONS, GO
+from .hourly_engine import GoWindow, find_best_go_window
+
+
+class DaySummary(BaseModel):
+    """How one day looks over its planning hours."""
+    date: str
+    best_window: Optional[GoWindow] = None
+    go_hours: int
+    decision_counts: Dict[str, int]
+    mean_score: Optional[float] = None  # Mean weighted score over planning hours with data
+
+    @property
+    def has_go_window(self) -> bool:
+        return self.best_window is not None
+
+
+class RangeAssessment(BaseModel):
+    """Per-hour results for every day plus the days ranked best first."""
+    dates: List[str]
+    hourly: HeuristicBatchOutput  # Flattened (days * hours_per_day) rows
+    hours_per_day: int
+    activity_hours: int
+    days: List[DaySummary]
+    ranked: List[DaySummary]
+
+    def decision_matrix(self) -> np.ndarray:
+        """Decision codes as a (days, hours) array, for calendar/heatmap views."""
+        return self.hourly.decision_codes.reshape(len(self.dates), self.hours_per_day)
+
+    def score_matrix(self) -> np.ndarray:
+        """Weighted scores as a (days, hours) array; NaN where there was no data."""
+        return self.hourly.weighted_scores.reshape(len(self.dates), self.hours_per_day)
+
+
+def _rank_key(day: DaySummary):
+    # Days with a GO window first, then by window score, GO hours and overall score
+    window_score = day.best_window.mean_score if day.best_window else -1.0
+    mean_score = day.mean_score if day.mean_score is not None else -1.0
+    return (day.has_go_window, window_score, day.go_hours, mean_score)
+
+
+def run_range_assessment(
+    dates: List[str],
+    wind_mph: np.ndarray,
+    feelslike_c: np.ndarray,
+    pop_percent: np.ndarray,
+    precip_rate_mmhr: np.ndarray,
+    uv_index: np.ndarray,
+    activity_hours: int = 3,
+    first_hour: int = 0,
+    last_hour: int = 24,
+) -> RangeAssessment:
+    """
+    Assesses a multi-day horizon from (days, hours) arrays of hourly data.
+
+    Only hours in [first_hour, last_hour) count towards a day's summary and
+    GO windows (e.g. 8 and 20 for daylight activities). Ties in the ranking
+    keep the earlier day first.
+    """
+    shape = np.shape(wind_mph)
+    if len(shape) != 2 or shape[0] != len(dates):
+        raise ValueError("Range inputs must be (days, hours) arrays with one row per date.")
+    n_days, hours_per_day = shape
+    if not 0 <= first_hour < last_hour <= hours_per_day:
+        raise ValueError("Planning hours must satisfy 0 <= first_hour < last_hour <= hours per day.")
+
+    columns = [np.asarray(c, dtype=np.float64).reshape(-1) for c in
+               (wind_mph, feelslike_c, pop_percent, precip_rate_mmhr, uv_index)]
+    hourly = run_heuristic_engine_batch(*columns)
+
+    codes = hourly.decision_codes.reshape(n_days, hours_per_day)
+    scores = hourly.weighted_scores.reshape(n_days, hours_per_day)
+    eligible = np.zeros(hours_per_day, dtype=bool)
+    eligible[first_hour:last_hour] = True
+
+    days = []
+    for i, date in enumerate(dates):
+        day_codes = codes[i, first_hour:last_hour]
+        day_scores = scores[i, first_hour:last_hour]
+        with_data = ~np.isnan(day_scores)
+        counts = np.bincount(day_codes, minlength=len(DECISIONS))
+        days.append(DaySummary(
+            date=date,
+            best_window=find_best_go_window(codes[i], scores[i], activity_hours, eligible),
+            go_hours=int(counts[GO]),
+            decision_counts={decision: int(c) for decision, c in zip(DECISIONS, counts) if c},
+            mean_score=float(day_scores[with_data].mean()) if with_data.any() else None
+        ))
+
+    # sorted() stays stable with reverse=True, so tied days keep date order
+    ranked = sorted(days, key=_rank_key, reverse=True)
+
+    return RangeAssessment(
+        dates=list(dates),
+        hourly=hourly,
+        hours_per_day=hours_per_day,
+        activity_hours=activity_hours,
+        days=days,
+        ranked=ranked
+    )
@@ -0,0 +1,347 @@
+"""
+Data-driven rule table for the heuristic engine.
+
+Thresholds, scores and weights are loaded from `utils/constants.py`, optionally
+overridden by a JSON or TOML file, and compiled once into classifier functions.
+Both the scalar and the batch engine read the current table via `get_rule_table()`.
+
+Set `ALLOUT_RULES_FILE` (or call `configure_rule_table`) to load overrides; the
+file is re-checked periodically so edits apply without restarting the server.
+"""
+import copy
+import json
+import math
+import os
+import threading
+import time
+from bisect import bisect_right
+from itertools import count
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from utils import constants
+from utils.app_error import AppErrorWrapper
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+RULES_FILE_ENV = "ALLOUT_RULES_FILE"
+
+GREEN, AMBER, RED = "Green", "Amber", "Red"
+CATEGORIES = (GREEN, AMBER, RED)
+
+# Metrics in the order the engine categorizes, scores and reports them
+METRICS = ("wind", "thermal", "precip", "uv")
+
+# Defaults straight from utils/constants.py. POP_AMBER/RED and the *_USE_THRESHOLD
+# constants have no counterpart in the engine's rules and are not used here.
+DEFAULT_RULE_CONFIG: Dict[str, Any] = {
+    "scores": {"green": constants.SCORE_GREEN, "amber": constants.SCORE_AMBER, "red": constants.SCORE_RED},
+    "weights": {
+        "wind": constants.WIND_WEIGHT,
+        "thermal": constants.THERMAL_WEIGHT,
+        "precip": constants.PRECIP_WEIGHT,
+        "uv": constants.UV_WEIGHT,
+    },
+    "wind": {"amber": constants.WIND_AMBER_THRESHOLD, "red": constants.WIND_RED_THRESHOLD},
+    "thermal": {
+        "heat_amber": constants.HEAT_INDEX_AMBER_THRESHOLD,
+        "heat_red": constants.HEAT_INDEX_RED_THRESHOLD,
+        "cold_amber": constants.WIND_CHILL_AMBER_THRESHOLD,
+        "cold_red": constants.WIND_CHILL_RED_THRESHOLD,
+    },
+    "precip": {
+        "pop_ignore_rate": constants.POP_IGNORE_RATE_THRESHOLD,
+        "rate_amber": constants.PRECIP_RATE_AMBER_THRESHOLD,
+        "rate_red": constants.PRECIP_RATE_RED_THRESHOLD,
+    },
+    "uv": {"amber": constants.UV_INDEX_AMBER_THRESHOLD, "red": constants.UV_INDEX_RED_THRESHOLD},
+    "decision": {"go": constants.GO_THRESHOLD, "maybe": constants.MAYBE_THRESHOLD},
+    "min_metrics_for_decision": constants.MIN_METRICS_FOR_DECISION,
+}
+
+_versions = count(1)
+
+
+def _above(threshold: float) -> float:
+    """Band edge for a strict '>' or inclusive '<=' rule under bisect_right."""
+    return math.nextafter(float(threshold), math.inf)
+
+
+class BandClassifier:
+    """
+    Maps a value to a category by bisecting sorted band edges.
+
+    Band i covers [edges[i-1], edges[i]); each band has a category and an
+    optional hard-stop reason.
+    """
+    __slots__ = ("edges", "categories", "reasons", "classify")
+
+    def __init__(self, edges: Tuple[float, ...], categories: Tuple[str, ...], reasons: Tuple[Optional[str], ...]):
+        if list(edges) != sorted(edges):
+            raise ValueError(f"Band edges must be ascending: {edges}")
+        if not len(categories) == len(reasons) == len(edges) + 1:
+            raise ValueError("A classifier needs one category and reason per band.")
+        self.edges = tuple(float(e) for e in edges)
+        self.categories = categories
+        self.reasons = reasons
+        self.classify = _compile_classifier(self.edges, tuple(zip(categories, reasons)))
+
+    def band(self, value: float) -> int:
+        return bisect_right(self.edges, value)
+
+
+def _compile_classifier(edges: Tuple[float, ...], results: Tuple[Tuple[str, Optional[str]], ...]):
+    """
+    Builds `classify(value) -> (category, reason)` for the band edges.
+
+    The engine's tables have two or four edges; for those the bisect is
+    unrolled into the comparisons the original if-chains made. Edges and
+    prebuilt result tuples are bound as default arguments, which CPython
+    reads as fast locals, so a call costs no more than the if-chain did.
+    Other sizes fall back to a bisect.
+
+    None and NaN are missing, as in the batch engine. NaN fails every
+    comparison, so the last band is tested explicitly rather than taken as
+    the default, and NaN falls through to the final return.
+    """
+    if len(edges) == 2:
+        low, high = edges
+        r0, r1, r2 = results
+
+        def classify(value, _low=low, _high=high, _r0=r0, _r1=r1, _r2=r2):
+            if value is None:
+                return None, None
+            if value >= _high:
+                return _r2
+            if value >= _low:
+                return _r1
+            if value < _low:
+                return _r0
+            return None, None
+
+    elif len(edges) == 4:
+        e0, e1, e2, e3 = edges
+        r0, r1, r2, r3, r4 = results
+
+        def classify(value, _e0=e0, _e1=e1, _e2=e2, _e3=e3, _r0=r0, _r1=r1, _r2=r2, _r3=r3, _r4=r4):
+            if value is None:
+                return None, None
+            if value >= _e3:
+                return _r4
+            if value >= _e2:
+                return _r3
+            if value < _e0:
+                return _r0
+            if value < _e1:
+                return _r1
+            if value >= _e1:
+                return _r2
+            return None, None
+
+    else:
+        def classify(value, _edges=edges, _results=results, _bisect=bisect_right):
+            if value is None or value != value:
+                return None, None
+            return _results[_bisect(_edges, value)]
+
+    return classify
+
+
+def _compile_precip(pop_ignore_rate, rate: BandClassifier):
+    """
+    Builds `categorize_precip(pop, rate)`; above the PoP threshold the rate
+    dominates. The two-edge rate classifier is inlined to save a call, and
+    `pop_ignore_rate` is kept as configured: PoP is an int, and CPython
+    compares two ints faster than an int and a float. As in the batch
+    engine, a NaN PoP is missing and a NaN rate under a high PoP is Amber.
+    """
+    amber_at, red_at = rate.edges
+    light, moderate, heavy = zip(rate.categories, rate.reasons)
+
+    def categorize_precip(pop_percent, precip_rate_mmhr, _threshold=pop_ignore_rate, _amber_at=amber_at,
+                          _red_at=red_at, _light=light, _moderate=moderate, _heavy=heavy):
+        if pop_percent is None:
+            return None, None
+        if pop_percent <= _threshold:
+            return _light  # Green: rain is unlikely
+        if pop_percent != pop_percent:
+            return None, None
+        if precip_rate_mmhr is None:
+            return _moderate  # Default to Amber if rate is unavailable but PoP is high
+        if precip_rate_mmhr >= _red_at:
+            return _heavy
+        if precip_rate_mmhr < _amber_at:
+            return _light
+        return _moderate  # Also a NaN rate, which fails both comparisons
+
+    return categorize_precip
+
+
+class RuleTable:
+    """Compiled thresholds, scores and weights. Each build gets a new `version`."""
+
+    def __init__(self, config: Dict[str, Any], source: str = "constants"):
+        self.config = config
+        self.source = source
+        self.version = next(_versions)
+
+        wind = config["wind"]
+        self.wind_reason = f"Wind speed is at a dangerous level (>= {wind['red']} mph)."
+        self.wind = BandClassifier(
+            (wind["amber"], wind["red"]),
+            (GREEN, AMBER, RED),
+            (None, None, self.wind_reason),
+        )
+
+        thermal = config["thermal"]
+        self.heat_reason = f"Extreme heat warning (feels like >= {thermal['heat_red']}°C)."
+        self.cold_reason = f"Extreme cold warning (feels like <= {thermal['cold_red']}°C)."
+        self.thermal = BandClassifier(
+            (_above(thermal["cold_red"]), _above(thermal["cold_amber"]), thermal["heat_amber"], thermal["heat_red"]),
+            (RED, AMBER, GREEN, AMBER, RED),
+            (self.cold_reason, None, None, None, self.heat_reason),
+        )
+
+        precip = config["precip"]
+        self.pop_ignore_rate = float(precip["pop_ignore_rate"])
+        self.precip_reason = f"Heavy precipitation rate (> {precip['rate_red']} mm/hr)."
+        self.precip_rate = BandClassifier(
+            (precip["rate_amber"], _above(precip["rate_red"])),
+            (GREEN, AMBER, RED),
+            (None, None, self.precip_reason),
+        )
+
+        uv = config["uv"]
+        self.uv = BandClassifier((uv["amber"], uv["red"]), (GREEN, AMBER, RED), (None, None, None))
+
+        # Categorizers are the compiled classifiers themselves: (category, reason) per value
+        self.categorize_wind = self.wind.classify
+        self.categorize_thermal_stress = self.thermal.classify
+        self.categorize_uv = self.uv.classify
+        self.categorize_precip = _compile_precip(precip["pop_ignore_rate"], self.precip_rate)
+
+        scores = config["scores"]
+        self.scores = {GREEN: float(scores["green"]), AMBER: float(scores["amber"]), RED: float(scores["red"])}
+        self.weights = {metric: float(weight) for metric, weight in config["weights"].items()}
+        self.metric_weights = tuple(self.weights[metric] for metric in METRICS)
+        self.go_threshold = float(config["decision"]["go"])
+        self.maybe_threshold = float(config["decision"]["maybe"])
+        self.min_metrics_for_decision = int(config["min_metrics_for_decision"])
+
+    @classmethod
+    def from_config(cls, overrides: Optional[Dict[str, Any]] = None, source: str = "constants") -> "RuleTable":
+        """Builds a table from the defaults with `overrides` merged on top."""
+        return cls(merge_config(DEFAULT_RULE_CONFIG, overrides or {}), source=source)
+
+    @property
+    def hard_stop_reasons(self) -> Tuple[str, ...]:
+        """Every hard-stop reason, in the order the engine reports them."""
+        return (self.wind_reason, self.cold_reason, self.heat_reason, self.precip_reason)
+
+
+def merge_config(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Deep-merges `overrides` into a copy of `base`, rejecting unknown keys."""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if key not in merged:
+            raise ValueError(f"Unknown rule table key: '{key}'")
+        if isinstance(merged[key], dict):
+            if not isinstance(value, dict):
+                raise ValueError(f"Rule table key '{key}' must be a table.")
+            merged[key] = merge_config(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+def load_rule_config(path: Path) -> Dict[str, Any]:
+    """Reads rule overrides from a JSON or TOML file."""
+    path = Path(path)
+    if path.suffix == ".toml":
+        if tomllib is None:
+            raise ValueError("TOML rule files require Python 3.11 or newer.")
+        with path.open("rb") as f:
+            return tomllib.load(f)
+    with path.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+class RuleTableProvider:
+    """
+    Holds the current rule table and hot-reloads it when its file changes.
+
+    The file's mtime is checked at most once every `check_interval` seconds,
+    so the engine's hot path only pays for a clock read.
+    """
+
+    def __init__(self, path: Optional[str] = None, check_interval: float = 2.0):
+        self.path = Path(path) if path else None
+        self.check_interval = check_interval
+        self.last_error: Optional[str] = None
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._next_check = 0.0
+        self._table = self._build()
+
+    def _build(self) -> RuleTable:
+        if self.path is None:
+            return RuleTable.from_config()
+        try:
+            self._mtime = self.path.stat().st_mtime
+            return RuleTable.from_config(load_rule_config(self.path), source=str(self.path))
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            raise AppErrorWrapper(
+                error_code="RULE_TABLE_INVALID",
+                user_message=f"Could not load rule table from {self.path}: {e}"
+            ) from e
+
+    def get(self) -> RuleTable:
+        if self.path is not None and time.monotonic() >= self._next_check:
+            self._check_for_changes()
+        return self._table
+
+    def reload(self) -> RuleTable:
+        """Rebuilds the table now. Raises AppErrorWrapper if the file is invalid."""
+        with self._lock:
+            self._table = self._build()
+            self.last_error = None
+            return self._table
+
+    def _check_for_changes(self):
+        with self._lock:
+            self._next_check = time.monotonic() + self.check_interval
+            try:
+                changed = self.path.stat().st_mtime != self._mtime
+            except OSError:
+                changed = False
+            if not changed:
+                return
+            try:
+                self._table = self._build()
+                self.last_error = None
+            except AppErrorWrapper as e:
+                # Keep serving the last good table; a broken edit must not take the engine down
+                self.last_error = e.user_message
+
+
+_provider = RuleTableProvider(os.getenv(RULES_FILE_ENV))
+
+
+def get_rule_table() -> RuleTable:
+    """Returns the current rule table, reloading it if its file has changed."""
+    return _provider.get()
+
+
+def reload_rule_table() -> RuleTable:
+    """Forces a rebuild of the current rule table."""
+    return _provider.reload()
+
+
+def configure_rule_table(path: Optional[str] = None, check_interval: float = 2.0) -> RuleTable:
+    """Switches to a new rules file (None for the built-in constants) and returns its table."""
+    global _provider
+    _provider = RuleTableProvider(path, check_interval)
+    return _provider.get()
@@ -0,0 +1,104 @@
+"""
+Asyncio counterpart of WeatherApiClient for concurrent multi-location fetches.
+
+Requests run on the pooled, retrying WeatherApiClient in a dedicated thread
+pool, so responses, parsing and AppErrorWrapper codes are exactly those of the
+blocking client. Concurrency is bounded by a semaphore, every request has
+its own deadline, and identical in-flight lookups are coalesced.
+
+The deadline is enforced by the blocking client itself (request timeouts and
+retries cut to the time left), not by abandoning the worker thread, so a
+timed-out request never keeps holding a pool thread in the background.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence, Union
+
+from .lean_weather_models import LeanWeatherApiResponse
+from .location_resolver import LocationResolver, get_location_resolver
+from .weather_api import WeatherApiClient, DEFAULT_TIMEOUT
+from utils.app_error import AppErrorWrapper
+from utils.single_flight import AsyncSingleFlight
+
+DEFAULT_CONCURRENCY = 20
+
+
+class AsyncWeatherApiClient:
+    """
+    Async wrapper around a WeatherApiClient.
+
+    `max_concurrency` sizes both the worker pool and the client's connection pool.
+    `deadline` (seconds) caps each request including retries; by default it is
+    the client timeout plus a small allowance for backoff. Lookups are
+    coalesced on `resolver`'s canonical key (default: the process-wide one).
+    """
+
+    def __init__(
+        self,
+        client: Optional[WeatherApiClient] = None,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        deadline: Optional[float] = None,
+        resolver: Optional[LocationResolver] = None,
+    ):
+        self.client = client or WeatherApiClient(pool_size=max_concurrency)
+        self.resolver = resolver if resolver is not None else get_location_resolver()
+        self.max_concurrency = max_concurrency
+        self.deadline = deadline if deadline is not None else DEFAULT_TIMEOUT + 2
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="weather-api")
+        self._flight = AsyncSingleFlight()
+
+    async def get_weather_data(self, location: str, date: str = None, deadline: Optional[float] = None) -> LeanWeatherApiResponse:
+        """
+        Fetches weather data without blocking the event loop; see WeatherApiClient.get_weather_data.
+        Concurrent calls for the same place and date (by the resolver's key, so
+        "Coventry" and "Coventry, UK" once it knows both) share one request and its outcome.
+        """
+        key = (self.resolver.resolve(location).key, date)
+        return await self._flight.do(key, lambda: self._fetch(location, date, deadline))
+
+    async def _fetch(self, location: str, date: Optional[str], deadline: Optional[float]) -> LeanWeatherApiResponse:
+        loop = asyncio.get_running_loop()
+        deadline = deadline if deadline is not None else self.deadline
+        return await loop.run_in_executor(self._executor, self.client.get_weather_data, location, date, deadline)
+
+    async def gather_many(
+        self,
+        locations: Sequence[str],
+        dates: Union[str, None, Sequence[Optional[str]]] = None,
+        concurrency: Optional[int] = None,
+        return_exceptions: bool = False,
+    ) -> List[Union[LeanWeatherApiResponse, AppErrorWrapper]]:
+        """
+        Fetches every location concurrently, at most `concurrency` at a time.
+
+        `dates` is one date for all locations or one per location. Results keep
+        the order of `locations`. With `return_exceptions`, a failed location
+        yields its AppErrorWrapper instead of failing the whole batch.
+        """
+        if dates is None or isinstance(dates, str):
+            dates = [dates] * len(locations)
+        if len(dates) != len(locations):
+            raise ValueError("Provide one date, or one date per location.")
+        semaphore = asyncio.Semaphore(min(concurrency or self.max_concurrency, self.max_concurrency))
+
+        async def fetch(location, date):
+            async with semaphore:
+                return await self.get_weather_data(location, date)
+
+        return await asyncio.gather(
+            *(fetch(location, date) for location, date in zip(locations, dates)),
+            return_exceptions=return_exceptions
+        )
+
+    def stats(self):
+        """Single-flight counters; `coalesced` is the number of requests saved."""
+        return self._flight.stats()
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self) -> "AsyncWeatherApiClient":
+        return self
+
+    async def __aexit__(self, *exc):
+        self.close()
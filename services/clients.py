@@ -0,0 +1,133 @@
+"""
+Process-wide weather and Gemini clients.
+
+Streamlit reruns app.py on every interaction, and building the clients each
+time re-reads .env, reconfigures the Gemini SDK and rebuilds its model and
+safety settings. The registry builds each client once, on first use, and
+shares it between every session and rerun in the process; the clients are
+thread-safe (pooled session, locked caches and counters).
+
+An optional warm-up (ALLOUT_WARM_UP=1, or `warm_up()`) builds the clients and
+the caches, resolver and quota they use, and opens a keep-alive connection to
+WeatherAPI before the first assessment needs it.
+"""
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+import requests
+
+from .explanation_cache import CachedGeminiClient
+from .forecast_cache import CachedWeatherApiClient
+
+logger = logging.getLogger(__name__)
+
+WARM_UP_ENV = "ALLOUT_WARM_UP"
+WARM_UP_TIMEOUT = 5.0  # Seconds; a slow network must not hold up the warm-up thread for long
+
+WEATHER_CLIENT = "weather"
+GEMINI_CLIENT = "gemini"
+
+
+class ClientRegistry:
+    """
+    Builds each named client once and hands the same instance to every caller.
+
+    A build that raises (e.g. a missing API key) is not remembered, so the
+    error surfaces to each caller until the configuration is fixed.
+    """
+
+    def __init__(self, builders: Dict[str, Callable[[], Any]]):
+        self.builders = dict(builders)
+        self._clients: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("builds", "reuses"), 0)
+
+    def get(self, name: str) -> Any:
+        with self._lock:
+            client = self._clients.get(name)
+            if client is None:
+                client = self._clients[name] = self.builders[name]()
+                self._counters["builds"] += 1
+            else:
+                self._counters["reuses"] += 1
+            return client
+
+    def reset(self):
+        """Forgets every client, so the next `get` builds it again from the current environment."""
+        with self._lock:
+            self._clients.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["clients"] = len(self._clients)
+        return stats
+
+
+_registry = ClientRegistry({WEATHER_CLIENT: CachedWeatherApiClient, GEMINI_CLIENT: CachedGeminiClient})
+_warm_up_lock = threading.Lock()
+_warmed_up = False
+
+
+def get_client_registry() -> ClientRegistry:
+    return _registry
+
+
+def get_weather_client() -> CachedWeatherApiClient:
+    """The process-wide cached WeatherAPI client."""
+    return _registry.get(WEATHER_CLIENT)
+
+
+def get_gemini_client() -> CachedGeminiClient:
+    """The process-wide cached Gemini client."""
+    return _registry.get(GEMINI_CLIENT)
+
+
+def warm_up(registry: Optional[ClientRegistry] = None) -> Dict[str, float]:
+    """
+    Builds every client in `registry` (default: the process-wide one) and
+    opens a connection to WeatherAPI on the weather client's pooled session.
+    Returns the seconds each step took; a step that fails is logged and
+    skipped, since the first assessment will report the same error properly.
+    """
+    registry = registry or _registry
+    timings, clients = {}, {}
+    for name in registry.builders:
+        started = time.perf_counter()
+        try:
+            clients[name] = registry.get(name)
+        except Exception as e:
+            logger.debug("Warm-up could not build the %s client: %s", name, e)
+            continue
+        timings[name] = time.perf_counter() - started
+
+    weather_client = clients.get(WEATHER_CLIENT)
+    if weather_client is not None:
+        started = time.perf_counter()
+        try:
+            # Any response will do: the point is the pooled TCP connection, and no API call is made
+            weather_client.session.head(weather_client.BASE_URL, timeout=WARM_UP_TIMEOUT)
+        except requests.RequestException as e:
+            logger.debug("Warm-up could not reach WeatherAPI: %s", e)
+        else:
+            timings["weather_connection"] = time.perf_counter() - started
+    return timings
+
+
+def warm_up_from_env() -> bool:
+    """
+    Starts `warm_up()` on a daemon thread if ALLOUT_WARM_UP is set, once per
+    process however often the app reruns. True if this call started it.
+    """
+    global _warmed_up
+    if os.getenv(WARM_UP_ENV, "").strip().lower() not in ("1", "true", "yes"):
+        return False
+    with _warm_up_lock:
+        if _warmed_up:
+            return False
+        _warmed_up = True
+    threading.Thread(target=warm_up, name="client-warm-up", daemon=True).start()
+    return True
@@ -0,0 +1,253 @@
+"""
+Explanation cache for GeminiLLMClient.
+
+An explanation is a paid, multi-second LLM call, yet assessments whose inputs
+differ only in the second decimal get the same advice. Explanations are
+therefore keyed on a bucketed signature of the GeminiInput: the decision plus
+binned temperature, wind, chance of rain, UV and precipitation, and by default
+the location. Entries live in a TwoTierCache (LRU with TTLs in memory, SQLite
+on disk) and concurrent misses for one signature share a single call.
+
+An optional latency budget bounds how long a caller waits for Gemini: past it,
+the local template explanation is served and the late answer cached.
+"""
+import bisect
+import logging
+import math
+import os
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from pathlib import Path
+from typing import Dict, Generator, Hashable, Optional, Tuple
+
+from pydantic import ValidationError
+
+from utils.cache import TwoTierCache, MISSING
+from utils.single_flight import SingleFlight
+from .explanation_templates import template_explanation
+from .gemini_llm import GeminiLLMClient
+from .location_resolver import normalize_query
+from .models import GeminiInput, GeminiOutput
+
+logger = logging.getLogger(__name__)
+
+EXPLANATION_CACHE_ENV = "ALLOUT_EXPLANATION_CACHE_FILE"
+BUDGET_ENV = "ALLOUT_GEMINI_BUDGET_MS"
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent / "data" / "explanation_cache.sqlite3"
+
+EXPLANATION_TTL = 6 * 60 * 60  # Advice for given conditions does not go stale; this bounds model drift
+SIGNATURE_VERSION = 1  # Bump when the prompt or the bins change, to retire old entries
+
+# Bin widths: inputs within one bin get the same explanation
+TEMP_BIN_C = 2.0
+WIND_BIN_MPH = 5.0
+POP_BIN_PERCENT = 10
+UV_BIN = 1.0
+PRECIP_EDGES_MM = (0.1, 1.0, 2.5, 5.0, 10.0)  # Dry, drizzle, light, moderate, heavy, very heavy
+
+_DEFAULT = object()  # Distinguishes "not passed" from None (no budget)
+
+
+def _bin(value: float, width: float) -> int:
+    return math.floor(value / width)
+
+
+def explanation_signature(gemini_input: GeminiInput, include_location: bool = True) -> Tuple[Hashable, ...]:
+    """The cache key of `gemini_input`: its decision and binned conditions (and normalized location)."""
+    weather = gemini_input.current_weather
+    signature = (
+        "explain", SIGNATURE_VERSION, gemini_input.heuristic_output.decision,
+        _bin(weather.temp_c, TEMP_BIN_C),
+        _bin(weather.wind_mph, WIND_BIN_MPH),
+        _bin(gemini_input.day_forecast.daily_chance_of_rain, POP_BIN_PERCENT),
+        _bin(weather.uv, UV_BIN),
+        bisect.bisect_right(PRECIP_EDGES_MM, weather.precip_mm),
+    )
+    if include_location:
+        signature += (normalize_query(gemini_input.location_name),)
+    return signature
+
+
+class CachedGeminiClient:
+    """
+    Wraps a GeminiLLMClient with an explanation cache and a latency budget.
+
+    Only the explanation text is cached; hits are re-validated as GeminiOutput,
+    so an entry written under older validation rules is dropped and fetched
+    again instead of being served. Errors are never cached. With
+    `include_location=False`, explanations are shared between places with the
+    same conditions (higher hit rate, but the text may name another place).
+
+    With a `budget` (seconds; default ALLOUT_GEMINI_BUDGET_MS, or none), a miss
+    that Gemini has not answered in time gets the local template explanation
+    instead. The Gemini call carries on in the background and, unless
+    `cache_late=False`, its answer is cached for the next lookup.
+    Other attributes are forwarded to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        client: Optional[GeminiLLMClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        flight: Optional[SingleFlight] = None,
+        ttl: float = EXPLANATION_TTL,
+        include_location: bool = True,
+        budget: Optional[float] = _DEFAULT,
+        cache_late: bool = True,
+    ):
+        self.client = client or GeminiLLMClient()
+        self.cache = cache if cache is not None else get_explanation_cache()
+        self.flight = flight if flight is not None else _explanation_flight
+        self.ttl = ttl
+        self.include_location = include_location
+        self.budget = _budget_from_env() if budget is _DEFAULT else budget
+        if self.budget is not None and self.budget <= 0:
+            raise ValueError("The latency budget must be positive.")
+        self.cache_late = cache_late
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("lookups", "llm_calls", "template_answers", "late_answers"), 0)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def get_explanation(self, gemini_input: GeminiInput) -> GeminiOutput:
+        key = explanation_signature(gemini_input, self.include_location)
+        self._count("lookups")
+        output = self._cached(key)
+        if output is not None:
+            return output
+        if self.budget is None:
+            return self.flight.do(key, lambda: self._load(key, gemini_input))
+
+        future = _explanation_executor.submit(self.flight.do, key, lambda: self._load(key, gemini_input))
+        try:
+            return future.result(timeout=self.budget)
+        except FutureTimeout:
+            self._count("template_answers")
+            return template_explanation(gemini_input)
+
+    def stream_explanation(self, gemini_input: GeminiInput) -> Generator[str, None, GeminiOutput]:
+        """
+        Streams the explanation and returns the complete GeminiOutput. A hit
+        arrives as a single chunk; a miss streams from Gemini and is cached once
+        the stream has completed and validated. With a budget, a first chunk
+        that is not there in time is replaced by the template explanation.
+        Streams are not coalesced.
+        """
+        key = explanation_signature(gemini_input, self.include_location)
+        self._count("lookups")
+        output = self._cached(key)
+        if output is not None:
+            yield output.explanation
+            return output
+        if self.budget is None:
+            return (yield from self._stream(key, gemini_input, threading.Event()))
+
+        chunks: "queue.Queue" = queue.Queue()
+        abandoned = threading.Event()
+        _explanation_executor.submit(self._pump, self._stream(key, gemini_input, abandoned), chunks)
+        try:
+            item = chunks.get(timeout=self.budget)
+        except queue.Empty:
+            abandoned.set()
+            self._count("template_answers")
+            output = template_explanation(gemini_input)
+            yield output.explanation
+            return output
+        while not isinstance(item, (GeminiOutput, Exception)):
+            yield item
+            item = chunks.get()
+        if isinstance(item, Exception):
+            raise item
+        return item
+
+    def _stream(self, key, gemini_input: GeminiInput, abandoned: threading.Event) -> Generator[str, None, GeminiOutput]:
+        self._count("llm_calls")
+        output = yield from self.client.stream_explanation(gemini_input)
+        if abandoned.is_set():
+            self._count("late_answers")
+        if self.cache_late or not abandoned.is_set():
+            self.cache.set(key, output.explanation, self.ttl)
+        return output
+
+    @staticmethod
+    def _pump(stream: Generator[str, None, GeminiOutput], chunks: "queue.Queue"):
+        """Moves a stream onto a queue: its chunks, then its GeminiOutput or the exception it raised."""
+        try:
+            while True:
+                chunks.put(next(stream))
+        except StopIteration as finished:
+            chunks.put(finished.value)
+        except Exception as e:
+            chunks.put(e)
+
+    def _cached(self, key) -> Optional[GeminiOutput]:
+        explanation = self.cache.get(key)
+        if explanation is MISSING:
+            return None
+        try:
+            return GeminiOutput(explanation=explanation)
+        except ValidationError:
+            self.cache.delete(key)
+            return None
+
+    def _load(self, key, gemini_input: GeminiInput) -> GeminiOutput:
+        output = self._cached(key)  # A flight that just landed may have filled it
+        if output is None:
+            self._count("llm_calls")
+            started = time.perf_counter()
+            output = self.client.get_explanation(gemini_input)
+            late = self.budget is not None and time.perf_counter() - started > self.budget
+            if late:
+                self._count("late_answers")
+            if self.cache_late or not late:
+                self.cache.set(key, output.explanation, self.ttl)
+        return output
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Cache statistics plus `lookups`, `llm_calls`, `coalesced_calls`,
+        `template_answers` (budget overruns) and `late_answers` (Gemini answers
+        that arrived after their budget); `hit_rate` is the share of lookups
+        answered without a Gemini call.
+        """
+        stats = self.cache.stats()
+        stats["coalesced_calls"] = self.flight.stats()["coalesced"]
+        with self._lock:
+            stats.update(self._counters)
+        stats["hit_rate"] = 1 - stats["llm_calls"] / stats["lookups"] if stats["lookups"] else 0.0
+        return stats
+
+
+def _budget_from_env() -> Optional[float]:
+    value = os.getenv(BUDGET_ENV)
+    return float(value) / 1000 if value else None
+
+
+_explanation_cache: Optional[TwoTierCache] = None
+_explanation_flight = SingleFlight()  # Shared by every cached client in the process
+# Runs budgeted Gemini calls, which may outlive the request that started them
+_explanation_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="gemini-explain")
+
+
+def get_explanation_cache() -> TwoTierCache:
+    """
+    The process-wide explanation cache. Its SQLite file is `ALLOUT_EXPLANATION_CACHE_FILE`
+    or data/explanation_cache.sqlite3; if the file cannot be opened, memory only.
+    """
+    global _explanation_cache
+    if _explanation_cache is None:
+        path = os.getenv(EXPLANATION_CACHE_ENV) or DEFAULT_CACHE_FILE
+        try:
+            _explanation_cache = TwoTierCache(memory_size=256, path=path, disk_size=5_000)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug("Explanation disk cache unavailable (%s); using memory only", e)
+            _explanation_cache = TwoTierCache(memory_size=256)
+    return _explanation_cache
@@ -0,0 +1,103 @@
+"""
+Local explanations built from the heuristic result and weather metrics.
+
+Used in place of Gemini when it cannot answer within the latency budget or is
+rate limiting us: no network call, and the same GeminiOutput shape (marked
+`source="template"`). The advice follows the engine's decision, so it never
+contradicts the assessment; the condition tips come from the engine's own
+classifiers in the current rule table, so they follow overrides and reloads.
+"""
+from typing import List, Optional
+
+from engine.rule_table import GREEN, RuleTable, get_rule_table
+from .models import GeminiInput, GeminiOutput
+
+# Gemini errors that get the template explanation instead of an error message
+FALLBACK_ERROR_CODES = frozenset({"GEMINI_RATE_LIMITED", "GEMINI_QUOTA_EXHAUSTED", "GEMINI_TIMEOUT"})
+
+DECISION_TEMPLATES = {
+    "GO": (
+        "**Conditions appear favorable for outdoor activities.** "
+        "The current weather metrics suggest safe conditions. However, always:\n\n"
+        "✅ Check the latest weather updates before departing\n\n"
+        "✅ Inform someone of your plans and expected return time\n\n"
+        "✅ Pack essential safety gear (first aid, navigation, communication)\n\n"
+        "✅ Bring layers and rain protection - weather can change quickly\n\n"
+        "✅ Monitor conditions throughout your activity\n\n"
+        "Stay alert to any weather changes and trust your judgment. "
+        "If conditions deteriorate, don't hesitate to turn back."
+    ),
+    "MAYBE": (
+        "**Conditions are borderline - proceed with caution.** "
+        "Our analysis indicates marginal weather conditions. Consider these recommendations:\n\n"
+        "⚠️ Re-check weather forecasts from multiple sources\n\n"
+        "⚠️ Have a backup plan and clear turnaround criteria\n\n"
+        "⚠️ Ensure all participants are experienced and properly equipped\n\n"
+        "⚠️ Start early to allow time for changing conditions\n\n"
+        "⚠️ Be prepared to cancel or turn back if conditions worsen\n\n"
+        "Borderline conditions require extra vigilance. It's always better to postpone "
+        "than to take unnecessary risks. Your safety is the priority."
+    ),
+    "NO-GO": (
+        "**Conditions are not favorable - outdoor activities not recommended.** "
+        "Our safety analysis indicates significant risks. Here's why this matters:\n\n"
+        "❌ Current weather metrics exceed safe thresholds\n\n"
+        "❌ High risk of dangerous conditions during your planned activity\n\n"
+        "❌ Increased chance of weather-related incidents\n\n"
+        "**Recommended Actions:**\n\n"
+        "• Postpone your outdoor plans to a safer day\n\n"
+        "• Consider alternative indoor activities\n\n"
+        "• If you must go out, take extreme precautions and stay in sheltered areas\n\n"
+        "• Monitor weather updates for improvement\n\n"
+        "Remember: Mountains, trails, and outdoor activities will always be there. "
+        "Your safety cannot be compromised."
+    ),
+}
+
+INSUFFICIENT_DATA_TEMPLATE = (
+    "**There is not enough weather data for a confident assessment.** "
+    "Check a local forecast before you set out, tell someone your plans, and be ready to turn back."
+)
+
+
+def _flagged(category: Optional[str]) -> bool:
+    return category is not None and category != GREEN
+
+
+def _condition_tips(gemini_input: GeminiInput, rules: RuleTable) -> List[str]:
+    """One tip per metric the engine rates amber or red."""
+    weather = gemini_input.current_weather
+    tips = []
+    if _flagged(rules.categorize_wind(weather.wind_mph)[0]):
+        tips.append(f"Wind is {weather.wind_mph:g} mph: avoid exposed ridges and secure loose gear.")
+    if _flagged(rules.categorize_thermal_stress(weather.feelslike_c)[0]):
+        if weather.feelslike_c <= rules.config["thermal"]["cold_amber"]:
+            tips.append(f"It feels like {weather.feelslike_c:g}°C: wear insulating layers, a hat and gloves.")
+        else:
+            tips.append(f"It feels like {weather.feelslike_c:g}°C: carry extra water and rest in the shade.")
+    if _flagged(rules.categorize_precip(gemini_input.day_forecast.daily_chance_of_rain, weather.precip_mm)[0]):
+        tips.append("Rain is likely: pack a waterproof jacket and watch for slippery ground.")
+    if _flagged(rules.categorize_uv(weather.uv)[0]):
+        tips.append(f"UV index is {weather.uv:g}: use sunscreen, a hat and sunglasses.")
+    return tips
+
+
+def template_explanation(gemini_input: GeminiInput, rule_table: Optional[RuleTable] = None) -> GeminiOutput:
+    """
+    A GeminiOutput built locally from the decision, its notes and the current
+    metrics. Uses the current rule table unless one is given.
+    """
+    heuristic = gemini_input.heuristic_output
+    weather = gemini_input.current_weather
+    summary = (
+        f"**Weather Summary:** {heuristic.notes} Currently {weather.temp_c:g}°C "
+        f"(feels like {weather.feelslike_c:g}°C), wind {weather.wind_mph:g} mph, "
+        f"{gemini_input.day_forecast.daily_chance_of_rain}% chance of rain, UV {weather.uv:g}."
+    )
+    parts = [summary, DECISION_TEMPLATES.get(heuristic.decision, INSUFFICIENT_DATA_TEMPLATE)]
+    if heuristic.hard_stop_reasons:
+        parts.append("**Hard stops:** " + "; ".join(heuristic.hard_stop_reasons))
+    tips = _condition_tips(gemini_input, rule_table or get_rule_table())
+    if tips:
+        parts.append("**For these conditions:**\n\n" + "\n\n".join(f"• {tip}" for tip in tips))
+    return GeminiOutput(explanation="\n\n".join(parts), source="template")
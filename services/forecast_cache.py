@@ -0,0 +1,294 @@
+"""
+Forecast cache in front of WeatherApiClient.
+
+Parsed responses are cached per canonical location (see location_resolver)
+and date in a two-tier TTL cache (memory LRU + SQLite), so repeated lookups
+skip the network, the quota and JSON parsing. TTLs grow with how far ahead the date is: today's
+forecast changes hourly, next week's barely moves.
+
+Expired entries stay servable for a grace period (stale-while-revalidate):
+a stale hit returns at once and a background worker re-fetches the entry,
+keeping the most requested locations warm (see forecast_refresh).
+
+Optional grid mode (`grid_deg`, or ALLOUT_GRID_DEG) snaps resolved coordinates
+to grid cells and caches one forecast per cell, so nearby trailheads,
+villages and postcodes share a fetch.
+"""
+import copy
+import datetime
+import logging
+import math
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+from utils.app_error import AppErrorWrapper
+from utils.cache import TwoTierCache, MISSING
+from utils.geo import format_coordinates, snap_to_grid
+from utils.single_flight import SingleFlight
+from utils.token_bucket import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from .forecast_refresh import BackgroundRefresher, get_background_refresher
+from .lean_weather_models import LeanWeatherApiResponse, LeanHourlyWeatherResponse, LeanForecastRange, Location
+from .location_resolver import LocationResolver, ResolvedLocation, get_location_resolver
+from .weather_api import WeatherApiClient
+
+logger = logging.getLogger(__name__)
+
+FORECAST_CACHE_ENV = "ALLOUT_FORECAST_CACHE_FILE"
+GRID_ENV = "ALLOUT_GRID_DEG"
+DEFAULT_CACHE_FILE = Path(__file__).parent.parent / "data" / "forecast_cache.sqlite3"
+
+# (max days ahead, TTL in seconds); dates further ahead than the last row use its TTL
+LEAD_TIME_TTLS: Tuple[Tuple[int, float], ...] = (
+    (0, 15 * 60),       # Today
+    (2, 60 * 60),       # Next two days
+    (6, 3 * 60 * 60),   # Rest of the week
+    (14, 6 * 60 * 60),  # Up to the end of the forecast horizon
+)
+PAST_DATE_TTL = 24 * 60 * 60  # Past dates no longer change
+STALE_FRACTION = 0.5  # How long past its TTL, as a fraction of it, an entry may be served while it refreshes
+
+
+def grid_cell(lat: float, lon: float, cell_deg: float) -> ResolvedLocation:
+    """The cache key (prefixed '#') and API query (its centre) of the grid cell containing (lat, lon)."""
+    cell_lat, cell_lon = snap_to_grid(lat, lon, cell_deg)
+    return ResolvedLocation(f"#{cell_deg:g}:{cell_lat:g},{cell_lon:g}", format_coordinates(cell_lat, cell_lon))
+
+
+def _grid_from_env() -> Optional[float]:
+    value = os.getenv(GRID_ENV)
+    return float(value) if value else None
+
+
+def ttl_for_date(date: Optional[str], today: Optional[datetime.date] = None) -> float:
+    """TTL in seconds for a forecast of `date` (YYYY-MM-DD; None means today)."""
+    today = today or datetime.date.today()
+    days_ahead = (datetime.date.fromisoformat(date) - today).days if date else 0
+    if days_ahead < 0:
+        return PAST_DATE_TTL
+    for max_days, ttl in LEAD_TIME_TTLS:
+        if days_ahead <= max_days:
+            return ttl
+    return LEAD_TIME_TTLS[-1][1]
+
+
+_DEFAULT = object()  # Distinguishes "use the shared refresher" from refresher=None
+
+
+class _Entry(NamedTuple):
+    """A cached response and when it goes stale, fixed by the TTL it was stored with."""
+    value: Any
+    stale_at: float
+
+
+def _unwrap(entry) -> _Entry:
+    # Entries written before stale_at was stored are never stale; they simply expire
+    return entry if isinstance(entry, _Entry) else _Entry(entry, math.inf)
+
+
+class CachedWeatherApiClient:
+    """
+    Drop-in for WeatherApiClient that serves repeated lookups from a cache.
+
+    Locations are keyed by the resolver's canonical key, so "Coventry, UK" and
+    "coventry" share an entry once either has been seen. Concurrent misses for
+    the same key share one fetch (single flight), so a burst of identical
+    lookups costs one API call. With a refresher (the default), stale hits are
+    served immediately and refreshed in the background on the batch quota
+    lane; pass `refresher=None` for plain expiry. With `grid_deg`, locations
+    with known coordinates are keyed and fetched by grid cell; text that has
+    never been resolved is fetched as typed and its result cached under the
+    cell WeatherAPI placed it in. Cached models are shared
+    between callers and must be treated as read-only. Errors are never cached.
+    Other attributes are forwarded to the wrapped client.
+    """
+
+    def __init__(
+        self,
+        client: Optional[WeatherApiClient] = None,
+        cache: Optional[TwoTierCache] = None,
+        flight: Optional[SingleFlight] = None,
+        resolver: Optional[LocationResolver] = None,
+        refresher: Optional[BackgroundRefresher] = _DEFAULT,
+        clock=time.time,
+        grid_deg: Optional[float] = _DEFAULT,
+    ):
+        self.client = client or WeatherApiClient()
+        self.cache = cache if cache is not None else get_forecast_cache()
+        self.flight = flight if flight is not None else _forecast_flight
+        self.resolver = resolver if resolver is not None else get_location_resolver()
+        self.refresher = get_background_refresher() if refresher is _DEFAULT else refresher
+        self._background_client = _batch_client(self.client)
+        self._clock = clock
+        self.grid_deg = _grid_from_env() if grid_deg is _DEFAULT else grid_deg
+        if self.grid_deg is not None and self.grid_deg <= 0:
+            raise ValueError("Grid cell size must be positive.")
+        if self.refresher is not None:
+            self.refresher.start()
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+    def _cached(self, kind: str, location: str, date: Optional[str], ttl: float, load: Callable):
+        """
+        `load(client, query)` fetches through `client`; `query` is the resolved
+        form of `location`. Background refreshes pass the batch-lane client.
+        """
+        date = date or datetime.date.today().isoformat()
+        resolved = self._resolve(location)
+        key = (kind, resolved.key, date)
+        value = self.cache.get(key)
+        if self.refresher is not None:
+            # Refreshes coalesce among themselves only: a foreground miss must not wait on the batch lane
+            refresh = lambda: self.flight.do(
+                ("refresh",) + key,
+                lambda: self._store(key, location, ttl, load(self._background_client, resolved.query))
+            )
+            self.refresher.tracker.touch(key, refresh)
+        if value is MISSING:
+            return self.flight.do(key, lambda: self._load(key, location, ttl, lambda: load(self.client, resolved.query)))
+        value, stale_at = _unwrap(value)
+        if self.refresher is not None:
+            self._check_stale(key, stale_at)
+        return value
+
+    def _check_stale(self, key, stale_at: float):
+        """Schedules a refresh when the entry is past the TTL it was stored with (in its grace period)."""
+        self.refresher.tracker.mark_stored(key, stale_at)
+        if stale_at <= self._clock():
+            self.refresher.schedule(key)
+
+    def _load(self, key, location: str, ttl: float, load: Callable):
+        entry = self.cache.get(key)  # A flight that just landed may have filled it
+        if entry is MISSING:
+            return self._store(key, location, ttl, load())
+        return _unwrap(entry).value
+
+    def _resolve(self, location: str) -> ResolvedLocation:
+        resolved = self.resolver.resolve(location)
+        if self.grid_deg:
+            coordinates = resolved.coordinates
+            if coordinates is not None:
+                return grid_cell(*coordinates, self.grid_deg)
+        return resolved
+
+    def _store(self, key, location: str, ttl: float, value):
+        # Store under the key this input resolves to from now on
+        resolved_location = _response_location(value)
+        if resolved_location is not None:
+            learned = self.resolver.learn(location, resolved_location)
+            if not key[1].startswith("#"):  # A cell key already names where the value belongs
+                if self.grid_deg and resolved_location.lat is not None and resolved_location.lon is not None:
+                    learned = grid_cell(resolved_location.lat, resolved_location.lon, self.grid_deg).key
+                key = key[:1] + (learned,) + key[2:]
+        stale_at = self._clock() + ttl
+        if self.refresher is None:
+            self.cache.set(key, _Entry(value, stale_at), ttl)
+        else:
+            self.cache.set(key, _Entry(value, stale_at), ttl * (1 + STALE_FRACTION))
+            self.refresher.tracker.mark_stored(key, stale_at)
+        return value
+
+    def get_weather_data(self, location: str, date: str = None) -> LeanWeatherApiResponse:
+        return self._cached(
+            "day", location, date, ttl_for_date(date), lambda client, query: client.get_weather_data(query, date)
+        )
+
+    def get_weather_data_bulk(
+        self, locations: Sequence[str], date: str = None, return_exceptions: bool = False
+    ) -> List[Union[LeanWeatherApiResponse, AppErrorWrapper]]:
+        """
+        Cached `get_weather_data` for many locations. Hits are served from the
+        cache; the distinct misses go out together through the client's bulk API.
+        """
+        date = date or datetime.date.today().isoformat()
+        resolved = [self._resolve(location) for location in locations]
+        keys = [("day", r.key, date) for r in resolved]
+        # Stale entries are served without a refresh
+        results = [self.cache.get(key) for key in keys]
+        results = [value if value is MISSING else _unwrap(value).value for value in results]
+
+        misses: Dict[tuple, int] = {}  # Key -> first index needing it
+        for index, (key, value) in enumerate(zip(keys, results)):
+            if value is MISSING:
+                misses.setdefault(key, index)
+        if misses:
+            fetched = self.client.get_weather_data_bulk(
+                [resolved[index].query for index in misses.values()], date, return_exceptions=True
+            )
+            found = {}
+            for (key, index), value in zip(misses.items(), fetched):
+                if not isinstance(value, AppErrorWrapper):
+                    self._store(key, locations[index], ttl_for_date(date), value)
+                found[key] = value
+            results = [found[key] if value is MISSING else value for key, value in zip(keys, results)]
+
+        if not return_exceptions:
+            for value in results:
+                if isinstance(value, AppErrorWrapper):
+                    raise value
+        return results
+
+    def get_hourly_weather_data(self, location: str, date: str = None) -> LeanHourlyWeatherResponse:
+        return self._cached(
+            "hourly", location, date, ttl_for_date(date),
+            lambda client, query: client.get_hourly_weather_data(query, date)
+        )
+
+    def get_forecast_range(self, location: str, days: int = WeatherApiClient.MAX_FORECAST_DAYS) -> LeanForecastRange:
+        # The range starts today, so it expires as fast as today's forecast
+        return self._cached(
+            f"range{days}", location, None, ttl_for_date(None),
+            lambda client, query: client.get_forecast_range(query, days)
+        )
+
+    def get_weather(self, location, date):
+        """Wrapper method for compatibility."""
+        return self.get_weather_data(location, date)
+
+    def stats(self):
+        """Cache statistics plus `coalesced_calls` (fetches saved by single flight) and background refresh counts."""
+        stats = self.cache.stats()
+        stats["coalesced_calls"] = self.flight.stats()["coalesced"]
+        if self.refresher is not None:
+            stats.update({f"refresh_{name}": count for name, count in self.refresher.stats().items()})
+        return stats
+
+
+def _batch_client(client):
+    """A shallow copy of `client` that draws on the batch quota lane, for background refreshes."""
+    if getattr(client, "priority", None) != PRIORITY_INTERACTIVE:
+        return client
+    batch = copy.copy(client)
+    batch.priority = PRIORITY_BATCH
+    return batch
+
+
+def _response_location(value) -> Optional[Location]:
+    """The location WeatherAPI resolved a response to (hourly responses nest it under `weather`)."""
+    location = getattr(value, "location", None)
+    if location is None:
+        location = getattr(getattr(value, "weather", None), "location", None)
+    return location if isinstance(location, Location) else None
+
+
+_forecast_cache: Optional[TwoTierCache] = None
+_forecast_flight = SingleFlight()  # Shared by every cached client in the process
+
+
+def get_forecast_cache() -> TwoTierCache:
+    """
+    The process-wide forecast cache. Its SQLite file is `ALLOUT_FORECAST_CACHE_FILE`
+    or data/forecast_cache.sqlite3; if the file cannot be opened, memory only.
+    """
+    global _forecast_cache
+    if _forecast_cache is None:
+        path = os.getenv(FORECAST_CACHE_ENV) or DEFAULT_CACHE_FILE
+        try:
+            _forecast_cache = TwoTierCache(memory_size=512, path=path, disk_size=5_000)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug("Forecast disk cache unavailable (%s); using memory only", e)
+            _forecast_cache = TwoTierCache(memory_size=512)
+    return _forecast_cache
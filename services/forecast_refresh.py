@@ -0,0 +1,231 @@
+"""
+Background refresh for the forecast cache (stale-while-revalidate).
+
+CachedWeatherApiClient serves an entry that has passed its TTL, but not its
+stale grace period, straight away and schedules a refresh here instead of
+making the caller wait for WeatherAPI. The refresher also keeps hot keys
+warm: each round it re-fetches the most requested keys that are about to go
+stale, ranked by exponentially decayed request counts, so popular locations
+never go stale while rarely requested ones are simply left to expire.
+"""
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+HOTNESS_HALF_LIFE = 60 * 60   # Seconds for a request's weight to halve
+MIN_HOTNESS = 2.0             # Decayed requests a key needs to be kept warm proactively
+REFRESH_INTERVAL = 30.0       # Seconds between proactive rounds
+MAX_REFRESHES_PER_ROUND = 20  # Caps background quota use per round
+FAILED_REFRESH_DELAY = 5 * 60  # Seconds before a failed key is retried proactively
+
+
+class _Entry:
+    __slots__ = ("score", "updated_at", "refresh", "stale_at")
+
+    def __init__(self, refresh: Callable[[], Any], now: float):
+        self.score = 0.0
+        self.updated_at = now
+        self.refresh = refresh
+        self.stale_at: Optional[float] = None
+
+
+class HotnessTracker:
+    """
+    Exponentially decayed request counts per key, with the callable that
+    refreshes each key and the time its cached value goes stale. Bounded to
+    `max_keys`; the coldest keys are forgotten first.
+    """
+
+    def __init__(self, half_life: float = HOTNESS_HALF_LIFE, max_keys: int = 2048, clock=time.time):
+        self.half_life = half_life
+        self.max_keys = max_keys
+        self._clock = clock
+        self._entries: Dict[Hashable, _Entry] = {}
+        self._lock = threading.Lock()
+
+    def _decayed(self, entry: _Entry, now: float) -> float:
+        return entry.score * 0.5 ** ((now - entry.updated_at) / self.half_life)
+
+    def touch(self, key: Hashable, refresh: Callable[[], Any]) -> float:
+        """Counts one request for `key` and returns its new score."""
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(refresh, now)
+                if len(self._entries) > self.max_keys:
+                    self._prune(now)
+            entry.score = self._decayed(entry, now) + 1.0
+            entry.updated_at = now
+            entry.refresh = refresh
+            return entry.score
+
+    def _prune(self, now: float):
+        """Drops the coldest quarter of the keys."""
+        ranked = sorted(self._entries, key=lambda k: self._decayed(self._entries[k], now))
+        for key in ranked[:max(1, len(ranked) // 4)]:
+            del self._entries[key]
+
+    def mark_stored(self, key: Hashable, stale_at: float):
+        """Records when the value just cached for `key` goes stale."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry.stale_at = stale_at
+
+    def score(self, key: Hashable) -> float:
+        with self._lock:
+            entry = self._entries.get(key)
+            return self._decayed(entry, self._clock()) if entry is not None else 0.0
+
+    def refresher_for(self, key: Hashable) -> Optional[Callable[[], Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.refresh if entry is not None else None
+
+    def due(self, horizon: float, min_score: float, limit: int) -> List[Tuple[Hashable, float]]:
+        """Up to `limit` (key, score) pairs, hottest first, scoring at least `min_score` and stale by `horizon`."""
+        now = self._clock()
+        with self._lock:
+            candidates = [
+                (key, self._decayed(entry, now)) for key, entry in self._entries.items()
+                if entry.stale_at is not None and entry.stale_at <= horizon
+            ]
+        candidates = [(key, score) for key, score in candidates if score >= min_score]
+        candidates.sort(key=lambda item: item[1], reverse=True)
+        return candidates[:limit]
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class BackgroundRefresher:
+    """
+    Runs cache refreshes on a daemon thread.
+
+    `schedule(key)` queues a refresh after a stale hit and wakes the worker.
+    Every `interval` seconds the worker also refreshes hot keys that will be
+    stale before the next round. Each round runs at most `max_per_round`
+    refreshes, queued keys first, then by hotness.
+    """
+
+    def __init__(
+        self,
+        tracker: Optional[HotnessTracker] = None,
+        interval: float = REFRESH_INTERVAL,
+        min_hotness: float = MIN_HOTNESS,
+        max_per_round: int = MAX_REFRESHES_PER_ROUND,
+        max_workers: int = 2,
+        clock=time.time,
+    ):
+        self.tracker = tracker or HotnessTracker(clock=clock)
+        self.interval = interval
+        self.min_hotness = min_hotness
+        self.max_per_round = max_per_round
+        self._clock = clock
+        self._pending: Dict[Hashable, None] = {}  # Insertion-ordered set
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="forecast-refresh")
+        self._counters = dict.fromkeys(("scheduled", "refreshed", "proactive", "failed", "rounds"), 0)
+
+    def schedule(self, key: Hashable):
+        """Queues a refresh of `key` (a no-op if it is already queued)."""
+        with self._lock:
+            if key in self._pending:
+                return
+            self._pending[key] = None
+            self._counters["scheduled"] += 1
+            self._ensure_started()
+        self._wake.set()
+
+    def _ensure_started(self):
+        if self._thread is None and not self._stopped.is_set():
+            self._thread = threading.Thread(target=self._run, name="forecast-refresher", daemon=True)
+            self._thread.start()
+
+    def start(self) -> "BackgroundRefresher":
+        """Starts proactive rounds without waiting for the first stale hit."""
+        with self._lock:
+            self._ensure_started()
+        return self
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if not self._stopped.is_set():
+                self.run_once()
+
+    def run_once(self) -> int:
+        """Runs one round of refreshes and returns how many succeeded."""
+        with self._lock:
+            pending = list(self._pending)
+            self._pending.clear()
+            self._counters["rounds"] += 1
+        pending.sort(key=self.tracker.score, reverse=True)
+        keys = pending[:self.max_per_round]
+        proactive = set()
+        if len(keys) < self.max_per_round:
+            horizon = self._clock() + self.interval
+            due = [key for key, _ in self.tracker.due(horizon, self.min_hotness, self.max_per_round) if key not in pending]
+            proactive = set(due[:self.max_per_round - len(keys)])
+            keys += due[:self.max_per_round - len(keys)]
+
+        futures = {key: self._executor.submit(self._refresh, key) for key in keys}
+        succeeded = 0
+        for key, future in futures.items():
+            if future.result():
+                succeeded += 1
+                with self._lock:
+                    self._counters["refreshed"] += 1
+                    if key in proactive:
+                        self._counters["proactive"] += 1
+        return succeeded
+
+    def _refresh(self, key: Hashable) -> bool:
+        refresh = self.tracker.refresher_for(key)
+        if refresh is None:
+            return False
+        try:
+            refresh()
+            return True
+        except Exception as e:  # Keep serving the stale value; retry later
+            logger.debug("Background refresh of %s failed (%s)", key, e)
+            self.tracker.mark_stored(key, self._clock() + FAILED_REFRESH_DELAY)
+            with self._lock:
+                self._counters["failed"] += 1
+            return False
+
+    def stop(self):
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self._executor.shutdown(wait=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            stats = dict(self._counters)
+            stats["pending"] = len(self._pending)
+        stats["tracked_keys"] = len(self.tracker)
+        return stats
+
+
+_refresher: Optional[BackgroundRefresher] = None
+_refresher_lock = threading.Lock()
+
+
+def get_background_refresher() -> BackgroundRefresher:
+    """The process-wide refresher; its thread starts on the first scheduled refresh."""
+    global _refresher
+    with _refresher_lock:
+        if _refresher is None:
+            _refresher = BackgroundRefresher()
+        return _refresher
@@ -1,4 +1,7 @@
 import os
+from contextlib import contextmanager
+from typing import Generator, Optional
+
 from dotenv import load_dotenv
 import google.generativeai as genai
 from google.generativeai.types import HarmCategory, HarmBlockThreshold
@@ -7,14 +10,19 @@ from pydantic import ValidationError
 import streamlit as st
 
 from utils.app_error import AppErrorWrapper
-from services.models import GeminiInput, GeminiOutput
+from utils.token_bucket import PRIORITY_INTERACTIVE, QuotaExhausted, QuotaManager
+from services.models import GeminiInput, GeminiOutput, MAX_EXPLANATION_WORDS
+from services.quota import GEMINI_BUCKET, get_quota_manager
+
+RATE_LIMIT_BACKOFF = 60.0  # Seconds every process waits after Gemini reports an exhausted quota
+GEMINI_ENDPOINT_ENV = "ALLOUT_GEMINI_ENDPOINT"  # e.g. a local stand-in server for load tests
 
 # Load environment variables once at module level
 load_dotenv()
 
 
 class GeminiLLMClient:
-    def __init__(self):
+    def __init__(self, quota: Optional[QuotaManager] = None, priority: str = PRIORITY_INTERACTIVE):
         """Initialize Gemini client with API key and safety settings."""
         api_key = os.getenv("GEMINI_API_KEY")
         
@@ -27,7 +35,14 @@ class GeminiLLMClient:
                 user_message="GEMINI_API_KEY not found in environment variables."
             )
         
-        genai.configure(api_key=api_key)
+        endpoint = os.getenv(GEMINI_ENDPOINT_ENV)
+        if endpoint:
+            # The REST transport accepts plain-http endpoints; gRPC does not
+            genai.configure(api_key=api_key, transport="rest", client_options={"api_endpoint": endpoint})
+        else:
+            genai.configure(api_key=api_key)
+        self.quota = quota if quota is not None else get_quota_manager()
+        self.priority = priority
         
         # Configure the model with permissive safety thresholds using the correct enum
         safety_settings = {
@@ -46,27 +61,14 @@ class GeminiLLMClient:
         """Generate an AI explanation for the assessment."""
         try:
             prompt = self._build_prompt(gemini_input)
-            
+            self._acquire_quota()
+
             # Call Gemini API with proper exception handling
-            try:
+            with self._api_errors():
                 response = self.model.generate_content(prompt)
-            except google.api_core.exceptions.DeadlineExceeded:
-                raise AppErrorWrapper(
-                    error_code="GEMINI_TIMEOUT",
-                    user_message="Gemini API request timed out. Please try again."
-                )
-            except google.api_core.exceptions.GoogleAPICallError as e:
-                raise AppErrorWrapper(
-                    error_code="GEMINI_API_ERROR",
-                    user_message=f"Gemini API error: {str(e)}"
-                )
             
             # === CHECK 1: Prompt Blocked ===
-            if response.prompt_feedback.block_reason:
-                raise AppErrorWrapper(
-                    error_code="GEMINI_PROMPT_BLOCKED",
-                    user_message=f"Your request was blocked by safety filters. Reason: {response.prompt_feedback.block_reason.name}"
-                )
+            self._check_prompt(response)
             
             # === CHECK 2: Empty Candidates ===
             if not response.candidates:
@@ -120,6 +122,112 @@ class GeminiLLMClient:
                 user_message=f"Unexpected error from Gemini: {str(e)}"
             )
 
+    def stream_explanation(self, gemini_input: GeminiInput) -> Generator[str, None, GeminiOutput]:
+        """
+        Generate the explanation as a stream of text chunks, returning the
+        complete GeminiOutput when the stream ends.
+
+        The checks of get_explanation run as chunks arrive: a blocked prompt
+        fails before any text, and a chunk that finishes for a reason other
+        than STOP (e.g. a mid-stream safety block) or takes the text past the
+        word limit fails as soon as it arrives. Callers must discard the text
+        already received when an error is raised.
+        """
+        try:
+            prompt = self._build_prompt(gemini_input)
+            self._acquire_quota()
+            with self._api_errors():
+                response = self.model.generate_content(prompt, stream=True)
+                chunks = iter(response)
+
+            self._check_prompt(response)
+            explanation, finished = "", False
+            while True:
+                with self._api_errors():
+                    chunk = next(chunks, None)
+                if chunk is None:
+                    break
+                if not chunk.candidates:
+                    continue
+                candidate = chunk.candidates[0]
+                if candidate.finish_reason.name not in ("STOP", "FINISH_REASON_UNSPECIFIED"):
+                    raise AppErrorWrapper(
+                        error_code="GEMINI_RESPONSE_BLOCKED",
+                        user_message=f"Response was blocked by safety filters. Reason: {candidate.finish_reason.name}"
+                    )
+                finished = candidate.finish_reason.name == "STOP"
+                text = "".join(part.text for part in candidate.content.parts)
+                explanation += text
+                # Count on the joined text: a chunk may end mid-word
+                word_count = len(explanation.split())
+                if word_count > MAX_EXPLANATION_WORDS:
+                    raise AppErrorWrapper(
+                        error_code="GEMINI_VALIDATION_ERROR",
+                        user_message=f"Generated explanation failed validation: exceeds {MAX_EXPLANATION_WORDS} words"
+                    )
+                if text:
+                    yield text
+
+            if not explanation.strip():
+                raise AppErrorWrapper(
+                    error_code="GEMINI_EMPTY_RESPONSE",
+                    user_message="Received empty explanation from Gemini."
+                )
+            if not finished:
+                raise AppErrorWrapper(
+                    error_code="GEMINI_INCOMPLETE_RESPONSE",
+                    user_message="The explanation from Gemini ended before it was complete."
+                )
+            return GeminiOutput(explanation=explanation.strip())
+
+        except AppErrorWrapper:
+            raise
+        except Exception as e:
+            raise AppErrorWrapper(
+                error_code="GEMINI_UNEXPECTED_ERROR",
+                user_message=f"Unexpected error from Gemini: {str(e)}"
+            )
+
+    def _acquire_quota(self):
+        """Takes a token from the budget shared with other workers."""
+        try:
+            self.quota.acquire(GEMINI_BUCKET, self.priority)
+        except QuotaExhausted as e:
+            raise AppErrorWrapper(
+                error_code="GEMINI_QUOTA_EXHAUSTED",
+                user_message=f"The Gemini request budget is used up. Please try again in {e.wait:.0f} seconds."
+            )
+
+    @contextmanager
+    def _api_errors(self):
+        """Maps Gemini API exceptions raised in the block to AppErrorWrapper."""
+        try:
+            yield
+        except google.api_core.exceptions.TooManyRequests:  # ResourceExhausted over gRPC, a 429 over REST
+            self.quota.penalize(GEMINI_BUCKET, RATE_LIMIT_BACKOFF)
+            raise AppErrorWrapper(
+                error_code="GEMINI_RATE_LIMITED",
+                user_message="Gemini is rate limiting requests. Please try again shortly."
+            )
+        except google.api_core.exceptions.DeadlineExceeded:
+            raise AppErrorWrapper(
+                error_code="GEMINI_TIMEOUT",
+                user_message="Gemini API request timed out. Please try again."
+            )
+        except google.api_core.exceptions.GoogleAPICallError as e:
+            raise AppErrorWrapper(
+                error_code="GEMINI_API_ERROR",
+                user_message=f"Gemini API error: {str(e)}"
+            )
+
+    @staticmethod
+    def _check_prompt(response):
+        if response.prompt_feedback.block_reason:
+            raise AppErrorWrapper(
+                error_code="GEMINI_PROMPT_BLOCKED",
+                user_message=f"Your request was blocked by safety filters. Reason: {response.prompt_feedback.block_reason.name}"
+            )
+
     def _build_prompt(self, gemini_input: GeminiInput) -> str:
         """Build an enhanced prompt with clothing and practical tips."""
         return f"""You are a helpful outdoor activities safety advisor. 
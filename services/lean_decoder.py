@@ -0,0 +1,81 @@
+"""
+Lean decoding of raw WeatherAPI `forecast.json` bodies.
+
+A single-day assessment reads about a dozen fields, but the body carries 24
+hourly objects of ~30 fields each plus astro data. `decode_first_day` decodes
+only the sub-objects it needs, straight from the raw text, and returns a
+pruned payload with the same shape as the full one. Anything it cannot locate
+raises LeanDecodeError so callers fall back to a full decode.
+
+Full decodes use orjson when it is installed and the standard library otherwise.
+"""
+import json
+import re
+from typing import Any, Dict, Tuple, Union
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up
+    orjson = None
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = re.compile(r"\s*")
+
+# The keys the field plan jumps to. None of them occur inside hour or astro
+# objects ("is_day" and "date_epoch" do not match), so within a single-day
+# payload the first match after "forecastday" is always the day's own key.
+_ANCHORS = {name: re.compile(rf'"{name}"\s*:\s*') for name in ("location", "forecastday", "date", "day", "hour")}
+
+
+class LeanDecodeError(ValueError):
+    """The raw body does not have the layout the field plan expects."""
+
+
+def decode_payload(raw: Union[bytes, str]) -> Any:
+    """Decodes a whole JSON body."""
+    return orjson.loads(raw) if orjson is not None else json.loads(raw)
+
+
+def _find(text: str, name: str, start: int) -> int:
+    match = _ANCHORS[name].search(text, start)
+    if match is None:
+        raise LeanDecodeError(f"'{name}' not found in the forecast payload.")
+    return match.end()
+
+
+def _value_at(text: str, index: int) -> Tuple[Any, int]:
+    try:
+        return _decoder.raw_decode(text, index)
+    except json.JSONDecodeError as e:
+        raise LeanDecodeError(str(e)) from e
+
+
+def decode_first_day(raw: Union[bytes, str]) -> Dict[str, Any]:
+    """
+    Decodes just `location`, and the first forecast day's `date`, `day` and
+    first `hour` object, of a single-day (days=1) `forecast.json` body.
+
+    Returns {"location": ..., "forecast": {"forecastday": [{"date", "day", "hour": [first hour]}]}},
+    with an empty `forecastday` list when the payload has no forecast days.
+    """
+    text = raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw
+    location, _ = _value_at(text, _find(text, "location", 0))
+
+    days_start = _find(text, "forecastday", 0)
+    if not text.startswith("[", days_start):
+        raise LeanDecodeError("'forecastday' is not a list.")
+    if text.startswith("]", _WHITESPACE.match(text, days_start + 1).end()):
+        return {"location": location, "forecast": {"forecastday": []}}
+
+    date, _ = _value_at(text, _find(text, "date", days_start))
+    day, _ = _value_at(text, _find(text, "day", days_start))
+    hours_start = _find(text, "hour", days_start)
+    if not text.startswith("[", hours_start):
+        raise LeanDecodeError("'hour' is not a list.")
+    first_hour_start = _WHITESPACE.match(text, hours_start + 1).end()
+    hours = [] if text.startswith("]", first_hour_start) else [_value_at(text, first_hour_start)[0]]
+
+    return {
+        "location": location,
+        "forecast": {"forecastday": [{"date": date, "day": day, "hour": hours}]},
+    }
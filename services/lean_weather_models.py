@@ -1,11 +1,15 @@
-from pydantic import BaseModel
-from typing import List
+from pydantic import BaseModel, ConfigDict
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 
 # FIX: Define Location here instead of importing it
 class Location(BaseModel):
     name: str
     region: str
     country: str
+    lat: Optional[float] = None  # Resolved coordinates, when the API returns them
+    lon: Optional[float] = None
 
 class LeanCurrent(BaseModel):
     temp_c: float
@@ -29,4 +33,78 @@ class LeanForecast(BaseModel):
 class LeanWeatherApiResponse(BaseModel):
     location: Location
     current: LeanCurrent
-    forecast: LeanForecast
\ No newline at end of file
+    forecast: LeanForecast
+
+# Hourly fields kept for hourly assessments, as (model field, WeatherAPI hour key)
+HOURLY_FIELDS = (
+    ("temp_c", "temp_c"),
+    ("feelslike_c", "feelslike_c"),
+    ("wind_mph", "wind_mph"),
+    ("precip_mm", "precip_mm"),
+    ("uv", "uv"),
+    ("chance_of_rain", "chance_of_rain"),
+)
+
+
+class LeanHourlySeries(BaseModel):
+    """All hourly records of one forecast day, stored as compact float arrays (NaN = missing)."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    date: str
+    time: List[str]
+    temp_c: np.ndarray
+    feelslike_c: np.ndarray
+    wind_mph: np.ndarray
+    precip_mm: np.ndarray
+    uv: np.ndarray
+    chance_of_rain: np.ndarray
+
+    @classmethod
+    def from_hours(cls, date: str, hours: List[Dict[str, Any]]) -> "LeanHourlySeries":
+        """Builds the series from WeatherAPI `forecastday[i]["hour"]` records."""
+        columns = {
+            field: np.array([np.nan if hour.get(key) is None else hour[key] for hour in hours], dtype=np.float64)
+            for field, key in HOURLY_FIELDS
+        }
+        return cls(date=date, time=[hour.get("time", "") for hour in hours], **columns)
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+
+class LeanHourlyWeatherResponse(BaseModel):
+    """A forecast response together with the full hourly series of its first day."""
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    weather: LeanWeatherApiResponse
+    hourly: LeanHourlySeries
+
+
+
+class LeanForecastRange(BaseModel):
+    """A multi-day forecast: daily summaries plus the hourly series of every day."""
+    location: Location
+    daily: List[LeanForecastDay]
+    hourly: List[LeanHourlySeries]
+
+    @classmethod
+    def from_payload(cls, data: Dict[str, Any]) -> "LeanForecastRange":
+        """Builds the range from a raw `forecast.json` payload."""
+        forecast_days = data["forecast"]["forecastday"]
+        return cls(
+            location=data["location"],
+            daily=forecast_days,
+            hourly=[LeanHourlySeries.from_hours(day["date"], day.get("hour") or []) for day in forecast_days]
+        )
+
+    @property
+    def dates(self) -> List[str]:
+        return [day.date for day in self.daily]
+
+    def hourly_matrix(self, field: str, hours: int = 24) -> np.ndarray:
+        """Stacks one hourly field into a (days, hours) array, NaN-padding short days."""
+        matrix = np.full((len(self.hourly), hours), np.nan)
+        for i, series in enumerate(self.hourly):
+            values = getattr(series, field)[:hours]
+            matrix[i, :len(values)] = values
+        return matrix
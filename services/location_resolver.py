@@ -0,0 +1,240 @@
+"""
+Canonical location resolution.
+
+Free-text input such as "coventry", "Coventry, UK" and "Coventry West Midlands"
+names one place, but as raw strings the three never share a cache entry or a
+coalesced fetch. The resolver maps input to a canonical key: WeatherAPI's
+resolved name/region/country, or rounded lat/lon for coordinate input.
+
+Keys come from an alias table learned from past responses (in memory, backed
+by SQLite so it survives restarts) and from an optional offline gazetteer
+(data/gazetteer.csv). Repeat lookups are a normalization plus a dict lookup.
+"""
+import csv
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple, Union
+
+from utils.geo import format_coordinates
+from .lean_weather_models import Location
+
+logger = logging.getLogger(__name__)
+
+ALIASES_FILE_ENV = "ALLOUT_LOCATION_ALIASES_FILE"
+GAZETTEER_FILE_ENV = "ALLOUT_GAZETTEER_FILE"
+DATA_DIR = Path(__file__).parent.parent / "data"
+DEFAULT_ALIASES_FILE = DATA_DIR / "location_aliases.sqlite3"
+DEFAULT_GAZETTEER_FILE = DATA_DIR / "gazetteer.csv"
+
+COORDINATE_DECIMALS = 3  # ~100 m; far finer than the forecast grid
+
+# Alternative spellings of countries, used when expanding gazetteer entries
+COUNTRY_ALIASES: Dict[str, tuple] = {
+    "united kingdom": ("uk", "gb", "great britain", "britain", "england", "scotland", "wales", "northern ireland"),
+    "united states of america": ("usa", "us", "united states"),
+}
+
+_PUNCTUATION = re.compile(r"[^\w\s.+-]|(?<!\d)\.|\.(?!\d)")
+_COORDINATES = re.compile(r"^\s*([+-]?\d{1,2}(?:\.\d+)?)\s*,\s*([+-]?\d{1,3}(?:\.\d+)?)\s*$")
+
+
+class ResolvedLocation(NamedTuple):
+    key: str    # Canonical cache key
+    query: str  # What to send to WeatherAPI as `q`
+
+    @property
+    def coordinates(self) -> Optional[Tuple[float, float]]:
+        """(lat, lon) when the query is a coordinate pair, else None."""
+        match = _COORDINATES.match(self.query)
+        return (float(match[1]), float(match[2])) if match else None
+
+
+def normalize_query(text: str) -> str:
+    """Casefolds, drops punctuation and collapses whitespace ("Coventry, UK" -> "coventry uk")."""
+    return " ".join(_PUNCTUATION.sub(" ", text.casefold()).split())
+
+
+def canonical_key(location: Location) -> str:
+    """'name|region|country' of a resolved location, or its rounded lat/lon when unnamed."""
+    if location.name:
+        return "|".join(" ".join(part.split()).casefold() for part in (location.name, location.region, location.country))
+    if location.lat is not None and location.lon is not None:
+        return coordinate_key(location.lat, location.lon)
+    raise ValueError("A location needs a name or coordinates to have a canonical key.")
+
+
+def coordinate_key(lat: float, lon: float) -> str:
+    return f"@{round(lat, COORDINATE_DECIMALS):.{COORDINATE_DECIMALS}f},{round(lon, COORDINATE_DECIMALS):.{COORDINATE_DECIMALS}f}"
+
+
+def _query_for(location: Location, fallback: str) -> str:
+    # Coordinates are unambiguous; a place name may match several places
+    if location.lat is not None and location.lon is not None:
+        return format_coordinates(location.lat, location.lon)
+    return fallback
+
+
+class Gazetteer:
+    """
+    Offline index of well-known places. Each place is reachable by its name
+    alone and combined with its region and/or country (including common
+    country aliases), so "leeds", "leeds uk" and "leeds west yorkshire" agree.
+    """
+
+    def __init__(self, locations: Iterable[Location] = ()):
+        self._index: Dict[str, ResolvedLocation] = {}
+        for location in locations:
+            self.add(location)
+
+    @classmethod
+    def from_csv(cls, path: Union[str, Path]) -> "Gazetteer":
+        """Loads a CSV with name, region, country, lat and lon columns."""
+        with open(path, newline="", encoding="utf-8") as f:
+            return cls(
+                Location(name=row["name"], region=row["region"], country=row["country"],
+                         lat=float(row["lat"]), lon=float(row["lon"]))
+                for row in csv.DictReader(f)
+            )
+
+    def add(self, location: Location):
+        resolved = ResolvedLocation(canonical_key(location), _query_for(location, location.name))
+        name = normalize_query(location.name)
+        regions = ("", normalize_query(location.region))
+        country = normalize_query(location.country)
+        countries = ("", country) + COUNTRY_ALIASES.get(country, ())
+        for region in regions:
+            for country_name in countries:
+                variant = " ".join(part for part in (name, region, country_name) if part)
+                self._index.setdefault(variant, resolved)  # The first place listed wins a shared name
+
+    def lookup(self, normalized: str) -> Optional[ResolvedLocation]:
+        return self._index.get(normalized)
+
+    def __len__(self):
+        return len(self._index)
+
+
+class LocationResolver:
+    """
+    Maps free-text locations to canonical keys.
+
+    Learned aliases take precedence over the gazetteer, since they record what
+    WeatherAPI actually returned. Unknown input resolves to its normalized form
+    until a response teaches the resolver where it points. Without `path` the
+    alias table is memory only.
+    """
+
+    def __init__(self, path: Optional[Union[str, Path]] = None, gazetteer: Optional[Gazetteer] = None):
+        self.path = Path(path) if path else None
+        self.gazetteer = gazetteer
+        self._aliases: Dict[str, ResolvedLocation] = {}
+        self._lock = threading.Lock()
+        self._counters = dict.fromkeys(("alias_hits", "gazetteer_hits", "coordinate_hits", "unresolved", "learned"), 0)
+        self._db = self._open_db() if self.path else None
+
+    def _open_db(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS aliases ("
+            "alias TEXT PRIMARY KEY, key TEXT NOT NULL, query TEXT NOT NULL, updated_at REAL NOT NULL)"
+        )
+        for alias, key, query in db.execute("SELECT alias, key, query FROM aliases"):
+            self._aliases[alias] = ResolvedLocation(key, query)
+        return db
+
+    def resolve(self, text: str) -> ResolvedLocation:
+        """Canonical key and API query for `text`; never touches the network."""
+        match = _COORDINATES.match(text)
+        if match:
+            self._counters["coordinate_hits"] += 1
+            return ResolvedLocation(coordinate_key(float(match[1]), float(match[2])), text.strip())
+
+        normalized = normalize_query(text)
+        resolved = self._aliases.get(normalized)
+        if resolved is None and self._db is not None:
+            resolved = self._load_alias(normalized)  # Another process may have learned it
+        if resolved is not None:
+            self._counters["alias_hits"] += 1
+            return resolved
+        if self.gazetteer is not None:
+            resolved = self.gazetteer.lookup(normalized)
+            if resolved is not None:
+                self._counters["gazetteer_hits"] += 1
+                return resolved
+        self._counters["unresolved"] += 1
+        return ResolvedLocation(normalized, text.strip())
+
+    def _load_alias(self, normalized: str) -> Optional[ResolvedLocation]:
+        with self._lock:
+            row = self._db.execute("SELECT key, query FROM aliases WHERE alias = ?", (normalized,)).fetchone()
+            if row is None:
+                return None
+            resolved = self._aliases[normalized] = ResolvedLocation(*row)
+            return resolved
+
+    def learn(self, text: str, location: Location) -> str:
+        """
+        Records that `text` resolved to `location` and returns the key that
+        `resolve(text)` will give from now on. Coordinate input keeps its
+        coordinate key.
+        """
+        if _COORDINATES.match(text):
+            return self.resolve(text).key
+        normalized = normalize_query(text)
+        resolved = ResolvedLocation(canonical_key(location), _query_for(location, text.strip()))
+        with self._lock:
+            if self._aliases.get(normalized) == resolved:
+                return resolved.key
+            self._aliases[normalized] = resolved
+            self._counters["learned"] += 1
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO aliases (alias, key, query, updated_at) VALUES (?, ?, ?, ?)",
+                    (normalized, resolved.key, resolved.query, time.time())
+                )
+        return resolved.key
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, int]:
+        stats = dict(self._counters)
+        stats["aliases"] = len(self._aliases)
+        stats["gazetteer_entries"] = len(self.gazetteer) if self.gazetteer is not None else 0
+        return stats
+
+
+_resolver: Optional[LocationResolver] = None
+
+
+def get_location_resolver() -> LocationResolver:
+    """
+    The process-wide resolver. Aliases persist in `ALLOUT_LOCATION_ALIASES_FILE`
+    or data/location_aliases.sqlite3 (memory only if it cannot be opened); the
+    gazetteer is `ALLOUT_GAZETTEER_FILE` or the bundled data/gazetteer.csv.
+    """
+    global _resolver
+    if _resolver is None:
+        gazetteer_path = os.getenv(GAZETTEER_FILE_ENV) or DEFAULT_GAZETTEER_FILE
+        try:
+            gazetteer = Gazetteer.from_csv(gazetteer_path)
+        except (OSError, KeyError, ValueError) as e:
+            logger.debug("Gazetteer unavailable (%s); resolving from learned aliases only", e)
+            gazetteer = None
+        path = os.getenv(ALIASES_FILE_ENV) or DEFAULT_ALIASES_FILE
+        try:
+            _resolver = LocationResolver(path, gazetteer)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug("Location alias table unavailable (%s); using memory only", e)
+            _resolver = LocationResolver(gazetteer=gazetteer)
+    return _resolver
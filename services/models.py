@@ -71,15 +71,19 @@ class GeminiInput(BaseModel):
     heuristic_output: HeuristicOutput
 
 
+MAX_EXPLANATION_WORDS = 350
+
+
 class GeminiOutput(BaseModel):
     explanation: str
+    source: str = "gemini"  # "template" when built locally instead (see explanation_templates)
 
     @field_validator('explanation')
     @classmethod
     def word_count_must_be_under_limit(cls, v):
         word_count = len(v.split())
-        if word_count > 350:  
-            raise ValueError(f"Explanation exceeds 350 words (count: {word_count})")
+        if word_count > MAX_EXPLANATION_WORDS:
+            raise ValueError(f"Explanation exceeds {MAX_EXPLANATION_WORDS} words (count: {word_count})")
         return v
 
 
@@ -0,0 +1,58 @@
+"""
+Process-shared request budgets for WeatherAPI and Gemini.
+
+Every Streamlit worker and batch job on one machine draws from the same token
+buckets (see utils/token_bucket.py), so together they stay under the provider
+limits instead of discovering them through 429s. Interactive calls have a
+reserved share of each bucket that batch traffic cannot use.
+"""
+import logging
+import os
+import sqlite3
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.token_bucket import BucketConfig, QuotaManager
+
+logger = logging.getLogger(__name__)
+
+QUOTA_FILE_ENV = "ALLOUT_QUOTA_FILE"
+DEFAULT_QUOTA_FILE = Path(__file__).parent.parent / "data" / "quota.sqlite3"
+
+WEATHERAPI_BUCKET = "weatherapi"
+GEMINI_BUCKET = "gemini"
+
+# Requests per minute and bursts, overridable per deployment plan
+DEFAULT_LIMITS = {
+    WEATHERAPI_BUCKET: ("ALLOUT_WEATHERAPI_RPM", 600, 30),
+    GEMINI_BUCKET: ("ALLOUT_GEMINI_RPM", 10, 5),
+}
+INTERACTIVE_RESERVE = 0.3  # Share of each burst kept for interactive calls
+
+
+def default_buckets() -> Dict[str, BucketConfig]:
+    """Bucket settings from `ALLOUT_WEATHERAPI_RPM` / `ALLOUT_GEMINI_RPM`, or the defaults."""
+    buckets = {}
+    for name, (env, rpm, burst) in DEFAULT_LIMITS.items():
+        rpm = float(os.getenv(env) or rpm)
+        buckets[name] = BucketConfig(rate=rpm / 60, capacity=max(1, min(burst, rpm)), reserve=INTERACTIVE_RESERVE)
+    return buckets
+
+
+_quota_manager: Optional[QuotaManager] = None
+
+
+def get_quota_manager() -> QuotaManager:
+    """
+    The process-wide quota manager. Its SQLite file is `ALLOUT_QUOTA_FILE` or
+    data/quota.sqlite3; if the file cannot be opened, the budget is per process.
+    """
+    global _quota_manager
+    if _quota_manager is None:
+        path = os.getenv(QUOTA_FILE_ENV) or DEFAULT_QUOTA_FILE
+        try:
+            _quota_manager = QuotaManager(default_buckets(), path)
+        except (sqlite3.Error, OSError) as e:
+            logger.debug("Shared quota file unavailable (%s); budgeting this process only", e)
+            _quota_manager = QuotaManager(default_buckets())
+    return _quota_manager
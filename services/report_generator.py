@@ -25,3 +25,83 @@ def generate_report(
         ai_explanation=ai_explanation
     )
     return report
+
+
+# --- TXT Export (Story 5.2) ---
+def format_report_as_text(report: AssessmentReport) -> str:
+    """
+    Formats an AssessmentReport as a human-readable text string.
+    
+    Args:
+        report: The AssessmentReport to format
+        
+    Returns:
+        A formatted string suitable for TXT export
+    """
+    lines = []
+    lines.append("=" * 70)
+    lines.append("ALLOUT - OUTDOOR SAFETY ASSESSMENT REPORT")
+    lines.append("=" * 70)
+    lines.append("")
+    
+    # Header Information
+    lines.append(f"Location: {report.location_name}")
+    lines.append(f"Assessment Date: {report.assessment_date}")
+    lines.append(f"Generated: {report.assessment_timestamp_utc}")
+    lines.append(f"Report ID: {report.report_id}")
+    lines.append("")
+    
+    # Weather Conditions
+    lines.append("-" * 70)
+    lines.append("CURRENT WEATHER CONDITIONS")
+    lines.append("-" * 70)
+    current = report.weather_data.current
+    lines.append(f"Temperature: {current.temp_c}°C (Feels like: {current.feelslike_c}°C)")
+    lines.append(f"Wind Speed: {current.wind_mph} mph")
+    lines.append(f"Precipitation: {current.precip_mm} mm")
+    lines.append(f"UV Index: {current.uv}")
+    lines.append("")
+    
+    # Forecast
+    forecast_day = report.weather_data.forecast.forecastday[0]
+    lines.append(f"Daily Chance of Rain: {forecast_day.day.daily_chance_of_rain}%")
+    lines.append(f"Temperature Range: {forecast_day.day.mintemp_c}°C - {forecast_day.day.maxtemp_c}°C")
+    lines.append("")
+    
+    # Heuristic Decision
+    lines.append("-" * 70)
+    lines.append("HEURISTIC ANALYSIS")
+    lines.append("-" * 70)
+    heuristic = report.heuristic_output
+    lines.append(f"Decision: {heuristic.decision}")
+    
+    if heuristic.weighted_score is not None:
+        lines.append(f"Safety Score: {heuristic.weighted_score:.1f}/100")
+    
+    if heuristic.hard_stop_reasons:
+        lines.append("\nHard Stop Warnings:")
+        for reason in heuristic.hard_stop_reasons:
+            lines.append(f"  ⚠️  {reason}")
+    
+    if heuristic.reasons:
+        lines.append("\nReasoning:")
+        for reason in heuristic.reasons:
+            lines.append(f"  • {reason}")
+    
+    if heuristic.notes:
+        lines.append(f"\nNotes: {heuristic.notes}")
+    
+    lines.append("")
+    
+    # AI Explanation
+    lines.append("-" * 70)
+    lines.append("AI ANALYSIS")
+    lines.append("-" * 70)
+    lines.append(report.ai_explanation.explanation)
+    lines.append("")
+    
+    lines.append("=" * 70)
+    lines.append("End of Report")
+    lines.append("=" * 70)
+    
+    return "\n".join(lines)
@@ -0,0 +1,227 @@
+"""
+Route/trail assessment along a GPX or GeoJSON track.
+
+The track is sampled at a fixed spacing, nearby samples are snapped onto a
+shared grid so they share one forecast, every unique (cell, date) forecast is
+fetched concurrently, and each segment is scored at its expected arrival hour
+in a single batch-engine pass.
+"""
+import json
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from pydantic import BaseModel
+
+from engine.batch_engine import run_heuristic_engine_batch, DECISIONS
+from utils.app_error import AppErrorWrapper
+from utils.geo import haversine_km, snap_to_grid, format_coordinates
+from .lean_weather_models import LeanHourlyWeatherResponse
+
+# Worst decision wins when combining segments into a route decision
+ROUTE_SEVERITY = {"GO": 0, "MAYBE": 1, "NO DATA": 2, "INSUFFICIENT DATA": 2, "NO-GO": 3}
+
+
+class TrackPoint(BaseModel):
+    lat: float
+    lon: float
+
+
+class RouteWaypoint(BaseModel):
+    """A sampled point along the route and how far into the route it is."""
+    lat: float
+    lon: float
+    distance_km: float
+
+
+class RouteSegment(BaseModel):
+    """The assessment of one route segment at its expected arrival time."""
+    index: int
+    lat: float
+    lon: float
+    distance_km: float
+    arrival_time: str
+    grid_cell: str
+    location_name: str
+    decision: str
+    weighted_score: Optional[float] = None
+    hard_stop_reasons: List[str] = []
+
+
+class RouteAssessment(BaseModel):
+    """Per-segment decision strip plus the overall route decision."""
+    segments: List[RouteSegment]
+    overall_decision: str
+    total_distance_km: float
+    fetch_count: int  # Unique forecasts fetched after grid deduplication
+
+
+# --- Track parsing ---
+
+def _gpx_points(text: str) -> List[TrackPoint]:
+    root = ET.fromstring(text)
+    # Track points first, then route points, then plain waypoints; namespaces vary by GPX version
+    for tag in ("trkpt", "rtept", "wpt"):
+        points = [el for el in root.iter() if el.tag.rsplit("}", 1)[-1] == tag]
+        if points:
+            return [TrackPoint(lat=float(p.get("lat")), lon=float(p.get("lon"))) for p in points]
+    return []
+
+
+def _geojson_points(data: dict) -> List[TrackPoint]:
+    kind = data.get("type")
+    if kind == "FeatureCollection":
+        return [p for feature in data.get("features", []) for p in _geojson_points(feature)]
+    if kind == "Feature":
+        return _geojson_points(data.get("geometry") or {})
+    coordinates = data.get("coordinates") or []
+    if kind == "LineString":
+        lines = [coordinates]
+    elif kind == "MultiLineString":
+        lines = coordinates
+    elif kind == "Point":
+        lines = [[coordinates]]
+    else:
+        return []
+    # GeoJSON positions are [lon, lat(, elevation)]
+    return [TrackPoint(lat=position[1], lon=position[0]) for line in lines for position in line]
+
+
+def parse_track(content, filename: str = "") -> List[TrackPoint]:
+    """
+    Parses a GPX or GeoJSON track into its points, in order.
+
+    The format is taken from the file extension, falling back to sniffing the content.
+    """
+    text = content.decode("utf-8-sig") if isinstance(content, bytes) else content
+    try:
+        if filename.lower().endswith(".gpx") or text.lstrip().startswith("<"):
+            points = _gpx_points(text)
+        else:
+            points = _geojson_points(json.loads(text))
+    except (ET.ParseError, json.JSONDecodeError, TypeError, ValueError, IndexError) as e:
+        raise AppErrorWrapper(
+            error_code="ROUTE_TRACK_INVALID",
+            user_message=f"Could not read the route file: {e}"
+        ) from e
+    if not points:
+        raise AppErrorWrapper(
+            error_code="ROUTE_TRACK_EMPTY",
+            user_message="The route file does not contain any track points."
+        )
+    return points
+
+
+# --- Sampling ---
+
+def sample_waypoints(points: List[TrackPoint], spacing_km: float) -> List[RouteWaypoint]:
+    """
+    Samples the track every `spacing_km` kilometres, always keeping the start and end.
+    """
+    if spacing_km <= 0:
+        raise ValueError("Waypoint spacing must be positive.")
+    waypoints = [RouteWaypoint(lat=points[0].lat, lon=points[0].lon, distance_km=0.0)]
+    travelled = 0.0
+    next_mark = spacing_km
+    for prev, point in zip(points, points[1:]):
+        step = haversine_km(prev.lat, prev.lon, point.lat, point.lon)
+        # Interpolate every sampling mark that falls on this leg
+        while step > 0 and travelled + step >= next_mark:
+            fraction = (next_mark - travelled) / step
+            waypoints.append(RouteWaypoint(
+                lat=prev.lat + (point.lat - prev.lat) * fraction,
+                lon=prev.lon + (point.lon - prev.lon) * fraction,
+                distance_km=next_mark
+            ))
+            next_mark += spacing_km
+        travelled += step
+    if travelled - waypoints[-1].distance_km > 1e-6:
+        waypoints.append(RouteWaypoint(lat=points[-1].lat, lon=points[-1].lon, distance_km=travelled))
+    return waypoints
+
+
+# --- Assessment ---
+
+def _hour_index(hourly_times: List[str], arrival: datetime) -> int:
+    """Index of the hourly record covering the arrival time (records are 'YYYY-MM-DD HH:00')."""
+    key = arrival.strftime("%Y-%m-%d %H:00")
+    try:
+        return hourly_times.index(key)
+    except ValueError:
+        return min(arrival.hour, len(hourly_times) - 1)
+
+
+def _overall_decision(decisions: List[str]) -> str:
+    worst = max(decisions, key=lambda d: ROUTE_SEVERITY[d])
+    return "INSUFFICIENT DATA" if worst == "NO DATA" else worst
+
+
+def assess_route(
+    weather_client,
+    points: List[TrackPoint],
+    start_time: datetime,
+    speed_kmh: float = 5.0,
+    spacing_km: float = 2.0,
+    grid_deg: float = 0.05,
+    max_workers: int = 16,
+) -> RouteAssessment:
+    """
+    Scores a route segment by segment at the hour each one is expected to be reached.
+
+    `weather_client` needs `get_hourly_weather_data(location, date)`. Waypoints
+    snapped into the same `grid_deg` cell on the same date share one fetch, and
+    all fetches run concurrently, so the route takes about as long as the slowest
+    single request.
+    """
+    if speed_kmh <= 0:
+        raise ValueError("Travel speed must be positive.")
+    waypoints = sample_waypoints(points, spacing_km)
+
+    # 1. Expected arrival time and shared grid cell for every waypoint
+    plan: List[Tuple[RouteWaypoint, datetime, Tuple[str, str]]] = []
+    for waypoint in waypoints:
+        arrival = start_time + timedelta(hours=waypoint.distance_km / speed_kmh)
+        cell = format_coordinates(*snap_to_grid(waypoint.lat, waypoint.lon, grid_deg))
+        plan.append((waypoint, arrival, (cell, arrival.strftime("%Y-%m-%d"))))
+
+    # 2. One concurrent fetch per unique (cell, date)
+    fetch_keys = list(dict.fromkeys(key for _, _, key in plan))
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(fetch_keys)))) as pool:
+        futures = {key: pool.submit(weather_client.get_hourly_weather_data, key[0], key[1]) for key in fetch_keys}
+        forecasts: Dict[Tuple[str, str], LeanHourlyWeatherResponse] = {key: f.result() for key, f in futures.items()}
+
+    # 3. Gather each segment's arrival hour and score them all in one pass
+    columns = {field: np.empty(len(plan)) for field in ("wind_mph", "feelslike_c", "chance_of_rain", "precip_mm", "uv")}
+    for i, (_, arrival, key) in enumerate(plan):
+        hourly = forecasts[key].hourly
+        hour = _hour_index(hourly.time, arrival) if len(hourly) else None
+        for field, column in columns.items():
+            column[i] = getattr(hourly, field)[hour] if hour is not None else np.nan
+    results = run_heuristic_engine_batch(
+        columns["wind_mph"], columns["feelslike_c"], columns["chance_of_rain"], columns["precip_mm"], columns["uv"]
+    )
+
+    segments = []
+    for i, (waypoint, arrival, key) in enumerate(plan):
+        output = results.to_output(i)
+        segments.append(RouteSegment(
+            index=i,
+            lat=waypoint.lat,
+            lon=waypoint.lon,
+            distance_km=round(waypoint.distance_km, 3),
+            arrival_time=arrival.strftime("%Y-%m-%d %H:%M"),
+            grid_cell=key[0],
+            location_name=forecasts[key].weather.location.name,
+            decision=output.decision,
+            weighted_score=output.weighted_score,
+            hard_stop_reasons=output.hard_stop_reasons
+        ))
+
+    return RouteAssessment(
+        segments=segments,
+        overall_decision=_overall_decision([DECISIONS[code] for code in results.decision_codes]),
+        total_distance_km=round(waypoints[-1].distance_km, 3),
+        fetch_count=len(fetch_keys)
+    )
@@ -1,17 +1,82 @@
+import logging
 import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Sequence, Union
+
 import requests
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from pydantic import ValidationError
 
 # FIX: Import the new lean model instead of the old one
-from .lean_weather_models import LeanWeatherApiResponse
+from .lean_decoder import decode_first_day, decode_payload, LeanDecodeError
+from .lean_weather_models import LeanWeatherApiResponse, LeanHourlySeries, LeanHourlyWeatherResponse, LeanForecastRange
+from .quota import WEATHERAPI_BUCKET, get_quota_manager
 from utils.app_error import AppErrorWrapper
+from utils.token_bucket import PRIORITY_INTERACTIVE, QuotaExhausted, QuotaManager
+
+logger = logging.getLogger(__name__)
+
+# Connection pooling and retry defaults
+DEFAULT_POOL_SIZE = 10
+DEFAULT_MAX_RETRIES = 2       # Retries after the first attempt, for 5xx, timeouts and dropped connections
+DEFAULT_BACKOFF_BASE = 0.25   # Seconds; attempt n waits up to base * 2**n ("full jitter")
+DEFAULT_BACKOFF_CAP = 4.0
+DEFAULT_TIMEOUT = 10
+DEFAULT_RETRY_AFTER = 60.0   # Seconds to back off after a 429 without a Retry-After header
+BULK_LIMIT = 50              # Most locations WeatherAPI accepts in one bulk request
+
+_shared_sessions: Dict[int, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def build_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """A Session whose adapter keeps up to `pool_size` keep-alive connections per host."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def get_shared_session(pool_size: int = DEFAULT_POOL_SIZE) -> requests.Session:
+    """
+    The process-wide pooled session for `pool_size`.
+
+    Clients are created per assessment, so sharing the session is what lets
+    one request reuse the TCP connection of the last.
+    """
+    with _sessions_lock:
+        session = _shared_sessions.get(pool_size)
+        if session is None:
+            session = _shared_sessions[pool_size] = build_session(pool_size)
+        return session
+
+
+def _retry_after(response: requests.Response) -> float:
+    try:
+        return float(response.headers.get("Retry-After", DEFAULT_RETRY_AFTER))
+    except ValueError:  # An HTTP date; not worth parsing
+        return DEFAULT_RETRY_AFTER
 
 
 class WeatherApiClient:
     BASE_URL = "http://api.weatherapi.com/v1"
+    MAX_FORECAST_DAYS = 14  # Longest horizon forecast.json serves in one call
 
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        timeout: float = DEFAULT_TIMEOUT,
+        quota: Optional[QuotaManager] = None,
+        priority: str = PRIORITY_INTERACTIVE,
+    ):
         load_dotenv()
         self.api_key = os.getenv("WEATHERAPI_KEY")
         if not self.api_key:
@@ -19,62 +84,239 @@ class WeatherApiClient:
                 error_code="WEATHERAPI_KEY_MISSING",
                 user_message="WeatherAPI key is not configured. Please set WEATHERAPI_KEY in your .env file."
             )
+        self.session = session or get_shared_session(pool_size)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.timeout = timeout
+        self.quota = quota if quota is not None else get_quota_manager()
+        self.priority = priority
 
-    def get_weather_data(self, location: str, date: str = None) -> LeanWeatherApiResponse: # FIX: Update the return type hint
+    def get_weather_data(
+        self, location: str, date: str = None, deadline: Optional[float] = None
+    ) -> LeanWeatherApiResponse: # FIX: Update the return type hint
         """
         Fetches weather data from the WeatherAPI.
         Extracts current weather from the first hour of the forecast.
+        `deadline` (seconds) caps the call, quota wait and retries included.
+        """
+        with self._map_errors():
+            raw = self._fetch_forecast_bytes(location, date, deadline=deadline)
+            try:
+                # Only the dozen fields the lean model reads are decoded
+                data = decode_first_day(raw)
+            except LeanDecodeError:
+                data = decode_payload(raw)
+            self._check_forecast(data)
+            return self._parse_weather_data(data)
+
+    def get_weather_data_bulk(
+        self, locations: Sequence[str], date: str = None, return_exceptions: bool = False
+    ) -> List[Union[LeanWeatherApiResponse, AppErrorWrapper]]:
+        """
+        `get_weather_data` for many locations, packing up to BULK_LIMIT of them
+        into each bulk POST. Results come back in input order.
+
+        Locations the bulk response does not answer cleanly (a failed bulk call,
+        an item error, a missing or malformed item) are fetched again one by
+        one. With `return_exceptions`, errors from those requests are returned
+        in place of results instead of raised.
+        """
+        results: List[Union[LeanWeatherApiResponse, AppErrorWrapper, None]] = [None] * len(locations)
+        retry = []
+        for start in range(0, len(locations), BULK_LIMIT):
+            chunk = locations[start:start + BULK_LIMIT]
+            items = self._fetch_bulk(chunk, date)
+            for offset in range(len(chunk)):
+                results[start + offset] = self._parse_bulk_item(items.get(str(offset)))
+                if results[start + offset] is None:
+                    retry.append(start + offset)
+
+        if retry:
+            logger.debug("Bulk request left %s of %s locations; fetching them individually", len(retry), len(locations))
+        for index in retry:
+            try:
+                results[index] = self.get_weather_data(locations[index], date)
+            except AppErrorWrapper as e:
+                if not return_exceptions:
+                    raise
+                results[index] = e
+        return results
+
+    def _fetch_bulk(self, locations: Sequence[str], date: str = None) -> Dict[str, dict]:
+        """POSTs one bulk forecast request; returns the successful items by custom_id, or {} if the call fails."""
+        params = {"key": self.api_key, "q": "bulk", "days": 1, "aqi": "no"}
+        if date:
+            params["dt"] = date
+        body = {"locations": [{"q": location, "custom_id": str(i)} for i, location in enumerate(locations)]}
+        try:
+            with self._map_errors():
+                response = self._request(
+                    "POST", f"{self.BASE_URL}/forecast.json", params, body, retry=False, cost=len(locations)
+                )
+                data = decode_payload(response.content)
+        except AppErrorWrapper as e:
+            logger.debug("Bulk request failed (%s)", e.error_code)
+            return {}
+
+        items = {}
+        entries = (data.get("bulk") or []) if isinstance(data, dict) else []
+        for entry in entries:
+            query = entry.get("query") if isinstance(entry, dict) else None
+            if isinstance(query, dict) and "custom_id" in query and "error" not in query:
+                items[str(query["custom_id"])] = query
+        return items
+
+    def _parse_bulk_item(self, item: Optional[dict]) -> Optional[LeanWeatherApiResponse]:
+        """A bulk item carries `location` and `forecast` like a single response; None if it is unusable."""
+        if item is None:
+            return None
+        try:
+            with self._map_errors():
+                self._check_forecast(item)
+                return self._parse_weather_data(item)
+        except AppErrorWrapper:
+            return None
+
+    def get_hourly_weather_data(self, location: str, date: str = None) -> LeanHourlyWeatherResponse:
+        """
+        Fetches weather data and keeps every hourly record of the forecast day.
+        Uses the same single request as `get_weather_data`.
+        """
+        with self._map_errors():
+            data = self._fetch_forecast(location, date)
+            forecast_day = data["forecast"]["forecastday"][0]
+            return LeanHourlyWeatherResponse(
+                weather=self._parse_weather_data(data),
+                hourly=LeanHourlySeries.from_hours(forecast_day["date"], forecast_day.get("hour") or [])
+            )
+
+    def get_forecast_range(self, location: str, days: int = MAX_FORECAST_DAYS) -> LeanForecastRange:
+        """
+        Fetches up to 14 days of forecast, with every hourly record, in a single request.
         """
+        if not 1 <= days <= self.MAX_FORECAST_DAYS:
+            raise AppErrorWrapper(
+                error_code="WEATHERAPI_INVALID_RANGE",
+                user_message=f"Forecast range must be between 1 and {self.MAX_FORECAST_DAYS} days."
+            )
+        with self._map_errors():
+            data = self._fetch_forecast(location, days=days)
+            return LeanForecastRange.from_payload(data)
+
+    def _fetch_forecast(self, location: str, date: str = None, days: int = 1) -> dict:
+        """Requests `forecast.json` and returns the decoded payload."""
+        data = decode_payload(self._fetch_forecast_bytes(location, date, days))
+        self._check_forecast(data)
+        return data
+
+    def _fetch_forecast_bytes(
+        self, location: str, date: str = None, days: int = 1, deadline: Optional[float] = None
+    ) -> bytes:
+        """Requests `forecast.json` and returns the raw response body."""
         params = {
             "key": self.api_key,
             "q": location,
-            "days": 1,
+            "days": days,
             "aqi": "no"
         }
         if date:
             params["dt"] = date
 
+        return self._get(f"{self.BASE_URL}/forecast.json", params, deadline).content
+
+    @staticmethod
+    def _check_forecast(data: dict):
+        if not data.get("forecast", {}).get("forecastday"):
+            raise AppErrorWrapper(
+                error_code="WEATHERAPI_NO_FORECAST_FOR_DATE",
+                user_message="No forecast data available for the selected date."
+            )
+
+    def _get(self, url: str, params: dict, deadline: Optional[float] = None) -> requests.Response:
+        return self._request("GET", url, params, deadline=deadline)
+
+    def _request(
+        self, method: str, url: str, params: dict, body: Optional[dict] = None, retry: bool = True, cost: int = 1,
+        deadline: Optional[float] = None
+    ) -> requests.Response:
+        """
+        Sends a request on the pooled session (JSON `body` if given), retrying 5xx responses, timeouts and
+        dropped connections with jittered exponential backoff. The last failure
+        is raised as-is for `_map_errors`. With `retry=False` (the bulk POST,
+        which is not idempotent and costs quota per location) there is one attempt.
+
+        Every attempt takes `cost` tokens from the shared WeatherAPI quota
+        first (WeatherAPI counts a bulk POST as one call per location); a 429
+        empties the bucket for every process until Retry-After has passed.
+
+        With a `deadline` (seconds) the quota wait and each attempt's timeout
+        are cut to the time left, and no retry starts that could not finish
+        its backoff in time, so the calling thread is free by the deadline.
+        """
+        expires = None if deadline is None else time.monotonic() + deadline
+        max_retries = self.max_retries if retry else 0
+        for attempt in range(max_retries + 1):
+            delay = self._backoff_delay(attempt)
+            self._acquire_quota(cost, None if expires is None else max(expires - time.monotonic(), 0.0))
+            timeout = self.timeout
+            if expires is not None:
+                timeout = min(timeout, expires - time.monotonic())
+                if timeout <= 0:
+                    raise requests.exceptions.Timeout(f"Deadline of {deadline}s passed before the request was sent.")
+            try:
+                response = self.session.request(method, url, params=params, json=body, timeout=timeout)
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError):
+                if self._out_of_attempts(attempt, max_retries, expires, delay):
+                    raise
+            else:
+                if response.status_code == 429:
+                    self.quota.penalize(WEATHERAPI_BUCKET, _retry_after(response))
+                if response.status_code < 500 or self._out_of_attempts(attempt, max_retries, expires, delay):
+                    response.raise_for_status()
+                    return response
+            time.sleep(delay)
+
+    @staticmethod
+    def _out_of_attempts(attempt: int, max_retries: int, expires: Optional[float], delay: float) -> bool:
+        """True after the last attempt, or if backing off for `delay` would run past the deadline."""
+        return attempt == max_retries or (expires is not None and time.monotonic() + delay >= expires)
+
+    def _acquire_quota(self, cost: int = 1, max_wait: Optional[float] = None):
         try:
-            response = requests.get(f"{self.BASE_URL}/forecast.json", params=params, timeout=10)
-            response.raise_for_status()
-
-            data = response.json()
-
-            # FIX: Remove the debug print block
-            # === DEBUG: Print the actual response ===
-            # print("\n" + "="*80)
-            # print("DEBUG: Full Response JSON:")
-            # print("="*80)
-            # import json
-            # print(json.dumps(data, indent=2))
-            # print("="*80 + "\n")
-            # === END DEBUG ===
-
-            if not data.get("forecast", {}).get("forecastday"):
-                raise AppErrorWrapper(
-                    error_code="WEATHERAPI_NO_FORECAST_FOR_DATE",
-                    user_message="No forecast data available for the selected date."
-                )
+            self.quota.acquire(WEATHERAPI_BUCKET, self.priority, max_wait=max_wait, cost=cost)
+        except QuotaExhausted as e:
+            raise AppErrorWrapper(
+                error_code="WEATHERAPI_QUOTA_EXHAUSTED",
+                user_message=f"The weather service request budget is used up. Please try again in {e.wait:.0f} seconds."
+            ) from e
 
-            # FIX: No changes needed here. Your logic for building the 'current' object is good.
-            # We will let Pydantic handle the parsing from the full 'data' object.
-            forecast_day = data["forecast"]["forecastday"][0]
-            first_hour = forecast_day["hour"][0] if forecast_day.get("hour") else {}
-            
-            current_data = {
-                "temp_c": first_hour.get("temp_c", 0),
-                "feelslike_c": first_hour.get("feelslike_c", 0),
-                "wind_mph": first_hour.get("wind_mph", 0),
-                "precip_mm": first_hour.get("precip_mm", 0),
-                "uv": first_hour.get("uv", 0),
-            }
-            
-            data["current"] = current_data
-
-            # FIX: Use the lean model for parsing. Pydantic will automatically
-            # ignore all the extra fields we don't need.
-            return LeanWeatherApiResponse.parse_obj(data)
+    def _backoff_delay(self, attempt: int) -> float:
+        return random.uniform(0, min(DEFAULT_BACKOFF_CAP, self.backoff_base * 2 ** attempt))
+
+    def _parse_weather_data(self, data: dict) -> LeanWeatherApiResponse:
+        """Builds the lean response, taking 'current' from the first hour of the forecast."""
+        forecast_day = data["forecast"]["forecastday"][0]
+        first_hour = forecast_day["hour"][0] if forecast_day.get("hour") else {}
 
+        current_data = {
+            "temp_c": first_hour.get("temp_c", 0),
+            "feelslike_c": first_hour.get("feelslike_c", 0),
+            "wind_mph": first_hour.get("wind_mph", 0),
+            "precip_mm": first_hour.get("precip_mm", 0),
+            "uv": first_hour.get("uv", 0),
+        }
+
+        data["current"] = current_data
+
+        # FIX: Use the lean model for parsing. Pydantic will automatically
+        # ignore all the extra fields we don't need.
+        return LeanWeatherApiResponse.parse_obj(data)
+
+    @contextmanager
+    def _map_errors(self):
+        """Maps transport, HTTP and schema errors to AppErrorWrapper codes."""
+        try:
+            yield
         except requests.exceptions.Timeout:
             raise AppErrorWrapper(
                 error_code="WEATHERAPI_TIMEOUT",
@@ -96,6 +338,11 @@ class WeatherApiClient:
                     error_code="WEATHERAPI_FORBIDDEN",
                     user_message="Access to the requested weather resource is forbidden."
                 ) from e
+            elif e.response.status_code == 429:
+                raise AppErrorWrapper(
+                    error_code="WEATHERAPI_RATE_LIMITED",
+                    user_message="The weather service is rate limiting requests. Please try again shortly."
+                ) from e
             elif e.response.status_code == 400:
                 error_data = e.response.json().get("error", {})
                 raise AppErrorWrapper(
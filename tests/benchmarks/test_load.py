@@ -0,0 +1,86 @@
+# tests/benchmarks/test_load.py
+import time
+import warnings
+
+import pytest
+import requests
+
+from benchmarks.load import build_call, format_report, run_load, sample_gemini_input
+from benchmarks.stand_in_server import GEMINI_EXPLANATION, StandInServer, lognormal_latency
+from utils.app_error import AppErrorWrapper
+from utils.token_bucket import BucketConfig, QuotaManager
+
+
+@pytest.fixture
+def unlimited_quota():
+    unlimited = BucketConfig(rate=1e9, capacity=1e9)
+    return QuotaManager({"weatherapi": unlimited, "gemini": unlimited})
+
+
+def test_throttle_bursts_send_429_with_retry_after():
+    with StandInServer(throttle=(60, 30)) as server:
+        response = requests.get(f"{server.base_url}/forecast.json", params={"q": "Leeds"})
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+
+
+def test_error_rate_and_latency():
+    with StandInServer(error_rate=1.0, latency=lognormal_latency(0.01, 0.1)) as server:
+        response = requests.get(f"{server.base_url}/forecast.json", params={"q": "Leeds"})
+    assert response.status_code == 503
+    assert response.elapsed.total_seconds() >= 0.005
+
+
+def test_real_clients_run_against_the_stand_in(monkeypatch, unlimited_quota):
+    monkeypatch.setenv("WEATHERAPI_KEY", "stand-in")
+    monkeypatch.setenv("GEMINI_API_KEY", "stand-in")
+    monkeypatch.setenv("ALLOUT_GEMINI_ENDPOINT", "")  # build_call sets it; restored after the test
+    with warnings.catch_warnings(), StandInServer() as server:
+        warnings.simplefilter("ignore")
+        assert build_call("forecast", server, unlimited_quota)(0).location.name == "Coventry"
+        assert len(build_call("bulk", server, unlimited_quota)(0)) == 20
+        assert "**Weather Summary:**" in build_call("gemini", server, unlimited_quota)(0).explanation
+
+
+def test_gemini_streams_from_the_stand_in(monkeypatch, unlimited_quota):
+    """The first chunk arrives long before the full response latency has passed."""
+    monkeypatch.setenv("GEMINI_API_KEY", "stand-in")
+    with warnings.catch_warnings(), StandInServer(latency=0.4) as server:
+        warnings.simplefilter("ignore")
+        monkeypatch.setenv("ALLOUT_GEMINI_ENDPOINT", server.gemini_endpoint)
+        from services.gemini_llm import GeminiLLMClient
+
+        client = GeminiLLMClient(quota=unlimited_quota)
+        started = time.perf_counter()
+        arrivals, chunks = [], []
+        for chunk in client.stream_explanation(sample_gemini_input()):
+            arrivals.append(time.perf_counter() - started)
+            chunks.append(chunk)
+    assert "".join(chunks) == GEMINI_EXPLANATION
+    assert len(chunks) > 2
+    assert arrivals[0] < 0.3 < arrivals[-1]
+
+
+def test_budget_caps_gemini_latency(monkeypatch, unlimited_quota):
+    monkeypatch.setenv("GEMINI_API_KEY", "stand-in")
+    monkeypatch.setenv("ALLOUT_GEMINI_ENDPOINT", "")
+    with warnings.catch_warnings(), StandInServer(latency=0.5) as server:
+        warnings.simplefilter("ignore")
+        call = build_call("gemini", server, unlimited_quota, budget=0.1)
+        started = time.perf_counter()
+        outputs = [call(i) for i in range(2)]
+        assert time.perf_counter() - started < 0.45
+    assert {output.source for output in outputs} == {"template"}
+
+
+def test_run_load_reports_percentiles_and_errors():
+    def call(i):
+        if i % 4 == 0:
+            raise AppErrorWrapper(error_code="WEATHERAPI_TIMEOUT", user_message="Timed out.")
+
+    report = run_load(call, rps=200, duration=0.2, concurrency=4)
+    assert report["requests"] == 40
+    assert report["succeeded"] == 30
+    assert report["errors"] == {"WEATHERAPI_TIMEOUT": 10}
+    assert 0 <= report["p50_ms"] <= report["p95_ms"] <= report["p99_ms"] <= report["max_ms"]
+    assert "p99" in format_report(report)
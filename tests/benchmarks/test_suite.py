@@ -0,0 +1,25 @@
+# tests/benchmarks/test_suite.py
+import warnings
+
+import pytest
+
+from benchmarks.suite import BENCHMARKS, compare_results
+
+
+@pytest.mark.parametrize("name", list(BENCHMARKS))
+def test_every_benchmark_runs_offline(name):
+    """Each benchmark's setup and timed callable run without network or API keys."""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        BENCHMARKS[name]()()
+
+
+def test_compare_flags_regressions_beyond_threshold():
+    baseline = {"results": {"a": {"ns_per_call": 100.0}, "b": {"ns_per_call": 100.0}, "gone": {"ns_per_call": 5.0}}}
+    current = {"results": {"a": {"ns_per_call": 109.0}, "b": {"ns_per_call": 125.0}, "new": {"ns_per_call": 1.0}}}
+    rows = {row["name"]: row for row in compare_results(baseline, current, threshold_pct=10)}
+    assert not rows["a"]["regressed"]
+    assert rows["b"]["regressed"]
+    assert rows["b"]["change_pct"] == pytest.approx(25.0)
+    assert rows["gone"]["change_pct"] is None and not rows["gone"]["regressed"]
+    assert rows["new"]["baseline_ns"] is None
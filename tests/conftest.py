@@ -0,0 +1,22 @@
+# tests/conftest.py
+import pytest
+
+import services.forecast_refresh
+import services.quota
+from services.forecast_refresh import BackgroundRefresher
+from utils.token_bucket import QuotaManager
+
+
+@pytest.fixture(autouse=True)
+def private_quota(monkeypatch):
+    """Each test gets a fresh, in-memory request budget instead of data/quota.sqlite3."""
+    monkeypatch.setattr(services.quota, "_quota_manager", QuotaManager(services.quota.default_buckets()))
+
+
+@pytest.fixture(autouse=True)
+def private_refresher(monkeypatch):
+    """Background refreshes never outlive the test that scheduled them."""
+    refresher = BackgroundRefresher()
+    monkeypatch.setattr(services.forecast_refresh, "_refresher", refresher)
+    yield refresher
+    refresher.stop()
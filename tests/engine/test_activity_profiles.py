@@ -0,0 +1,76 @@
+# tests/engine/test_activity_profiles.py
+import numpy as np
+import pytest
+
+from engine.activity_profiles import (
+    ACTIVITY_PROFILES, run_profiles_batch, run_profiles, get_profile_rule_table, register_profile,
+)
+from engine.batch_engine import run_heuristic_engine_batch
+from engine.heuristic_engine import run_heuristic_engine
+from engine.models import HeuristicInput, HeuristicRecord
+
+
+def _random_columns(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    columns = [
+        rng.uniform(0, 40, n), rng.uniform(-35, 45, n), rng.integers(0, 100, n).astype(float),
+        rng.uniform(0, 6, n), rng.uniform(0, 11, n),
+    ]
+    for column in columns:
+        column[rng.random(n) < 0.1] = np.nan  # Some missing metrics
+    return columns
+
+
+def test_weights_sum_to_one():
+    for name in ACTIVITY_PROFILES:
+        assert sum(get_profile_rule_table(name).metric_weights) == pytest.approx(1.0), name
+
+
+def test_single_pass_matches_batch_engine_per_profile():
+    """Every profile's slice equals the batch engine run with that profile's rule table."""
+    columns = _random_columns()
+    result = run_profiles_batch(*columns)
+    assert result.profiles == tuple(ACTIVITY_PROFILES)
+    for name in result.profiles:
+        expected = run_heuristic_engine_batch(*columns, rule_table=get_profile_rule_table(name))
+        actual = result.for_profile(name)
+        np.testing.assert_array_equal(actual.decision_codes, expected.decision_codes)
+        np.testing.assert_allclose(actual.weighted_scores, expected.weighted_scores, equal_nan=True)
+        np.testing.assert_array_equal(actual.hard_stop_mask, expected.hard_stop_mask)
+        assert actual.hard_stop_reasons == expected.hard_stop_reasons
+
+
+def test_profiles_disagree_on_windy_day():
+    """25 mph wind is fine for a hike but a hard stop on the bike."""
+    outputs = run_profiles(HeuristicRecord(25.0, 18.0, 10, 0.0, 2.0))
+    assert outputs["hiking"].decision == "GO"
+    assert outputs["cycling"].decision == "NO-GO"
+    assert outputs["cycling"].hard_stop_reasons == ["Wind speed is at a dangerous level (>= 25 mph)."]
+
+
+def test_run_profiles_matches_scalar_engine():
+    heuristic_input = HeuristicInput(
+        temp_c=30.0, feelslike_c=36.0, wind_mph=14.0, precip_mm=0.2, uv_index=7.0,
+        daily_chance_of_rain=40, heat_index_c=36.0, pop_percent=40, precip_rate_mmhr=0.2
+    )
+    outputs = run_profiles(heuristic_input.to_record())
+    for name, output in outputs.items():
+        assert output == run_heuristic_engine(heuristic_input, rule_table=get_profile_rule_table(name)), name
+
+
+def test_profile_subset_and_unknown_profile():
+    result = run_profiles_batch([5.0], [18.0], [10.0], [0.0], [1.0], profiles=["running", "hiking"])
+    assert result.profiles == ("running", "hiking")
+    assert result.decision_codes.shape == (2, 1)
+    with pytest.raises(KeyError):
+        run_profiles_batch([5.0], [18.0], [10.0], [0.0], [1.0], profiles=["skydiving"])
+
+
+def test_register_profile_validates_keys():
+    with pytest.raises(ValueError):
+        register_profile("kiting", {"gusts": {"red": 30}})
+    register_profile("kiting", {"wind": {"amber": 8, "red": 30}})
+    try:
+        assert run_profiles(HeuristicRecord(10.0, 18.0, 10, 0.0, 2.0), profiles=["kiting"])["kiting"].weighted_score == 90.0
+    finally:
+        ACTIVITY_PROFILES.pop("kiting")
@@ -0,0 +1,82 @@
+# tests/engine/test_batch_engine.py
+import itertools
+
+import numpy as np
+import pytest
+
+from engine.batch_engine import run_heuristic_engine_batch, DECISIONS
+from engine.heuristic_engine import run_heuristic_engine
+from engine.models import HeuristicInput
+
+# Values straddling every threshold, plus None for missing metrics
+WIND_VALUES = [None, 0.0, 19.9, 20, 31.9, 32, 45.0]
+FEELSLIKE_VALUES = [None, -30.0, -28, -27.9, -10, -9.9, 20.0, 27, 40.9, 41]
+POP_VALUES = [None, 0, 20, 21, 90]
+RATE_VALUES = [None, 0.0, 0.49, 0.5, 4.0, 4.01]
+UV_VALUES = [None, 0.0, 2.9, 3, 7.9, 8]
+
+
+def _scalar(wind, feelslike, pop, rate, uv):
+    return run_heuristic_engine(HeuristicInput(
+        temp_c=20.0,
+        feelslike_c=20.0,
+        wind_mph=wind,
+        precip_mm=0.0,
+        uv_index=uv,
+        daily_chance_of_rain=0,
+        heat_index_c=feelslike,
+        pop_percent=pop,
+        precip_rate_mmhr=rate,
+    ))
+
+
+def test_batch_matches_scalar_engine_exhaustively():
+    """Every combination of boundary values must match the scalar engine exactly."""
+    rows = list(itertools.product(WIND_VALUES, FEELSLIKE_VALUES, POP_VALUES, RATE_VALUES, UV_VALUES))
+    columns = list(zip(*rows))
+    result = run_heuristic_engine_batch(*columns)
+
+    assert len(result) == len(rows)
+    for row, batch_output in zip(rows, result.to_outputs()):
+        assert batch_output == _scalar(*row), row
+
+
+def test_batch_no_data_and_insufficient_data():
+    """Rows with zero or one metric map to NO DATA and INSUFFICIENT DATA."""
+    result = run_heuristic_engine_batch(
+        wind_mph=[None, 10.0, 40.0],
+        feelslike_c=[None, None, None],
+        pop_percent=[None, None, None],
+        precip_rate_mmhr=[None, None, None],
+        uv_index=[None, None, None],
+    )
+    assert result.decisions == ["NO DATA", "INSUFFICIENT DATA", "NO-GO"]
+    assert np.isnan(result.weighted_scores[0])
+    assert result.to_output(0).weighted_score is None
+
+
+def test_batch_accepts_numpy_arrays_with_nan():
+    """NaN in float arrays marks a missing metric."""
+    result = run_heuristic_engine_batch(
+        wind_mph=np.array([5.0, 35.0]),
+        feelslike_c=np.array([20.0, 42.0]),
+        pop_percent=np.array([10.0, np.nan]),
+        precip_rate_mmhr=np.array([0.0, np.nan]),
+        uv_index=np.array([1.0, 1.0]),
+    )
+    assert result.decisions == ["GO", "NO-GO"]
+    assert result.weighted_scores[0] == 100.0
+    assert result.hard_stop_mask[1].tolist() == [True, False, True, False]
+    assert result.to_output(1).hard_stop_reasons == [result.hard_stop_reasons[0], result.hard_stop_reasons[2]]
+
+
+def test_batch_rejects_mismatched_columns():
+    with pytest.raises(ValueError):
+        run_heuristic_engine_batch([1.0, 2.0], [1.0], [1], [1.0], [1.0])
+
+
+def test_batch_empty_input():
+    result = run_heuristic_engine_batch([], [], [], [], [])
+    assert len(result) == 0
+    assert result.hard_stop_mask.shape == (0, len(result.hard_stop_reasons))
+    assert set(DECISIONS) >= set(result.decisions)
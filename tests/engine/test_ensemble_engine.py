@@ -0,0 +1,68 @@
+# tests/engine/test_ensemble_engine.py
+import time
+
+import numpy as np
+import pytest
+
+from engine.ensemble_engine import run_ensemble_assessment, NoiseModel
+from engine.models import HeuristicInput
+
+
+def _input(**overrides):
+    fields = dict(
+        temp_c=18.0, feelslike_c=18.0, wind_mph=5.0, precip_mm=0.0, uv_index=1.0,
+        daily_chance_of_rain=10, heat_index_c=18.0, pop_percent=10, precip_rate_mmhr=0.0
+    )
+    fields.update(overrides)
+    return HeuristicInput(**fields)
+
+
+NO_NOISE = {field: NoiseModel(kind="none") for field in ("wind_mph", "heat_index_c", "pop_percent", "precip_rate_mmhr")}
+
+
+def test_without_noise_matches_deterministic_engine():
+    result = run_ensemble_assessment(_input(wind_mph=25.0), n_samples=500, noise=NO_NOISE, seed=0)
+    assert result.decision_probabilities[result.deterministic.decision] == 1.0
+    assert result.flip_probability == 0.0
+    assert result.score_mean == pytest.approx(result.deterministic.weighted_score)
+
+
+def test_probabilities_sum_to_one_and_are_reproducible():
+    first = run_ensemble_assessment(_input(wind_mph=28.0), seed=42)
+    second = run_ensemble_assessment(_input(wind_mph=28.0), seed=42)
+    assert sum(first.decision_probabilities.values()) == pytest.approx(1.0)
+    assert first.decision_probabilities == second.decision_probabilities
+
+
+def test_near_threshold_wind_reports_hard_stop_probability():
+    """Wind just below the hard-stop threshold flips to NO-GO in a good share of samples."""
+    result = run_ensemble_assessment(
+        _input(wind_mph=30.0), noise={"wind_mph": NoiseModel(kind="normal", scale=4.0, minimum=0.0)}, seed=1
+    )
+    wind_reason = next(r for r in result.hard_stop_probabilities if r.startswith("Wind"))
+    assert result.deterministic.decision != "NO-GO"
+    assert 0.2 < result.hard_stop_probabilities[wind_reason] < 0.5
+    assert result.decision_probabilities["NO-GO"] >= result.hard_stop_probabilities[wind_reason]
+
+
+def test_noise_models_respect_bounds():
+    rng = np.random.default_rng(0)
+    pop = NoiseModel(kind="normal", scale=50.0, minimum=0.0, maximum=100.0).sample(rng, 95, 1000)
+    rate = NoiseModel(kind="relative", scale=0.5, minimum=0.0).sample(rng, 2.0, 20000)
+    assert pop.min() >= 0.0 and pop.max() <= 100.0
+    assert rate.min() >= 0.0
+    assert rate.mean() == pytest.approx(2.0, rel=0.05)
+    assert np.isnan(NoiseModel(scale=1.0).sample(rng, None, 3)).all()
+
+
+def test_unknown_noise_input_raises():
+    with pytest.raises(ValueError):
+        run_ensemble_assessment(_input(), noise={"humidity": NoiseModel(scale=1.0)})
+
+
+def test_ten_thousand_samples_are_fast():
+    heuristic_input = _input(wind_mph=22.0)
+    run_ensemble_assessment(heuristic_input)  # Warm the compiled rule arrays
+    start = time.perf_counter()
+    run_ensemble_assessment(heuristic_input)
+    assert time.perf_counter() - start < 0.05  # Target is 10 ms; generous for slow CI machines
@@ -1,7 +1,7 @@
 # tests/engine/test_heuristic_engine.py
 import pytest
-from engine.heuristic_engine import run_heuristic_engine
-from engine.models import HeuristicInput
+from engine.heuristic_engine import run_heuristic_engine, run_heuristic_engine_trusted
+from engine.models import HeuristicInput, HeuristicRecord
 
 def create_input(**kwargs):
     """Creates a HeuristicInput with default safe values."""
@@ -147,4 +147,23 @@ def test_partial_data_score_calculation():
     # Expected score = (100 * 0.20) + (50 * 0.35) = 20 + 17.5 = 37.5
     result = run_heuristic_engine(test_input)
     assert result.decision == "NO-GO"  # Score < 50
-    assert 37.0 <= result.weighted_score <= 38.0  # Allow small tolerance
\ No newline at end of file
+    assert 37.0 <= result.weighted_score <= 38.0  # Allow small tolerance
+
+# --- Test Cases for the Trusted Fast Path ---
+
+@pytest.mark.parametrize("overrides", [
+    {},
+    {"wind_mph": 35, "heat_index_c": 42},
+    {"pop_percent": 80, "precip_rate_mmhr": None},
+    {"wind_mph": None, "heat_index_c": None, "uv_index": None, "pop_percent": None, "precip_rate_mmhr": None},
+    {"wind_mph": 10.0, "heat_index_c": None, "uv_index": None, "pop_percent": None, "precip_rate_mmhr": None},
+])
+def test_trusted_fast_path_matches_validated_engine(overrides):
+    """The trusted path gives exactly the validated engine's output."""
+    test_input = create_input(**overrides)
+    result = run_heuristic_engine_trusted(test_input.to_record())
+    assert result.to_output() == run_heuristic_engine(test_input)
+    assert test_input.to_record() == HeuristicRecord(
+        test_input.wind_mph, test_input.heat_index_c, test_input.pop_percent,
+        test_input.precip_rate_mmhr, test_input.uv_index
+    )
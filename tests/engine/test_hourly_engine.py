@@ -0,0 +1,53 @@
+# tests/engine/test_hourly_engine.py
+import numpy as np
+import pytest
+
+from engine.hourly_engine import run_hourly_assessment, find_best_go_window
+from engine.batch_engine import GO, MAYBE, NO_GO
+
+
+def _day(wind):
+    """24 hours of mild conditions with the given hourly wind speeds."""
+    n = len(wind)
+    return dict(
+        wind_mph=np.asarray(wind, dtype=float),
+        feelslike_c=np.full(n, 18.0),
+        pop_percent=np.full(n, 10.0),
+        precip_rate_mmhr=np.zeros(n),
+        uv_index=np.full(n, 1.0),
+    )
+
+
+def test_hourly_assessment_scores_every_hour():
+    """Every hour gets its own decision from a single pass."""
+    wind = [5.0] * 6 + [25.0] * 6 + [40.0] * 6 + [5.0] * 6
+    result = run_hourly_assessment(**_day(wind), activity_hours=3)
+    assert len(result.decisions) == 24
+    assert result.decisions[0] == "GO"
+    assert result.decisions[6] == "GO"  # Amber wind alone still scores 90
+    assert result.decisions[12] == "NO-GO"
+    assert result.hourly.hard_stop_mask[12, 0]
+
+
+def test_best_window_prefers_highest_mean_score():
+    """The best window is the GO run with the highest mean score, earliest on ties."""
+    codes = np.array([GO, GO, MAYBE, GO, GO, GO, NO_GO, GO])
+    scores = np.array([80.0, 80.0, 60.0, 90.0, 100.0, 90.0, 0.0, 100.0])
+    window = find_best_go_window(codes, scores, activity_hours=2)
+    assert (window.start_index, window.end_index) == (3, 5)
+    assert window.mean_score == pytest.approx(95.0)
+    assert window.hours == 2
+
+
+def test_best_window_respects_eligible_hours_and_length():
+    codes = np.array([GO] * 6)
+    scores = np.array([100.0, 100.0, 90.0, 90.0, 90.0, 90.0])
+    eligible = np.array([False, False, True, True, True, True])
+    window = find_best_go_window(codes, scores, activity_hours=3, eligible=eligible)
+    assert window.start_index == 2
+    assert find_best_go_window(codes, scores, activity_hours=7) is None
+
+
+def test_no_go_window_when_conditions_never_allow():
+    result = run_hourly_assessment(**_day([40.0] * 24), activity_hours=1)
+    assert result.best_window is None
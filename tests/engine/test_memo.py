@@ -0,0 +1,71 @@
+# tests/engine/test_memo.py
+import json
+
+import pytest
+
+from engine import rule_table
+from engine.heuristic_engine import run_heuristic_engine
+from engine.memo import MemoizedHeuristicEngine
+from engine.models import HeuristicInput
+
+
+def create_input(**kwargs):
+    defaults = {
+        "temp_c": 20.0, "feelslike_c": 20.0, "wind_mph": 10.0, "precip_mm": 0.0, "uv_index": 1.0,
+        "daily_chance_of_rain": 10, "heat_index_c": 20.0, "pop_percent": 10, "precip_rate_mmhr": 0.0,
+    }
+    defaults.update(kwargs)
+    return HeuristicInput(**defaults)
+
+
+@pytest.fixture
+def restore_rule_table():
+    yield
+    rule_table.configure_rule_table(None)
+
+
+def test_repeated_inputs_hit_the_cache():
+    engine = MemoizedHeuristicEngine(maxsize=8)
+    first = engine(create_input(wind_mph=25.0))
+    # Fields the rules do not read are not part of the key
+    second = engine(create_input(wind_mph=25.0, temp_c=3.0, daily_chance_of_rain=80))
+    assert first is second
+    assert first == run_heuristic_engine(create_input(wind_mph=25.0))
+    stats = engine.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 1, 1)
+    assert stats["hit_rate"] == 0.5
+
+
+def test_least_recently_used_entry_is_evicted():
+    engine = MemoizedHeuristicEngine(maxsize=2)
+    engine(create_input(wind_mph=1.0))
+    engine(create_input(wind_mph=2.0))
+    engine(create_input(wind_mph=1.0))   # 1.0 becomes most recent
+    engine(create_input(wind_mph=3.0))   # evicts 2.0
+    engine(create_input(wind_mph=1.0))
+    stats = engine.stats()
+    assert stats["evictions"] == 1
+    assert stats["hits"] == 2
+    assert stats["size"] == 2
+
+
+def test_decimals_quantize_key_and_evaluation():
+    engine = MemoizedHeuristicEngine(decimals=1)
+    engine(create_input(wind_mph=31.96))
+    result = engine(create_input(wind_mph=32.04))
+    assert engine.stats()["hits"] == 1
+    assert result == run_heuristic_engine(create_input(wind_mph=32.0))
+
+
+def test_rule_table_change_invalidates_cache(tmp_path, restore_rule_table):
+    engine = MemoizedHeuristicEngine()
+    assert engine(create_input(wind_mph=25.0)).decision == "GO"
+
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"wind": {"red": 25}}))
+    rule_table.configure_rule_table(str(rules_file))
+
+    assert engine(create_input(wind_mph=25.0)).decision == "NO-GO"
+    stats = engine.stats()
+    assert stats["invalidations"] == 1
+    assert stats["hits"] == 0
@@ -0,0 +1,48 @@
+# tests/engine/test_range_engine.py
+import numpy as np
+import pytest
+
+from engine.range_engine import run_range_assessment
+
+
+def _range(wind_by_day):
+    """(days, 24) arrays of mild weather with per-day wind rows."""
+    wind = np.asarray(wind_by_day, dtype=float)
+    shape = wind.shape
+    return dict(
+        wind_mph=wind,
+        feelslike_c=np.full(shape, 18.0),
+        pop_percent=np.full(shape, 10.0),
+        precip_rate_mmhr=np.zeros(shape),
+        uv_index=np.full(shape, 1.0),
+    )
+
+
+def test_days_are_ranked_by_best_go_window():
+    calm = [5.0] * 24
+    breezy = [25.0] * 24             # Amber wind: GO at 90
+    stormy = [40.0] * 24             # Hard stop all day
+    morning_calm = [5.0] * 12 + [40.0] * 12
+    dates = ["2024-06-01", "2024-06-02", "2024-06-03", "2024-06-04"]
+
+    result = run_range_assessment(dates, **_range([stormy, breezy, morning_calm, calm]), activity_hours=3)
+
+    assert [d.date for d in result.ranked] == ["2024-06-04", "2024-06-03", "2024-06-02", "2024-06-01"]
+    assert result.days[0].best_window is None
+    assert result.days[0].decision_counts == {"NO-GO": 24}
+    assert result.days[2].go_hours == 12
+    assert result.decision_matrix().shape == (4, 24)
+
+
+def test_planning_hours_limit_windows_and_summaries():
+    night_calm = [5.0] * 8 + [40.0] * 16
+    result = run_range_assessment(["2024-06-01"], **_range([night_calm]), activity_hours=2, first_hour=8, last_hour=20)
+    day = result.days[0]
+    assert day.best_window is None
+    assert day.go_hours == 0
+    assert day.mean_score == pytest.approx(80.0)
+
+
+def test_range_rejects_mismatched_dates():
+    with pytest.raises(ValueError):
+        run_range_assessment(["2024-06-01"], **_range([[5.0] * 24, [5.0] * 24]))
@@ -0,0 +1,115 @@
+# tests/engine/test_rule_table.py
+import json
+import os
+
+import pytest
+
+from engine.heuristic_engine import run_heuristic_engine, run_heuristic_engine_trusted
+from engine.batch_engine import run_heuristic_engine_batch
+from engine.models import HeuristicInput, HeuristicRecord
+from engine.rule_table import BandClassifier, RuleTable, RuleTableProvider
+from utils import constants
+from utils.app_error import AppErrorWrapper
+
+
+def create_input(**kwargs):
+    defaults = {
+        "temp_c": 20.0, "feelslike_c": 20.0, "wind_mph": 10.0, "precip_mm": 0.0, "uv_index": 1.0,
+        "daily_chance_of_rain": 10, "heat_index_c": 20.0, "pop_percent": 10, "precip_rate_mmhr": 0.0,
+    }
+    defaults.update(kwargs)
+    return HeuristicInput(**defaults)
+
+
+def test_default_table_is_built_from_constants():
+    """The default table uses utils/constants.py and keeps the engine's reason texts."""
+    table = RuleTable.from_config()
+    assert table.weights["precip"] == constants.PRECIP_WEIGHT
+    assert table.wind.classify(constants.WIND_RED_THRESHOLD) == ("Red", "Wind speed is at a dangerous level (>= 32 mph).")
+    assert table.thermal.classify(-28) == ("Red", "Extreme cold warning (feels like <= -28°C).")
+    assert table.thermal.classify(-27.9)[0] == "Amber"
+    assert table.thermal.classify(-10)[0] == "Amber"
+    assert table.thermal.classify(-9.9)[0] == "Green"
+    assert table.categorize_precip(80, 4.0) == ("Amber", None)
+    assert table.categorize_precip(80, 4.01) == ("Red", "Heavy precipitation rate (> 4.0 mm/hr).")
+    assert table.categorize_precip(80, None) == ("Amber", None)
+
+
+@pytest.mark.parametrize("value", [-40.0, -28.0, -27.99, -10.0, -9.99, 0.0, 26.99, 27.0, 40.99, 41.0, 50.0])
+def test_compiled_classifier_matches_bisect(value):
+    """The unrolled comparisons agree with a plain bisect over the band edges."""
+    thermal = RuleTable.from_config().thermal
+    assert thermal.classify(value)[0] == thermal.categories[thermal.band(value)]
+
+
+def test_classifier_falls_back_to_bisect():
+    """Edge counts the engine does not use are classified by bisect."""
+    classifier = BandClassifier((1.0, 2.0, 3.0), ("a", "b", "c", "d"), (None, None, None, "top"))
+    assert [classifier.classify(v)[0] for v in (0.5, 1.0, 2.5, 3.0)] == ["a", "b", "c", "d"]
+    assert classifier.classify(3.0) == ("d", "top")
+    assert classifier.classify(None) == (None, None)
+
+
+def test_overrides_change_both_engines():
+    """A stricter wind threshold turns 25 mph into a hard stop in scalar and batch engines."""
+    table = RuleTable.from_config({"wind": {"red": 25}})
+    result = run_heuristic_engine(create_input(wind_mph=25), rule_table=table)
+    assert result.decision == "NO-GO"
+    assert result.hard_stop_reasons == ["Wind speed is at a dangerous level (>= 25 mph)."]
+
+    batch = run_heuristic_engine_batch([25.0], [20.0], [10], [0.0], [1.0], rule_table=table)
+    assert batch.to_output(0) == result
+
+
+@pytest.mark.parametrize("field", HeuristicRecord._fields)
+def test_nan_is_missing_in_both_engines(field):
+    """NaN counts as a missing metric, as in the batch engine, instead of landing in a band."""
+    values = {"wind_mph": 10.0, "heat_index_c": 20.0, "pop_percent": 60, "precip_rate_mmhr": 0.0, "uv_index": 1.0}
+    values[field] = float("nan")
+    result = run_heuristic_engine_trusted(HeuristicRecord(**values))
+    batch = run_heuristic_engine_batch(*([values[f]] for f in HeuristicRecord._fields)).to_output(0)
+    assert (batch.decision, batch.notes, batch.weighted_score, batch.hard_stop_reasons) == tuple(result)
+
+
+def test_nan_is_missing_in_every_classifier():
+    table = RuleTable.from_config()
+    nan = float("nan")
+    for classify in (table.categorize_wind, table.categorize_thermal_stress, table.categorize_uv):
+        assert classify(nan) == (None, None)
+    assert table.categorize_precip(nan, 1.0) == (None, None)
+    assert table.categorize_precip(80, nan) == ("Amber", None)
+    assert BandClassifier((1.0, 2.0, 3.0), ("a", "b", "c", "d"), (None,) * 4).classify(nan) == (None, None)
+
+
+def test_unknown_override_key_is_rejected():
+    with pytest.raises(ValueError):
+        RuleTable.from_config({"wnd": {"red": 25}})
+
+
+def test_provider_hot_reloads_changed_file(tmp_path):
+    """Editing the rules file swaps the table without a restart; broken edits keep the last good one."""
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"wind": {"red": 30}}))
+    provider = RuleTableProvider(str(rules_file), check_interval=0)
+    first = provider.get()
+    assert first.wind.classify(30)[0] == "Red"
+    mtime = rules_file.stat().st_mtime
+
+    rules_file.write_text(json.dumps({"wind": {"red": 40}}))
+    os.utime(rules_file, (mtime + 5, mtime + 5))
+    second = provider.get()
+    assert second.version > first.version
+    assert second.wind.classify(30)[0] == "Amber"
+
+    rules_file.write_text("{not json")
+    os.utime(rules_file, (mtime + 10, mtime + 10))
+    assert provider.get() is second
+    assert provider.last_error is not None
+
+
+def test_provider_rejects_invalid_file_on_explicit_load(tmp_path):
+    rules_file = tmp_path / "rules.json"
+    rules_file.write_text(json.dumps({"uv": {"amber": 9, "red": 8}}))
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        RuleTableProvider(str(rules_file))
+    assert excinfo.value.error_code == "RULE_TABLE_INVALID"
@@ -0,0 +1,163 @@
+# tests/services/test_async_weather_api.py
+import asyncio
+import threading
+import time
+
+import pytest
+
+from services.async_weather_api import AsyncWeatherApiClient
+from services.lean_weather_models import LeanWeatherApiResponse, Location
+from services.location_resolver import LocationResolver
+from services.weather_api import WeatherApiClient
+from utils.app_error import AppErrorWrapper
+from tests.services.test_weather_api import SAMPLE_CURRENT_WEATHER_RESPONSE
+
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("WEATHERAPI_KEY", "dummy_api_key")
+
+
+class SlowClient:
+    """Stands in for WeatherApiClient: a fixed delay per call, cut short by the deadline; failing for 'Nowhere'."""
+
+    def __init__(self, delay=0.2):
+        self.delay = delay
+        self.active = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_weather_data(self, location, date=None, deadline=None):
+        with self.lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            if deadline is not None and deadline < self.delay:
+                time.sleep(deadline)
+                raise AppErrorWrapper(error_code="WEATHERAPI_TIMEOUT", user_message="The request to the weather service timed out.")
+            time.sleep(self.delay)
+            if location == "Nowhere":
+                raise AppErrorWrapper(error_code="WEATHERAPI_BAD_REQUEST_1006", user_message="No matching location found.")
+            return LeanWeatherApiResponse.model_validate(
+                dict(SAMPLE_CURRENT_WEATHER_RESPONSE, current={"temp_c": 1, "feelslike_c": 1, "wind_mph": 1, "precip_mm": 0, "uv": 1},
+                     location={"name": location, "region": "", "country": "UK"})
+            )
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_get_weather_data_matches_blocking_client(requests_mock):
+    requests_mock.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+
+    async def main():
+        async with AsyncWeatherApiClient(WeatherApiClient(backoff_base=0)) as client:
+            return await client.get_weather_data("London", "2023-01-01")
+
+    result = asyncio.run(main())
+    assert isinstance(result, LeanWeatherApiResponse)
+    assert result == WeatherApiClient().get_weather_data("London", "2023-01-01")
+
+
+def test_error_codes_pass_through(requests_mock):
+    requests_mock.get(f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=401)
+
+    async def main():
+        async with AsyncWeatherApiClient(WeatherApiClient(backoff_base=0)) as client:
+            await client.get_weather_data("London")
+
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.error_code == "WEATHERAPI_AUTH_FAILED"
+
+
+def test_gather_many_takes_about_one_call():
+    """20 locations finish in about the time of the slowest single call, in input order."""
+    locations = [f"Town {i}" for i in range(20)]
+    fake = SlowClient(delay=0.2)
+
+    async def main():
+        async with AsyncWeatherApiClient(fake) as client:
+            return await client.gather_many(locations, "2023-01-01")
+
+    start = time.perf_counter()
+    results = asyncio.run(main())
+    elapsed = time.perf_counter() - start
+    assert [r.location.name for r in results] == locations
+    assert elapsed < 0.2 * 3
+
+
+def test_gather_many_bounds_concurrency():
+    fake = SlowClient(delay=0.05)
+
+    async def main():
+        async with AsyncWeatherApiClient(fake) as client:
+            return await client.gather_many([f"Town {i}" for i in range(12)], concurrency=3)
+
+    asyncio.run(main())
+    assert fake.peak == 3
+
+
+def test_gather_many_can_return_errors_in_place():
+    async def main():
+        async with AsyncWeatherApiClient(SlowClient(delay=0)) as client:
+            return await client.gather_many(["Leeds", "Nowhere", "York"], ["2023-01-01"] * 3, return_exceptions=True)
+
+    leeds, nowhere, york = asyncio.run(main())
+    assert leeds.location.name == "Leeds" and york.location.name == "York"
+    assert isinstance(nowhere, AppErrorWrapper)
+    assert nowhere.error_code == "WEATHERAPI_BAD_REQUEST_1006"
+
+
+def test_deadline_maps_to_timeout_code():
+    """The worker itself gives up at the deadline, so no thread is left running the request."""
+    fake = SlowClient(delay=0.5)
+
+    async def main():
+        async with AsyncWeatherApiClient(fake, deadline=0.05) as client:
+            await client.get_weather_data("Leeds")
+
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        asyncio.run(main())
+    assert excinfo.value.error_code == "WEATHERAPI_TIMEOUT"
+    assert fake.active == 0
+
+
+def test_dates_must_match_locations():
+    async def main():
+        async with AsyncWeatherApiClient(SlowClient(delay=0)) as client:
+            await client.gather_many(["Leeds", "York"], ["2023-01-01"])
+
+    with pytest.raises(ValueError):
+        asyncio.run(main())
+
+
+def test_identical_lookups_are_coalesced():
+    fake = SlowClient(delay=0.1)
+
+    async def main():
+        async with AsyncWeatherApiClient(fake) as client:
+            results = await client.gather_many(["Leeds", "leeds ", "York", "Leeds"], "2023-01-01")
+            return results, client.stats()
+
+    results, stats = asyncio.run(main())
+    assert results[0] is results[1] is results[3]
+    assert stats["executions"] == 2
+    assert stats["coalesced"] == 2
+
+
+def test_lookups_are_coalesced_by_canonical_location():
+    fake = SlowClient(delay=0.1)
+    resolver = LocationResolver()
+    coventry = Location(name="Coventry", region="West Midlands", country="United Kingdom")
+    resolver.learn("Coventry", coventry)
+    resolver.learn("Coventry, UK", coventry)
+
+    async def main():
+        async with AsyncWeatherApiClient(fake, resolver=resolver) as client:
+            results = await client.gather_many(["Coventry", "Coventry, UK"], "2023-01-01")
+            return results, client.stats()
+
+    (first, second), stats = asyncio.run(main())
+    assert first is second
+    assert stats["executions"] == 1
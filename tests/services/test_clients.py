@@ -0,0 +1,102 @@
+# tests/services/test_clients.py
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+import requests
+
+from services import clients
+from services.clients import GEMINI_CLIENT, WEATHER_CLIENT, WARM_UP_ENV, ClientRegistry, warm_up
+from utils.app_error import AppErrorWrapper
+
+
+class FakeWeatherClient:
+    BASE_URL = "http://api.weatherapi.com/v1"
+
+    def __init__(self):
+        self.session = requests.Session()
+
+
+def _slow_build(builds):
+    def build():
+        builds.append(1)
+        time.sleep(0.05)
+        return object()
+    return build
+
+
+def test_clients_are_built_once_and_shared():
+    builds = []
+    registry = ClientRegistry({"client": _slow_build(builds)})
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: registry.get("client"), range(8)))
+    assert len(builds) == 1
+    assert all(result is results[0] for result in results)
+    assert registry.stats() == {"builds": 1, "reuses": 7, "clients": 1}
+
+
+def test_failed_builds_are_retried():
+    attempts = []
+
+    def build():
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise AppErrorWrapper("WEATHERAPI_KEY_MISSING", "No key.")
+        return object()
+
+    registry = ClientRegistry({"client": build})
+    with pytest.raises(AppErrorWrapper):
+        registry.get("client")
+    assert registry.get("client") is registry.get("client")
+    assert len(attempts) == 2
+
+
+def test_reset_rebuilds_from_the_current_environment():
+    registry = ClientRegistry({"client": object})
+    first = registry.get("client")
+    registry.reset()
+    assert registry.get("client") is not first
+
+
+def test_app_getters_share_the_process_registry(monkeypatch):
+    registry = ClientRegistry({WEATHER_CLIENT: object, GEMINI_CLIENT: object})
+    monkeypatch.setattr(clients, "_registry", registry)
+    assert clients.get_weather_client() is clients.get_weather_client()
+    assert clients.get_gemini_client() is not clients.get_weather_client()
+    assert registry.stats()["builds"] == 2
+
+
+def test_warm_up_builds_clients_and_connects(requests_mock):
+    requests_mock.head(FakeWeatherClient.BASE_URL, status_code=404)
+    registry = ClientRegistry({WEATHER_CLIENT: FakeWeatherClient, GEMINI_CLIENT: object})
+    timings = warm_up(registry)
+    assert set(timings) == {WEATHER_CLIENT, GEMINI_CLIENT, "weather_connection"}
+    assert requests_mock.call_count == 1
+    assert registry.stats()["clients"] == 2
+
+
+def test_warm_up_skips_what_fails(requests_mock, caplog):
+    requests_mock.head(FakeWeatherClient.BASE_URL, exc=requests.ConnectionError("offline"))
+
+    def missing_key():
+        raise AppErrorWrapper("GEMINI_API_KEY_MISSING", "No key.")
+
+    with caplog.at_level(logging.DEBUG, logger="services.clients"):
+        timings = warm_up(ClientRegistry({WEATHER_CLIENT: FakeWeatherClient, GEMINI_CLIENT: missing_key}))
+    assert set(timings) == {WEATHER_CLIENT}
+    assert "could not build the gemini client" in caplog.text
+    assert "could not reach WeatherAPI" in caplog.text
+
+
+def test_warm_up_from_env_runs_once_per_process(monkeypatch):
+    started = threading.Event()
+    monkeypatch.setattr(clients, "warm_up", lambda: started.set())
+    monkeypatch.setattr(clients, "_warmed_up", False)
+    monkeypatch.delenv(WARM_UP_ENV, raising=False)
+    assert clients.warm_up_from_env() is False
+    monkeypatch.setenv(WARM_UP_ENV, "1")
+    assert clients.warm_up_from_env() is True
+    assert started.wait(1)
+    assert clients.warm_up_from_env() is False
@@ -0,0 +1,217 @@
+# tests/services/test_explanation_cache.py
+import threading
+import time
+import timeit
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from engine.models import HeuristicOutput
+from services.explanation_cache import BUDGET_ENV, CachedGeminiClient, explanation_signature
+from services.models import GeminiInput, CurrentWeatherForGemini, DayForecastForGemini, GeminiOutput
+from utils.app_error import AppErrorWrapper
+from utils.cache import TwoTierCache
+from utils.single_flight import SingleFlight
+
+
+class FakeGemini:
+    """Stands in for GeminiLLMClient, numbering its explanations."""
+
+    def __init__(self, error=None, delay=None, latency=0.0):
+        self.calls = 0
+        self.error = error
+        self.delay = delay
+        self.latency = latency
+        self.model = "fake-model"
+
+    def stream_explanation(self, gemini_input):
+        output = self.get_explanation(gemini_input)
+        yield from output.explanation.partition(" ")
+        return output
+
+    def get_explanation(self, gemini_input):
+        self.calls += 1
+        if self.delay is not None:
+            self.delay.wait(2)
+        time.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return GeminiOutput(explanation=f"Explanation {self.calls} for {gemini_input.location_name}.")
+
+
+def _input(location="Coventry", decision="GO", temp_c=18.2, wind_mph=9.1, pop=21, uv=4.2, precip_mm=0.0):
+    return GeminiInput(
+        location_name=location,
+        current_weather=CurrentWeatherForGemini(temp_c=temp_c, feelslike_c=temp_c - 1, wind_mph=wind_mph,
+                                                precip_mm=precip_mm, uv=uv),
+        day_forecast=DayForecastForGemini(daily_chance_of_rain=pop),
+        heuristic_output=HeuristicOutput(decision=decision, weighted_score=82.0, notes="Good conditions.", reasons=[]),
+    )
+
+
+@pytest.fixture
+def client():
+    return CachedGeminiClient(FakeGemini(), TwoTierCache(), SingleFlight())
+
+
+def test_small_input_differences_share_an_explanation(client):
+    first = client.get_explanation(_input(temp_c=18.2, wind_mph=9.1, pop=21, uv=4.2))
+    second = client.get_explanation(_input(temp_c=18.9, wind_mph=9.8, pop=24, uv=4.7, location=" coventry "))
+    assert isinstance(second, GeminiOutput)
+    assert second.explanation == first.explanation
+    assert client.client.calls == 1
+    assert client.stats()["hit_rate"] == 0.5
+
+
+@pytest.mark.parametrize("change", [
+    {"decision": "MAYBE"}, {"temp_c": 20.5}, {"wind_mph": 15.0}, {"pop": 40}, {"uv": 7.0}, {"precip_mm": 2.0},
+    {"location": "Leeds"},
+])
+def test_different_buckets_get_their_own_explanation(change):
+    assert explanation_signature(_input(**change)) != explanation_signature(_input())
+
+
+def test_location_can_be_left_out_of_the_signature():
+    client = CachedGeminiClient(FakeGemini(), TwoTierCache(), SingleFlight(), include_location=False)
+    client.get_explanation(_input(location="Coventry"))
+    client.get_explanation(_input(location="Leeds"))
+    assert client.client.calls == 1
+
+
+def test_disk_tier_serves_a_new_process(tmp_path):
+    path = tmp_path / "explanations.sqlite3"
+    first = CachedGeminiClient(FakeGemini(), TwoTierCache(path=path), SingleFlight()).get_explanation(_input())
+    restarted = CachedGeminiClient(FakeGemini(), TwoTierCache(path=path), SingleFlight())
+    assert restarted.get_explanation(_input()).explanation == first.explanation
+    assert restarted.client.calls == 0
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_entries_that_fail_validation_are_fetched_again(client):
+    client.cache.set(explanation_signature(_input()), "word " * 400, 60)
+    assert client.get_explanation(_input()).explanation == "Explanation 1 for Coventry."
+    assert client.client.calls == 1
+
+
+def test_errors_are_not_cached():
+    client = CachedGeminiClient(FakeGemini(error=AppErrorWrapper("GEMINI_TIMEOUT", "Timed out.")), TwoTierCache(),
+                                SingleFlight())
+    for _ in range(2):
+        with pytest.raises(AppErrorWrapper):
+            client.get_explanation(_input())
+    assert client.client.calls == 2
+
+
+def test_concurrent_misses_share_one_call():
+    release = threading.Event()
+    client = CachedGeminiClient(FakeGemini(delay=release), TwoTierCache(), SingleFlight())
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        futures = [pool.submit(client.get_explanation, _input()) for _ in range(8)]
+        threading.Timer(0.1, release.set).start()
+        results = [f.result() for f in futures]
+    assert {r.explanation for r in results} == {"Explanation 1 for Coventry."}
+    assert client.client.calls == 1
+
+
+def test_hits_take_well_under_a_millisecond(client):
+    gemini_input = _input()
+    client.get_explanation(gemini_input)
+    per_call = min(timeit.repeat(lambda: client.get_explanation(gemini_input), number=1_000, repeat=3)) / 1_000
+    assert per_call < 1e-3
+
+
+def test_streams_are_cached_once_complete(client):
+    assert "".join(client.stream_explanation(_input())) == "Explanation 1 for Coventry."
+    assert list(client.stream_explanation(_input(temp_c=18.5))) == ["Explanation 1 for Coventry."]  # A hit: one chunk
+    assert client.get_explanation(_input()).explanation == "Explanation 1 for Coventry."
+    assert client.client.calls == 1
+    assert client.stats()["hit_rate"] == pytest.approx(2 / 3)
+
+
+def test_failed_streams_are_not_cached():
+    client = CachedGeminiClient(FakeGemini(error=AppErrorWrapper("GEMINI_RESPONSE_BLOCKED", "Blocked.")),
+                                TwoTierCache(), SingleFlight())
+    with pytest.raises(AppErrorWrapper):
+        list(client.stream_explanation(_input()))
+    assert client.stats()["writes"] == 0
+
+
+def _drain(stream):
+    """Chunks and return value of a stream."""
+    chunks = []
+    while True:
+        try:
+            chunks.append(next(stream))
+        except StopIteration as finished:
+            return chunks, finished.value
+
+
+def test_stream_returns_the_complete_output(client):
+    chunks, output = _drain(client.stream_explanation(_input()))
+    assert "".join(chunks) == output.explanation == "Explanation 1 for Coventry."
+    chunks, output = _drain(client.stream_explanation(_input()))
+    assert chunks == [output.explanation]
+
+
+def test_budget_overrun_serves_the_template_and_caches_the_late_answer():
+    client = CachedGeminiClient(FakeGemini(latency=0.3), TwoTierCache(), SingleFlight(), budget=0.05)
+    started = time.perf_counter()
+    output = client.get_explanation(_input())
+    assert time.perf_counter() - started < 0.25
+    assert output.source == "template" and "Currently 18.2°C" in output.explanation
+    _wait_for(lambda: client.stats()["writes"] == 1)
+    assert client.get_explanation(_input()).explanation == "Explanation 1 for Coventry."
+    stats = client.stats()
+    assert (stats["template_answers"], stats["late_answers"], stats["llm_calls"]) == (1, 1, 1)
+
+
+def test_late_answers_can_be_discarded():
+    client = CachedGeminiClient(FakeGemini(latency=0.2), TwoTierCache(), SingleFlight(), budget=0.05, cache_late=False)
+    assert client.get_explanation(_input()).source == "template"
+    _wait_for(lambda: client.stats()["late_answers"] == 1)
+    assert client.stats()["writes"] == 0
+
+
+def test_answers_within_budget_and_errors_pass_through():
+    client = CachedGeminiClient(FakeGemini(), TwoTierCache(), SingleFlight(), budget=1.0)
+    assert client.get_explanation(_input()).source == "gemini"
+    failing = CachedGeminiClient(FakeGemini(error=AppErrorWrapper("GEMINI_API_ERROR", "Boom.")), TwoTierCache(),
+                                 SingleFlight(), budget=1.0)
+    with pytest.raises(AppErrorWrapper):
+        failing.get_explanation(_input())
+
+
+def test_stream_budget_applies_to_the_first_chunk():
+    slow = CachedGeminiClient(FakeGemini(latency=0.3), TwoTierCache(), SingleFlight(), budget=0.05)
+    chunks, output = _drain(slow.stream_explanation(_input()))
+    assert chunks == [output.explanation] and output.source == "template"
+    _wait_for(lambda: slow.stats()["writes"] == 1)
+    assert slow.get_explanation(_input()).source == "gemini"
+
+    fast = CachedGeminiClient(FakeGemini(), TwoTierCache(), SingleFlight(), budget=1.0)
+    chunks, output = _drain(fast.stream_explanation(_input()))
+    assert len(chunks) == 3 and output.source == "gemini"
+    failing = CachedGeminiClient(FakeGemini(error=AppErrorWrapper("GEMINI_API_ERROR", "Boom.")), TwoTierCache(),
+                                 SingleFlight(), budget=1.0)
+    with pytest.raises(AppErrorWrapper):
+        _drain(failing.stream_explanation(_input()))
+
+
+def test_budget_from_env(monkeypatch):
+    monkeypatch.setenv(BUDGET_ENV, "1500")
+    assert CachedGeminiClient(FakeGemini(), TwoTierCache()).budget == 1.5
+    monkeypatch.delenv(BUDGET_ENV)
+    assert CachedGeminiClient(FakeGemini(), TwoTierCache()).budget is None
+    with pytest.raises(ValueError):
+        CachedGeminiClient(FakeGemini(), TwoTierCache(), budget=0)
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not met in time"
+        time.sleep(0.01)
+
+
+def test_attributes_forward_to_client(client):
+    assert client.model == "fake-model"
@@ -0,0 +1,50 @@
+# tests/services/test_explanation_templates.py
+import pytest
+
+from engine.models import HeuristicOutput
+from engine.rule_table import RuleTable
+from services.explanation_templates import DECISION_TEMPLATES, INSUFFICIENT_DATA_TEMPLATE, template_explanation
+from services.models import GeminiInput, CurrentWeatherForGemini, DayForecastForGemini, MAX_EXPLANATION_WORDS
+
+
+def _input(decision="GO", hard_stops=(), temp_c=18.0, feelslike_c=17.0, wind_mph=9.0, pop=10, uv=2.0, precip_mm=0.0):
+    return GeminiInput(
+        location_name="Coventry",
+        current_weather=CurrentWeatherForGemini(temp_c=temp_c, feelslike_c=feelslike_c, wind_mph=wind_mph,
+                                                precip_mm=precip_mm, uv=uv),
+        day_forecast=DayForecastForGemini(daily_chance_of_rain=pop),
+        heuristic_output=HeuristicOutput(decision=decision, weighted_score=60.0, notes="Marginal conditions.",
+                                         hard_stop_reasons=list(hard_stops)),
+    )
+
+
+@pytest.mark.parametrize("decision", ["GO", "MAYBE", "NO-GO"])
+def test_follows_the_decision(decision):
+    output = template_explanation(_input(decision))
+    assert output.source == "template"
+    assert DECISION_TEMPLATES[decision] in output.explanation
+    assert output.explanation.startswith("**Weather Summary:** Marginal conditions. Currently 18°C (feels like 17°C)")
+
+
+def test_unknown_decisions_get_the_insufficient_data_advice():
+    assert INSUFFICIENT_DATA_TEMPLATE in template_explanation(_input("INSUFFICIENT DATA")).explanation
+
+
+def test_tips_follow_the_metrics():
+    calm = template_explanation(_input()).explanation
+    assert "For these conditions" not in calm
+    rough = template_explanation(_input("NO-GO", ["Wind speed is too high."], feelslike_c=-12.0, wind_mph=35.0,
+                                        pop=70, uv=9.0, precip_mm=1.0)).explanation
+    assert "**Hard stops:** Wind speed is too high." in rough
+    for phrase in ("Wind is 35 mph", "feels like -12°C: wear insulating", "waterproof jacket", "UV index is 9"):
+        assert phrase in rough
+    assert len(rough.split()) <= MAX_EXPLANATION_WORDS
+    assert "carry extra water" in template_explanation(_input(feelslike_c=33.0)).explanation
+
+
+def test_tips_follow_the_rule_table():
+    """An overridden threshold changes the tips as it changes the engine's categories."""
+    windy = _input(wind_mph=15.0)
+    assert "Wind is 15 mph" not in template_explanation(windy).explanation
+    strict = RuleTable.from_config({"wind": {"amber": 12, "red": 30}})
+    assert "Wind is 15 mph" in template_explanation(windy, rule_table=strict).explanation
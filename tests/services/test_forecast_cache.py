@@ -0,0 +1,304 @@
+# tests/services/test_forecast_cache.py
+import datetime
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import services.forecast_cache
+from services.forecast_cache import (
+    CachedWeatherApiClient, GRID_ENV, grid_cell, ttl_for_date, PAST_DATE_TTL
+)
+from services.forecast_refresh import BackgroundRefresher
+from services.location_resolver import LocationResolver
+from services.weather_api import WeatherApiClient
+from utils.app_error import AppErrorWrapper
+from utils.cache import TwoTierCache
+from utils.single_flight import SingleFlight
+from utils.token_bucket import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from tests.services.test_weather_api import SAMPLE_CURRENT_WEATHER_RESPONSE
+
+FORECAST_URL = f"{WeatherApiClient.BASE_URL}/forecast.json"
+
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("WEATHERAPI_KEY", "dummy_api_key")
+    monkeypatch.delenv(GRID_ENV, raising=False)
+
+
+@pytest.fixture
+def cached_client(tmp_path):
+    return CachedWeatherApiClient(
+        WeatherApiClient(backoff_base=0), TwoTierCache(path=tmp_path / "forecast.sqlite3"), resolver=LocationResolver()
+    )
+
+
+def test_repeated_lookups_skip_the_network(cached_client, requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    first = cached_client.get_weather_data("Coventry", "2023-01-01")
+    second = cached_client.get_weather_data("  coventry ", "2023-01-01")
+    assert second is first  # Served from memory: no request, no parsing
+    assert requests_mock.call_count == 1
+    assert cached_client.stats()["memory_hits"] == 1
+
+
+def test_different_dates_are_separate_entries(cached_client, requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    cached_client.get_weather_data("Coventry", "2023-01-01")
+    cached_client.get_weather_data("Coventry", "2023-01-02")
+    cached_client.get_hourly_weather_data("Coventry", "2023-01-01")
+    assert requests_mock.call_count == 3
+
+
+def test_disk_tier_serves_a_new_process(tmp_path, requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    path, aliases = tmp_path / "forecast.sqlite3", tmp_path / "aliases.sqlite3"
+    CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(path=path), resolver=LocationResolver(aliases)) \
+        .get_weather_data("Coventry", "2023-01-01")
+    restarted = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(path=path), resolver=LocationResolver(aliases))
+    assert restarted.get_weather_data("Coventry", "2023-01-01").location.name == "London"
+    assert requests_mock.call_count == 1
+    assert restarted.stats()["disk_hits"] == 1
+
+
+def test_errors_are_not_cached(cached_client, requests_mock):
+    requests_mock.get(FORECAST_URL, [{"status_code": 401}, {"json": SAMPLE_CURRENT_WEATHER_RESPONSE}])
+    with pytest.raises(AppErrorWrapper):
+        cached_client.get_weather_data("Coventry", "2023-01-01")
+    assert cached_client.get_weather_data("Coventry", "2023-01-01").location.name == "London"
+    assert requests_mock.call_count == 2
+
+
+def test_ttl_grows_with_lead_time():
+    today = datetime.date(2024, 6, 1)
+    ttls = [ttl_for_date(d, today) for d in (None, "2024-06-01", "2024-06-02", "2024-06-05", "2024-06-14", "2024-07-30")]
+    assert ttls[0] == ttls[1]
+    assert ttls == sorted(ttls)
+    assert ttls[1] < ttls[2] < ttls[3] < ttls[4]
+    assert ttl_for_date("2024-05-01", today) == PAST_DATE_TTL
+
+
+def test_attributes_forward_to_client(cached_client):
+    assert cached_client.MAX_FORECAST_DAYS == WeatherApiClient.MAX_FORECAST_DAYS
+
+
+def test_concurrent_misses_share_one_fetch():
+    """A burst of identical lookups costs one upstream call."""
+    flight = SingleFlight()
+
+    class SlowClient:
+        calls = 0
+
+        def get_weather_data(self, location, date=None):
+            SlowClient.calls += 1
+            # Answer once every caller has joined, however slowly the threads start
+            give_up = time.monotonic() + 5
+            while flight.stats()["calls"] < 25 and time.monotonic() < give_up:
+                time.sleep(0.005)
+            return object()
+
+    client = CachedWeatherApiClient(SlowClient(), TwoTierCache(), flight, LocationResolver())
+    with ThreadPoolExecutor(max_workers=25) as pool:
+        results = list(pool.map(lambda _: client.get_weather_data("Coventry", "2024-06-01"), range(25)))
+    assert SlowClient.calls == 1
+    assert all(r is results[0] for r in results)
+    assert client.stats()["coalesced_calls"] == 24
+
+
+def test_spellings_of_one_place_share_an_entry(cached_client, requests_mock):
+    """Once WeatherAPI has resolved one spelling, others that resolve the same way hit the cache."""
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    first = cached_client.get_weather_data("London", "2023-01-01")
+    cached_client.resolver.learn("London, UK", first.location)
+    assert cached_client.get_weather_data("london uk", "2023-01-01") is first
+    assert requests_mock.call_count == 1
+
+
+def test_resolved_query_is_sent_upstream(tmp_path, requests_mock):
+    payload = dict(SAMPLE_CURRENT_WEATHER_RESPONSE, location={"name": "Coventry", "region": "West Midlands",
+                                                              "country": "United Kingdom", "lat": 52.42, "lon": -1.5})
+    requests_mock.get(FORECAST_URL, json=payload)
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver())
+    client.get_weather_data("Coventry", "2023-01-01")
+    client.get_weather_data("Coventry", "2023-01-02")
+    assert requests_mock.request_history[0].qs["q"] == ["coventry"]
+    assert requests_mock.request_history[1].qs["q"] == ["52.4200,-1.5000"]
+
+
+def test_bulk_fetches_only_distinct_misses(cached_client, requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    requests_mock.post(FORECAST_URL, json=lambda request, context: {"bulk": [
+        {"query": dict(SAMPLE_CURRENT_WEATHER_RESPONSE, location={"name": item["q"], "region": "", "country": "UK"},
+                       custom_id=item["custom_id"])}
+        for item in request.json()["locations"]
+    ]})
+    cached_client.get_weather_data("London", "2023-01-01")
+    london, leeds, york, leeds_again = cached_client.get_weather_data_bulk(["London", "Leeds", "York", "leeds"], "2023-01-01")
+    assert london.location.name == "London" and leeds is leeds_again and york.location.name == "York"
+    assert [item["q"] for item in requests_mock.last_request.json()["locations"]] == ["Leeds", "York"]
+    assert cached_client.get_weather_data("York", "2023-01-01") is york
+    assert requests_mock.call_count == 2
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = time.time()
+
+    def __call__(self):
+        return self.now
+
+
+def _wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_stale_entries_are_served_and_refreshed_in_background(requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    clock = FakeClock()
+    refresher = BackgroundRefresher(interval=60, clock=clock)
+    client = CachedWeatherApiClient(
+        WeatherApiClient(), TwoTierCache(clock=clock), resolver=LocationResolver(), refresher=refresher, clock=clock
+    )
+    ttl = ttl_for_date(None)
+    first = client.get_weather_data("London")
+
+    clock.now += ttl * 1.2  # Past the TTL, inside the grace period
+    assert client.get_weather_data("London") is first  # No waiting on the network
+    _wait_for(lambda: refresher.stats()["refreshed"] == 1)
+    assert requests_mock.call_count == 2
+    assert client.get_weather_data("London") is not first
+    assert requests_mock.call_count == 2
+
+    clock.now += ttl * 2  # Past the grace period: a normal miss
+    client.get_weather_data("London")
+    assert requests_mock.call_count == 3
+    refresher.stop()
+
+
+def test_refreshes_use_the_batch_quota_lane(requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    refresher = BackgroundRefresher(interval=60)
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver(), refresher=refresher)
+    client.get_weather_data("London")
+    client.get_weather_data("London")  # Now tracked under its canonical key
+    refresher.tracker.refresher_for(("day", "london|city of london|uk", datetime.date.today().isoformat()))()
+    lanes = client.client.quota.stats()["weatherapi"]
+    assert (lanes["acquired_interactive"], lanes["acquired_batch"]) == (1, 1)
+    refresher.stop()
+
+
+def test_staleness_follows_the_ttl_an_entry_was_stored_with(requests_mock, monkeypatch):
+    """An entry stored with a 6 h TTL is stale after 6 h, even once lookups of its date use a 1 h TTL."""
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    clock = FakeClock()
+    refresher = BackgroundRefresher(interval=60, clock=clock)
+    client = CachedWeatherApiClient(
+        WeatherApiClient(), TwoTierCache(clock=clock), resolver=LocationResolver(), refresher=refresher, clock=clock
+    )
+    monkeypatch.setattr(services.forecast_cache, "ttl_for_date", lambda date: 6 * 3600)
+    client.get_weather_data("London", "2024-06-08")
+    monkeypatch.setattr(services.forecast_cache, "ttl_for_date", lambda date: 3600)  # The date drew nearer
+
+    clock.now += 5 * 3600
+    client.get_weather_data("London", "2024-06-08")
+    assert refresher.stats()["scheduled"] == 0
+    clock.now += 2 * 3600
+    client.get_weather_data("London", "2024-06-08")
+    assert refresher.stats()["scheduled"] == 1
+    refresher.stop()
+
+
+class LaneClient:
+    """Answers on the interactive lane; on the batch lane, blocks and then reports an exhausted budget."""
+
+    def __init__(self, response):
+        self.priority = PRIORITY_INTERACTIVE
+        self.response = response
+        self.batch_started = threading.Event()
+        self.release = threading.Event()
+
+    def get_weather_data(self, query, date=None):
+        if self.priority == PRIORITY_BATCH:
+            self.batch_started.set()
+            self.release.wait(2)
+            raise AppErrorWrapper("WEATHERAPI_QUOTA_EXHAUSTED", "The batch budget is used up.")
+        return self.response
+
+
+def test_foreground_misses_do_not_wait_on_a_batch_refresh():
+    response = WeatherApiClient.__new__(WeatherApiClient)._parse_weather_data(SAMPLE_CURRENT_WEATHER_RESPONSE)
+    upstream = LaneClient(response)
+    refresher = BackgroundRefresher(interval=60)
+    client = CachedWeatherApiClient(upstream, TwoTierCache(), resolver=LocationResolver(), refresher=refresher)
+    client.get_weather_data("London", "2024-06-01")
+    client.get_weather_data("London", "2024-06-01")  # Now tracked under its canonical key
+    key = ("day", "london|city of london|uk", "2024-06-01")
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        refresh = pool.submit(refresher.tracker.refresher_for(key))
+        assert upstream.batch_started.wait(2)
+        client.cache.clear()
+        threading.Timer(0.5, upstream.release.set).start()  # Lets the old behaviour fail instead of hang
+        assert client.get_weather_data("London", "2024-06-01") is response
+        assert not upstream.release.is_set()  # Answered without waiting for the refresh
+        upstream.release.set()
+        with pytest.raises(AppErrorWrapper):
+            refresh.result()
+    refresher.stop()
+
+
+def test_without_refresher_entries_expire_at_ttl(requests_mock):
+    requests_mock.get(FORECAST_URL, json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    clock = FakeClock()
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(clock=clock), resolver=LocationResolver(),
+                                    refresher=None, clock=clock)
+    client.get_weather_data("London")
+    clock.now += ttl_for_date(None) * 1.2
+    client.get_weather_data("London")
+    assert requests_mock.call_count == 2
+
+
+COVENTRY_PAYLOAD = dict(SAMPLE_CURRENT_WEATHER_RESPONSE, location={
+    "name": "Coventry", "region": "West Midlands", "country": "United Kingdom", "lat": 52.41, "lon": -1.51})
+
+
+def test_grid_cell_keys_points_in_one_cell_alike():
+    assert grid_cell(52.401, -1.49, 0.05) == grid_cell(52.449, -1.455, 0.05)
+    assert grid_cell(52.401, -1.49, 0.05).query == "52.4250,-1.4750"
+    assert grid_cell(52.401, -1.49, 0.05) != grid_cell(52.451, -1.49, 0.05)
+    assert grid_cell(52.401, -1.49, 0.05).key != grid_cell(52.401, -1.49, 0.1).key
+
+
+def test_grid_mode_shares_one_fetch_between_nearby_points(requests_mock):
+    requests_mock.get(FORECAST_URL, json=COVENTRY_PAYLOAD)
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver(), grid_deg=0.05)
+    first = client.get_weather_data("52.401,-1.49", "2023-01-01")
+    assert client.get_weather_data("52.449, -1.455", "2023-01-01") is first
+    assert requests_mock.call_count == 1
+    assert requests_mock.last_request.qs["q"] == ["52.4250,-1.4750"]  # The cell centre, not the typed point
+
+
+def test_grid_mode_caches_text_under_its_cell(requests_mock):
+    """A place name WeatherAPI resolves inside a cell shares the cell's entry with coordinate lookups."""
+    requests_mock.get(FORECAST_URL, json=COVENTRY_PAYLOAD)
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver(), grid_deg=0.05)
+    by_name = client.get_weather_data("Coventry", "2023-01-01")
+    assert client.get_weather_data("52.43,-1.52", "2023-01-01") is by_name
+    assert client.get_weather_data("coventry", "2023-01-01") is by_name
+    assert requests_mock.call_count == 1
+
+
+def test_grid_mode_is_off_by_default(requests_mock, monkeypatch):
+    requests_mock.get(FORECAST_URL, json=COVENTRY_PAYLOAD)
+    client = CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver())
+    client.get_weather_data("52.401,-1.49", "2023-01-01")
+    client.get_weather_data("52.449,-1.455", "2023-01-01")
+    assert requests_mock.call_count == 2
+    monkeypatch.setenv(GRID_ENV, "0.1")
+    assert CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver()).grid_deg == 0.1
+    with pytest.raises(ValueError):
+        CachedWeatherApiClient(WeatherApiClient(), TwoTierCache(), resolver=LocationResolver(), grid_deg=0)
@@ -0,0 +1,79 @@
+# tests/services/test_forecast_refresh.py
+import pytest
+
+from services.forecast_refresh import BackgroundRefresher, HotnessTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def test_hotness_decays_with_half_life(clock):
+    tracker = HotnessTracker(half_life=100, clock=clock)
+    tracker.touch("a", lambda: None)
+    tracker.touch("a", lambda: None)
+    clock.now += 100
+    assert tracker.score("a") == pytest.approx(1.0)
+    assert tracker.score("unknown") == 0.0
+
+
+def test_tracker_forgets_the_coldest_keys(clock):
+    tracker = HotnessTracker(max_keys=8, clock=clock)
+    for _ in range(3):
+        tracker.touch("hot", lambda: None)
+    for i in range(8):
+        tracker.touch(f"cold{i}", lambda: None)
+    assert len(tracker) <= 8
+    assert tracker.score("hot") > 0
+
+
+def test_proactive_rounds_keep_hot_keys_warm_and_skip_the_long_tail(clock):
+    refreshed = []
+    refresher = BackgroundRefresher(HotnessTracker(clock=clock), interval=30, min_hotness=2, clock=clock)
+    for key, requests in (("hot", 5), ("warm", 2), ("tail", 1), ("fresh", 9)):
+        for _ in range(requests):
+            refresher.tracker.touch(key, lambda key=key: refreshed.append(key))
+    for key in ("hot", "warm", "tail"):
+        refresher.tracker.mark_stored(key, clock.now + 10)  # Stale before the next round
+    refresher.tracker.mark_stored("fresh", clock.now + 3600)
+
+    assert refresher.run_once() == 2
+    assert sorted(refreshed) == ["hot", "warm"]
+    assert refresher.stats()["proactive"] == 2
+    refresher.stop()
+
+
+def test_scheduled_keys_go_first_and_rounds_are_capped(clock):
+    refreshed = []
+    refresher = BackgroundRefresher(HotnessTracker(clock=clock), max_per_round=2, max_workers=1, clock=clock)
+    for key in ("a", "b", "c"):
+        for _ in range(3):
+            refresher.tracker.touch(key, lambda key=key: refreshed.append(key))
+        refresher.tracker.mark_stored(key, clock.now)
+    refresher._pending["c"] = None  # As schedule() would, without waking the thread
+    assert refresher.run_once() == 2
+    assert refreshed[0] == "c" and len(refreshed) == 2
+    refresher.stop()
+
+
+def test_failed_refreshes_back_off(clock):
+    def fail():
+        raise RuntimeError("upstream down")
+
+    refresher = BackgroundRefresher(HotnessTracker(clock=clock), clock=clock)
+    for _ in range(3):
+        refresher.tracker.touch("a", fail)
+    refresher.tracker.mark_stored("a", clock.now)
+    assert refresher.run_once() == 0
+    assert refresher.run_once() == 0
+    assert refresher.stats()["failed"] == 1  # Not retried until FAILED_REFRESH_DELAY has passed
+    refresher.stop()
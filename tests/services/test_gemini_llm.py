@@ -155,6 +155,21 @@ def test_api_error(mock_genai, gemini_client, sample_gemini_input):
     assert exc_info.value.error_code == "GEMINI_API_ERROR"
 
 
+def test_rate_limit_backs_off_all_workers(mock_genai, gemini_client, sample_gemini_input):
+    """A 429 from Gemini empties the shared budget, so the next call fails fast without calling Gemini."""
+    generate = mock_genai.GenerativeModel.return_value.generate_content
+    generate.side_effect = google.api_core.exceptions.ResourceExhausted("Quota exceeded")
+
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        gemini_client.get_explanation(sample_gemini_input)
+    assert exc_info.value.error_code == "GEMINI_RATE_LIMITED"
+
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        gemini_client.get_explanation(sample_gemini_input)
+    assert exc_info.value.error_code == "GEMINI_QUOTA_EXHAUSTED"
+    assert generate.call_count == 1
+
+
 def test_timeout_error(mock_genai, gemini_client, sample_gemini_input):
     """Test handling of timeout errors."""
     mock_genai.GenerativeModel.return_value.generate_content.side_effect = \
@@ -175,3 +190,84 @@ def test_unexpected_error(mock_genai, gemini_client, sample_gemini_input):
         gemini_client.get_explanation(sample_gemini_input)
     
     assert exc_info.value.error_code == "GEMINI_UNEXPECTED_ERROR"
+
+
+def _stream_chunk(text, finish_reason="FINISH_REASON_UNSPECIFIED"):
+    chunk = MagicMock()
+    chunk.candidates = [MagicMock()]
+    chunk.candidates[0].finish_reason.name = finish_reason
+    chunk.candidates[0].content.parts = [MagicMock(text=text)]
+    return chunk
+
+
+def _stream_response(*chunks):
+    response = MagicMock()
+    response.prompt_feedback.block_reason = None
+    response.__iter__.return_value = iter(chunks)
+    return response
+
+
+def test_stream_explanation_yields_chunks(mock_genai, gemini_client, sample_gemini_input):
+    generate = mock_genai.GenerativeModel.return_value.generate_content
+    generate.return_value = _stream_response(_stream_chunk("Conditions are "), _stream_chunk("good.", "STOP"))
+
+    stream = gemini_client.stream_explanation(sample_gemini_input)
+    assert [next(stream), next(stream)] == ["Conditions are ", "good."]
+    with pytest.raises(StopIteration) as finished:
+        next(stream)
+    assert finished.value.value == GeminiOutput(explanation="Conditions are good.")
+    assert generate.call_args.kwargs == {"stream": True}
+
+
+def test_stream_stops_at_a_mid_stream_block(mock_genai, gemini_client, sample_gemini_input):
+    mock_genai.GenerativeModel.return_value.generate_content.return_value = _stream_response(
+        _stream_chunk("Conditions are "), _stream_chunk("", "SAFETY"), _stream_chunk("never sent.", "STOP")
+    )
+    stream = gemini_client.stream_explanation(sample_gemini_input)
+    assert next(stream) == "Conditions are "
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        next(stream)
+    assert exc_info.value.error_code == "GEMINI_RESPONSE_BLOCKED"
+
+
+def test_stream_enforces_the_word_limit_as_it_goes(mock_genai, gemini_client, sample_gemini_input):
+    consumed = []
+    chunks = [_stream_chunk("word " * 200) for _ in range(5)]
+    response = _stream_response()
+    response.__iter__.return_value = (consumed.append(chunk) or chunk for chunk in chunks)
+    mock_genai.GenerativeModel.return_value.generate_content.return_value = response
+
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        list(gemini_client.stream_explanation(sample_gemini_input))
+    assert exc_info.value.error_code == "GEMINI_VALIDATION_ERROR"
+    assert len(consumed) == 2  # Failed on the chunk that crossed 350 words, without reading the rest
+
+
+def test_stream_blocked_prompt_and_early_end(mock_genai, gemini_client, sample_gemini_input):
+    generate = mock_genai.GenerativeModel.return_value.generate_content
+    blocked = _stream_response()
+    blocked.prompt_feedback.block_reason = MagicMock()
+    blocked.prompt_feedback.block_reason.name = "SAFETY"
+    generate.return_value = blocked
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        list(gemini_client.stream_explanation(sample_gemini_input))
+    assert exc_info.value.error_code == "GEMINI_PROMPT_BLOCKED"
+
+    generate.return_value = _stream_response(_stream_chunk("Conditions are "))
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        list(gemini_client.stream_explanation(sample_gemini_input))
+    assert exc_info.value.error_code == "GEMINI_INCOMPLETE_RESPONSE"
+
+
+def test_stream_maps_errors_raised_mid_stream(mock_genai, gemini_client, sample_gemini_input):
+    def chunks():
+        yield _stream_chunk("Conditions are ")
+        raise google.api_core.exceptions.DeadlineExceeded("Timeout")
+
+    response = _stream_response()
+    response.__iter__.return_value = chunks()
+    mock_genai.GenerativeModel.return_value.generate_content.return_value = response
+
+    with pytest.raises(AppErrorWrapper) as exc_info:
+        list(gemini_client.stream_explanation(sample_gemini_input))
+    assert exc_info.value.error_code == "GEMINI_TIMEOUT"
@@ -0,0 +1,65 @@
+# tests/services/test_lean_decoder.py
+import json
+
+import pytest
+
+from benchmarks.payloads import forecast_payload
+from services.lean_decoder import decode_first_day, decode_payload, LeanDecodeError
+from services.weather_api import WeatherApiClient
+
+
+@pytest.fixture(autouse=True)
+def mock_env_vars(monkeypatch):
+    monkeypatch.setenv("WEATHERAPI_KEY", "dummy_api_key")
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_first_day_matches_full_decode(indent):
+    payload = forecast_payload(days=1)
+    lean = decode_first_day(json.dumps(payload, indent=indent).encode("utf-8"))
+    day = payload["forecast"]["forecastday"][0]
+    assert lean["location"] == payload["location"]
+    assert lean["forecast"]["forecastday"] == [{"date": day["date"], "day": day["day"], "hour": day["hour"][:1]}]
+
+
+def test_lean_and_full_parse_build_the_same_model():
+    raw = json.dumps(forecast_payload(days=1)).encode("utf-8")
+    client = WeatherApiClient()
+    assert client._parse_weather_data(decode_first_day(raw)) == client._parse_weather_data(decode_payload(raw))
+
+
+def test_key_order_does_not_matter():
+    payload = forecast_payload(days=1)
+    day = payload["forecast"]["forecastday"][0]
+    reordered = {"forecast": {"forecastday": [{"hour": day["hour"], "astro": day["astro"], "day": day["day"], "date": day["date"]}]},
+                 "location": payload["location"]}
+    lean = decode_first_day(json.dumps(reordered))
+    assert lean["forecast"]["forecastday"][0]["date"] == day["date"]
+    assert lean["forecast"]["forecastday"][0]["hour"] == day["hour"][:1]
+
+
+def test_empty_forecast_and_empty_hours():
+    assert decode_first_day('{"location": {}, "forecast": {"forecastday": [ ]}}')["forecast"]["forecastday"] == []
+    lean = decode_first_day('{"location": {}, "forecast": {"forecastday": [{"date": "2024-06-01", "day": {}, "hour": []}]}}')
+    assert lean["forecast"]["forecastday"][0]["hour"] == []
+
+
+@pytest.mark.parametrize("body", [
+    '{"forecast": {"forecastday": []}}',                      # No location
+    '{"location": {}, "forecast": {}}',                      # No forecastday
+    '{"location": {}, "forecast": {"forecastday": [{"date": "2024-06-01", "day": {}}]}}',  # No hour
+    '{"location": {"name": ',                                # Truncated
+])
+def test_unexpected_layouts_raise(body):
+    with pytest.raises(LeanDecodeError):
+        decode_first_day(body)
+
+
+def test_client_falls_back_to_full_decode(requests_mock):
+    """A payload without hourly data still parses, with 'current' defaulting to 0 as before."""
+    payload = {"location": {"name": "London", "region": "", "country": "UK"},
+               "forecast": {"forecastday": [{"date": "2023-01-01", "day": {"daily_chance_of_rain": 5, "maxtemp_c": 3, "mintemp_c": 1}}]}}
+    requests_mock.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=payload)
+    weather = WeatherApiClient().get_weather_data("London")
+    assert weather.current.temp_c == 0
+    assert weather.forecast.forecastday[0].day.daily_chance_of_rain == 5
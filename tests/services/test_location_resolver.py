@@ -0,0 +1,77 @@
+# tests/services/test_location_resolver.py
+import timeit
+
+import pytest
+
+from services.lean_weather_models import Location
+from services.location_resolver import (
+    DEFAULT_GAZETTEER_FILE, Gazetteer, LocationResolver, canonical_key, normalize_query
+)
+
+COVENTRY = Location(name="Coventry", region="West Midlands", country="United Kingdom", lat=52.42, lon=-1.5)
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer.from_csv(DEFAULT_GAZETTEER_FILE)
+
+
+def test_normalize_query():
+    assert normalize_query("  Coventry,  UK. ") == "coventry uk"
+    assert normalize_query("Stoke-on-Trent") == "stoke-on-trent"
+    assert normalize_query("52.42, -1.5") == "52.42 -1.5"
+
+
+def test_canonical_key_prefers_names():
+    assert canonical_key(COVENTRY) == "coventry|west midlands|united kingdom"
+    assert canonical_key(Location(name="", region="", country="", lat=52.41999, lon=-1.5)) == "@52.420,-1.500"
+
+
+@pytest.mark.parametrize("text", ["coventry", "Coventry, UK", "Coventry West Midlands", "COVENTRY, West Midlands, England"])
+def test_gazetteer_spellings_agree(gazetteer, text):
+    resolved = LocationResolver(gazetteer=gazetteer).resolve(text)
+    assert resolved.key == canonical_key(COVENTRY)
+    assert resolved.query == "52.4200,-1.5000"
+
+
+def test_unknown_input_resolves_to_its_normalized_form():
+    resolver = LocationResolver()
+    assert resolver.resolve(" Much  Wenlock ") == ("much wenlock", "Much  Wenlock")
+    assert resolver.stats()["unresolved"] == 1
+
+
+def test_learned_aliases_override_the_gazetteer(gazetteer):
+    resolver = LocationResolver(gazetteer=gazetteer)
+    elsewhere = Location(name="Coventry", region="Rhode Island", country="United States of America")
+    assert resolver.learn("Coventry", elsewhere) == canonical_key(elsewhere)
+    assert resolver.resolve("coventry").key == canonical_key(elsewhere)
+    assert resolver.resolve("coventry uk").key == canonical_key(COVENTRY)
+
+
+def test_coordinates_round_to_a_shared_key():
+    resolver = LocationResolver()
+    assert resolver.resolve("52.42001,-1.50002").key == resolver.resolve(" 52.42 , -1.5 ").key == "@52.420,-1.500"
+    assert resolver.learn("52.42,-1.5", COVENTRY) == "@52.420,-1.500"  # Coordinates are not re-keyed by name
+
+
+def test_resolved_coordinates(gazetteer):
+    resolver = LocationResolver(gazetteer=gazetteer)
+    assert resolver.resolve(" 52.42 , -1.5 ").coordinates == (52.42, -1.5)
+    assert resolver.resolve("Coventry, UK").coordinates == (52.42, -1.5)
+    assert resolver.resolve("Much Wenlock").coordinates is None
+
+
+def test_aliases_persist_and_are_shared(tmp_path):
+    path = tmp_path / "aliases.sqlite3"
+    writer, reader = LocationResolver(path), LocationResolver(path)
+    writer.learn("Cov", COVENTRY)
+    assert reader.resolve("cov").key == canonical_key(COVENTRY)  # Picked up from disk on a miss
+    writer.close()
+    assert LocationResolver(path).resolve("COV").query == "52.4200,-1.5000"
+
+
+def test_repeat_lookups_take_microseconds(gazetteer):
+    resolver = LocationResolver(gazetteer=gazetteer)
+    resolver.learn("Leamington", COVENTRY)
+    per_call = min(timeit.repeat(lambda: resolver.resolve("Leamington"), number=2_000, repeat=3)) / 2_000
+    assert per_call < 50e-6
@@ -1,4 +1,4 @@
-from services.report_generator import generate_report
+from services.report_generator import generate_report, format_report_as_text
 from services.lean_weather_models import LeanWeatherApiResponse  # FIX: Use Lean model
 from services.models import GeminiOutput
 from engine.models import HeuristicOutput
@@ -52,4 +52,29 @@ def test_generate_report_assembles_data_correctly():
     assert report.assessment_date == mock_assessment_date
     assert report.weather_data == mock_weather_data
     assert report.heuristic_output == mock_heuristic_output
-    assert report.ai_explanation == mock_ai_explanation
\ No newline at end of file
+    assert report.ai_explanation == mock_ai_explanation
+
+
+def test_format_report_as_text_includes_key_sections():
+    """Tests the human-readable TXT export of a report. (Story 5.2)"""
+    weather_data = LeanWeatherApiResponse.model_validate({
+        "location": {"name": "Test City", "region": "Test Region", "country": "Testland"},
+        "current": {"temp_c": 10.0, "wind_mph": 5.0, "precip_mm": 0.0, "uv": 3.0, "feelslike_c": 9.0},
+        "forecast": {"forecastday": [{"date": "2026-01-26", "day": {"daily_chance_of_rain": 20, "maxtemp_c": 15.0, "mintemp_c": 5.0}}]}
+    })
+    report = generate_report(
+        location_name="Test City",
+        assessment_date="2026-01-26",
+        weather_data=weather_data,
+        heuristic_output=HeuristicOutput(decision="NO-GO", notes="Too windy.", weighted_score=40.0,
+                                         hard_stop_reasons=["Wind speed is at a dangerous level (>= 32 mph)."]),
+        ai_explanation=GeminiOutput(explanation="Stay home today.")
+    )
+
+    text = format_report_as_text(report)
+
+    assert "Location: Test City" in text
+    assert "Decision: NO-GO" in text
+    assert "Safety Score: 40.0/100" in text
+    assert "Wind speed is at a dangerous level" in text
+    assert "Stay home today." in text
@@ -0,0 +1,128 @@
+# tests/services/test_route_planner.py
+import json
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from benchmarks.payloads import forecast_payload
+from services.lean_weather_models import LeanHourlyWeatherResponse, LeanHourlySeries, LeanWeatherApiResponse
+from services.route_planner import parse_track, sample_waypoints, assess_route, TrackPoint
+from utils.app_error import AppErrorWrapper
+from utils.geo import haversine_km, snap_to_grid
+
+GPX = """<?xml version="1.0"?>
+<gpx version="1.1" xmlns="http://www.topografix.com/GPX/1/1">
+  <trk><trkseg>
+    <trkpt lat="52.0" lon="-1.5"><ele>100</ele></trkpt>
+    <trkpt lat="52.1" lon="-1.5"></trkpt>
+  </trkseg></trk>
+</gpx>"""
+
+
+class FakeHourlyClient:
+    """Serves calm hourly forecasts, except for the given (location, hour) overrides."""
+
+    def __init__(self, windy=(), delay=0.0):
+        self.windy = set(windy)
+        self.delay = delay
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def get_hourly_weather_data(self, location, date=None):
+        with self.lock:
+            self.calls.append((location, date))
+        time.sleep(self.delay)
+        payload = forecast_payload(days=1, start=datetime.strptime(date, "%Y-%m-%d").date())
+        day = payload["forecast"]["forecastday"][0]
+        for hour in day["hour"]:
+            hour_index = int(hour["time"][-5:-3])
+            hour.update(feelslike_c=18.0, chance_of_rain=10, precip_mm=0.0, uv=1.0,
+                        wind_mph=45.0 if (location, hour_index) in self.windy else 5.0)
+        payload["current"] = {key: day["hour"][0][key] for key in ("temp_c", "feelslike_c", "wind_mph", "precip_mm", "uv")}
+        return LeanHourlyWeatherResponse(
+            weather=LeanWeatherApiResponse.model_validate(payload),
+            hourly=LeanHourlySeries.from_hours(day["date"], day["hour"])
+        )
+
+
+def _line(n, step_deg=0.1):
+    return [TrackPoint(lat=52.0 + i * step_deg, lon=-1.5) for i in range(n)]
+
+
+def test_parse_gpx_track_points():
+    points = parse_track(GPX.encode("utf-8"), "walk.gpx")
+    assert [(p.lat, p.lon) for p in points] == [(52.0, -1.5), (52.1, -1.5)]
+
+
+def test_parse_geojson_feature_collection():
+    geojson = {"type": "FeatureCollection", "features": [
+        {"type": "Feature", "geometry": {"type": "LineString", "coordinates": [[-1.5, 52.0, 90], [-1.4, 52.1]]}}
+    ]}
+    points = parse_track(json.dumps(geojson), "ride.geojson")
+    assert [(p.lat, p.lon) for p in points] == [(52.0, -1.5), (52.1, -1.4)]
+
+
+@pytest.mark.parametrize("content", ["<gpx><trk></gpx", "{}", "not a track"])
+def test_parse_invalid_track_raises(content):
+    with pytest.raises(AppErrorWrapper):
+        parse_track(content)
+
+
+def test_sample_waypoints_keeps_start_and_end():
+    points = _line(2)  # ~11.1 km
+    waypoints = sample_waypoints(points, spacing_km=2.0)
+    assert waypoints[0].distance_km == 0.0
+    assert [w.distance_km for w in waypoints[1:-1]] == [2.0, 4.0, 6.0, 8.0, 10.0]
+    assert waypoints[-1].distance_km == pytest.approx(haversine_km(52.0, -1.5, 52.1, -1.5))
+    assert (waypoints[-1].lat, waypoints[-1].lon) == (52.1, -1.5)
+
+
+def test_snap_to_grid_shares_cells():
+    assert snap_to_grid(52.01, -1.51, 0.05) == snap_to_grid(52.04, -1.54, 0.05)
+    assert snap_to_grid(52.01, -1.5, 0.05) != snap_to_grid(52.06, -1.5, 0.05)
+
+
+def test_nearby_waypoints_share_one_fetch():
+    """Waypoints in the same grid cell and on the same date are fetched once."""
+    client = FakeHourlyClient()
+    points = [TrackPoint(lat=52.0, lon=-1.5), TrackPoint(lat=52.004, lon=-1.5)]  # ~450 m
+    result = assess_route(client, points, datetime(2024, 6, 1, 9), spacing_km=0.1, grid_deg=0.05)
+    assert len(result.segments) > 3
+    assert result.fetch_count == 1
+    assert len(client.calls) == 1
+
+
+def test_segments_scored_at_arrival_hour():
+    """A segment reached during a windy hour is NO-GO and drives the route decision."""
+    points = _line(3)  # ~22 km at 5 km/h: arrives ~13:27 at the end
+    last_cell = "52.2250,-1.4750"
+    client = FakeHourlyClient(windy={(last_cell, 13)})
+    result = assess_route(client, points, datetime(2024, 6, 1, 9), speed_kmh=5.0, spacing_km=5.0, grid_deg=0.05)
+
+    assert result.segments[0].arrival_time == "2024-06-01 09:00"
+    assert result.segments[-1].grid_cell == last_cell
+    assert result.segments[-1].arrival_time.startswith("2024-06-01 13:")
+    assert result.segments[-1].decision == "NO-GO"
+    assert all(segment.decision == "GO" for segment in result.segments[:-1])
+    assert result.overall_decision == "NO-GO"
+
+
+def test_route_crossing_midnight_fetches_next_day():
+    client = FakeHourlyClient()
+    result = assess_route(client, _line(2), datetime(2024, 6, 1, 22), speed_kmh=5.0, spacing_km=5.0)
+    assert {date for _, date in client.calls} == {"2024-06-01", "2024-06-02"}
+    assert result.segments[-1].arrival_time.startswith("2024-06-02 00:")
+    assert result.overall_decision == "GO"
+
+
+def test_fetches_run_concurrently():
+    """A 50-waypoint route takes about as long as a single request."""
+    client = FakeHourlyClient(delay=0.2)
+    points = [TrackPoint(lat=52.0 + i * 0.1, lon=-1.5) for i in range(50)]
+    start = time.perf_counter()
+    result = assess_route(client, points, datetime(2024, 6, 1, 0), speed_kmh=200.0, spacing_km=11.0, max_workers=64)
+    elapsed = time.perf_counter() - start
+    assert result.fetch_count >= 40
+    assert elapsed < 0.2 * 5
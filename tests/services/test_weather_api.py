@@ -5,11 +5,14 @@ import requests_mock
 import os
 from dotenv import load_dotenv
 import requests.exceptions
+import numpy as np
 
+from services.quota import WEATHERAPI_BUCKET
 from services.weather_api import WeatherApiClient
 from services.models import WeatherApiResponse
-from services.lean_weather_models import LeanWeatherApiResponse  # FIX: Add this import
+from services.lean_weather_models import LeanWeatherApiResponse, LeanHourlyWeatherResponse, LeanForecastRange  # FIX: Add this import
 from utils.app_error import AppErrorWrapper
+from utils.token_bucket import BucketConfig, QuotaManager
 
 # --- Fixtures ---
 @pytest.fixture(autouse=True)
@@ -201,4 +204,200 @@ def test_no_forecast_for_date_error(weather_api_client, mock_weather_api):
     with pytest.raises(AppErrorWrapper) as excinfo:
         weather_api_client.get_weather_data(location="Futureland", date="2024-12-31")
     assert excinfo.value.error_code == "WEATHERAPI_NO_FORECAST_FOR_DATE"
-    assert "No forecast data available" in excinfo.value.user_message
\ No newline at end of file
+    assert "No forecast data available" in excinfo.value.user_message
+
+def test_get_hourly_weather_data_keeps_every_hour(weather_api_client, mock_weather_api):
+    """Test that hourly mode keeps all hourly records as arrays from a single request."""
+    hours = [
+        {"time": f"2023-01-02 {h:02d}:00", "temp_c": 10.0 + h, "feelslike_c": 8.0 + h,
+         "wind_mph": 5.0, "precip_mm": 0.0, "uv": 1.0, "chance_of_rain": h}
+        for h in range(24)
+    ]
+    hours[5]["uv"] = None
+    payload = {
+        "location": SAMPLE_FORECAST_WEATHER_RESPONSE["location"],
+        "forecast": {"forecastday": [{**SAMPLE_FORECAST_WEATHER_RESPONSE["forecast"]["forecastday"][0], "hour": hours}]}
+    }
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=payload)
+
+    data = weather_api_client.get_hourly_weather_data(location="London", date="2023-01-02")
+
+    assert isinstance(data, LeanHourlyWeatherResponse)
+    assert mock_weather_api.call_count == 1
+    assert data.weather.current.temp_c == 10.0
+    assert len(data.hourly) == 24
+    assert data.hourly.date == "2023-01-02"
+    assert data.hourly.time[14] == "2023-01-02 14:00"
+    assert data.hourly.feelslike_c[14] == 22.0
+    assert data.hourly.chance_of_rain[23] == 23
+    assert np.isnan(data.hourly.uv[5])
+
+
+def test_get_forecast_range_fetches_all_days_in_one_request(weather_api_client, mock_weather_api):
+    """Test that a multi-day range is one request with days=N and keeps every day's hours."""
+    forecast_days = [
+        {
+            "date": f"2023-01-{d:02d}",
+            "day": {"daily_chance_of_rain": 10 * d, "maxtemp_c": 12.0, "mintemp_c": 5.0},
+            "hour": [{"time": f"2023-01-{d:02d} {h:02d}:00", "wind_mph": float(d), "feelslike_c": 8.0,
+                      "precip_mm": 0.0, "uv": 1.0, "chance_of_rain": 0, "temp_c": 9.0} for h in range(24)]
+        }
+        for d in range(1, 8)
+    ]
+    payload = {"location": SAMPLE_FORECAST_WEATHER_RESPONSE["location"], "forecast": {"forecastday": forecast_days}}
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=payload)
+
+    data = weather_api_client.get_forecast_range(location="London", days=7)
+
+    assert isinstance(data, LeanForecastRange)
+    assert mock_weather_api.call_count == 1
+    assert mock_weather_api.last_request.qs["days"] == ["7"]
+    assert "dt" not in mock_weather_api.last_request.qs
+    assert data.dates[0] == "2023-01-01"
+    assert data.hourly_matrix("wind_mph").shape == (7, 24)
+    assert data.hourly_matrix("wind_mph")[6, 0] == 7.0
+
+
+@pytest.mark.parametrize("days", [0, 15])
+def test_get_forecast_range_rejects_out_of_range_days(weather_api_client, days):
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        weather_api_client.get_forecast_range(location="London", days=days)
+    assert excinfo.value.error_code == "WEATHERAPI_INVALID_RANGE"
+
+
+# --- Pooled session and retry tests ---
+
+def test_clients_share_one_pooled_session():
+    """Clients created per assessment reuse the same keep-alive connection pool."""
+    first, second = WeatherApiClient(), WeatherApiClient()
+    assert first.session is second.session
+    adapter = first.session.get_adapter(WeatherApiClient.BASE_URL)
+    assert adapter._pool_maxsize == 10
+    assert WeatherApiClient(pool_size=3).session.get_adapter(WeatherApiClient.BASE_URL)._pool_maxsize == 3
+
+
+def test_retries_5xx_then_succeeds(mock_weather_api):
+    mock_weather_api.get(
+        f"{WeatherApiClient.BASE_URL}/forecast.json",
+        [{"status_code": 503}, {"json": SAMPLE_CURRENT_WEATHER_RESPONSE, "status_code": 200}]
+    )
+    weather_data = WeatherApiClient(backoff_base=0).get_weather_data(location="London")
+    assert weather_data.location.name == "London"
+    assert mock_weather_api.call_count == 2
+
+
+def test_retries_timeouts_then_maps_error(mock_weather_api):
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", exc=requests.exceptions.Timeout)
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        WeatherApiClient(max_retries=2, backoff_base=0).get_weather_data(location="London")
+    assert excinfo.value.error_code == "WEATHERAPI_TIMEOUT"
+    assert mock_weather_api.call_count == 3
+
+
+def test_client_errors_are_not_retried(mock_weather_api):
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=401)
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        WeatherApiClient(backoff_base=0).get_weather_data(location="London")
+    assert excinfo.value.error_code == "WEATHERAPI_AUTH_FAILED"
+    assert mock_weather_api.call_count == 1
+
+
+def test_deadline_caps_the_timeout_and_the_retries(mock_weather_api):
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", exc=requests.exceptions.Timeout)
+    client = WeatherApiClient(max_retries=5)
+    client._backoff_delay = lambda attempt: 1.0
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        client.get_weather_data(location="London", deadline=0.5)
+    assert excinfo.value.error_code == "WEATHERAPI_TIMEOUT"
+    assert mock_weather_api.call_count == 1  # A retry could not finish its backoff in time
+    assert mock_weather_api.request_history[0].timeout <= 0.5
+
+
+def test_backoff_is_jittered_and_capped():
+    client = WeatherApiClient(backoff_base=1.0)
+    delays = [client._backoff_delay(attempt) for attempt in range(10) for _ in range(20)]
+    assert all(0 <= delay <= 4.0 for delay in delays)
+    assert len(set(delays)) > 1
+
+
+def test_rate_limit_penalizes_the_shared_budget(mock_weather_api):
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=429, headers={"Retry-After": "120"})
+    client = WeatherApiClient(backoff_base=0)
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        client.get_weather_data(location="London")
+    assert excinfo.value.error_code == "WEATHERAPI_RATE_LIMITED"
+    with pytest.raises(AppErrorWrapper) as excinfo:
+        WeatherApiClient().get_weather_data(location="London")  # Never reaches the API
+    assert excinfo.value.error_code == "WEATHERAPI_QUOTA_EXHAUSTED"
+    assert mock_weather_api.call_count == 1
+
+
+def test_every_attempt_takes_a_token(mock_weather_api):
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", exc=requests.exceptions.Timeout)
+    client = WeatherApiClient(max_retries=2, backoff_base=0)
+    with pytest.raises(AppErrorWrapper):
+        client.get_weather_data(location="London")
+    assert client.quota.stats()["weatherapi"]["acquired_interactive"] == 3
+
+
+def _bulk_response(request, context):
+    """Answers a bulk POST like WeatherAPI: one item per location, errors for 'Nowhere'."""
+    items = []
+    for item in request.json()["locations"]:
+        if item["q"] == "Nowhere":
+            query = {"error": {"code": 1006, "message": "No matching location found."}}
+        else:
+            query = dict(SAMPLE_CURRENT_WEATHER_RESPONSE, location={"name": item["q"], "region": "", "country": "UK"})
+        items.append({"query": dict(query, q=item["q"], custom_id=item["custom_id"])})
+    return {"bulk": items}
+
+
+def test_bulk_splits_results_per_location(mock_weather_api):
+    mock_weather_api.post(f"{WeatherApiClient.BASE_URL}/forecast.json", json=_bulk_response)
+    locations = [f"Town {i}" for i in range(120)]
+    roomy = QuotaManager({WEATHERAPI_BUCKET: BucketConfig(rate=1000, capacity=1000)})
+    results = WeatherApiClient(quota=roomy).get_weather_data_bulk(locations, "2023-01-01")
+    assert [r.location.name for r in results] == locations
+    assert all(isinstance(r, LeanWeatherApiResponse) for r in results)
+    assert mock_weather_api.call_count == 3  # 50 + 50 + 20
+    assert mock_weather_api.request_history[0].qs["q"] == ["bulk"]
+    assert mock_weather_api.request_history[0].qs["dt"] == ["2023-01-01"]
+
+
+def test_bulk_post_costs_one_token_per_location(mock_weather_api):
+    """WeatherAPI bills a bulk call per location, so the shared budget must too."""
+    mock_weather_api.post(f"{WeatherApiClient.BASE_URL}/forecast.json", json=_bulk_response)
+    quota = QuotaManager({WEATHERAPI_BUCKET: BucketConfig(rate=1e-6, capacity=30)})
+    WeatherApiClient(quota=quota).get_weather_data_bulk([f"Town {i}" for i in range(12)])
+    assert quota.budget(WEATHERAPI_BUCKET) == pytest.approx(18)
+
+
+def test_bulk_item_errors_fall_back_to_single_requests(mock_weather_api):
+    mock_weather_api.post(f"{WeatherApiClient.BASE_URL}/forecast.json", json=_bulk_response)
+    mock_weather_api.get(
+        f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=400,
+        json={"error": {"code": 1006, "message": "No matching location found."}}
+    )
+    leeds, nowhere = WeatherApiClient().get_weather_data_bulk(["Leeds", "Nowhere"], return_exceptions=True)
+    assert leeds.location.name == "Leeds"
+    assert nowhere.error_code == "WEATHERAPI_BAD_REQUEST_1006"
+    assert [r.method for r in mock_weather_api.request_history] == ["POST", "GET"]
+    with pytest.raises(AppErrorWrapper):
+        WeatherApiClient().get_weather_data_bulk(["Leeds", "Nowhere"])
+
+
+def test_failed_bulk_call_falls_back_to_single_requests(mock_weather_api):
+    mock_weather_api.post(f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=403)
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    results = WeatherApiClient().get_weather_data_bulk(["Leeds", "York"])
+    assert [r.location.name for r in results] == ["London", "London"]
+    assert mock_weather_api.call_count == 3
+
+
+def test_bulk_post_is_not_retried(mock_weather_api):
+    """A 5xx may come after the batch was processed; replaying it would spend the quota twice."""
+    mock_weather_api.post(f"{WeatherApiClient.BASE_URL}/forecast.json", status_code=503)
+    mock_weather_api.get(f"{WeatherApiClient.BASE_URL}/forecast.json", json=SAMPLE_CURRENT_WEATHER_RESPONSE)
+    WeatherApiClient(max_retries=2, backoff_base=0).get_weather_data_bulk(["Leeds", "York"])
+    methods = [request.method for request in mock_weather_api.request_history]
+    assert methods == ["POST", "GET", "GET"]
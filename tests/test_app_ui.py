@@ -1,5 +1,16 @@
+from pathlib import Path
+
+import pytest
 from streamlit.testing.v1 import AppTest
 
+import services.clients
+import services.file_logger
+from services.clients import GEMINI_CLIENT, WEATHER_CLIENT, ClientRegistry
+from services.explanation_templates import FALLBACK_ERROR_CODES
+from utils.app_error import AppErrorWrapper
+
+APP_FILE = Path(__file__).parent.parent / "app.py"
+
 def test_location_input_renders():
     """
     Test that the location input widget renders correctly.
@@ -19,3 +30,57 @@ def test_location_input_captures_user_text():
     text_input = at.text_input(key="location")
     text_input.input("London").run()
     assert at.session_state["location"] == "London"
+
+
+class _FakeWeather:
+    """A forecast for Coventry without the network."""
+
+    def get_weather_data(self, location, date=None):
+        from benchmarks.payloads import forecast_payload
+        from services.weather_api import WeatherApiClient
+
+        return WeatherApiClient.__new__(WeatherApiClient)._parse_weather_data(forecast_payload())
+
+    def get_forecast_range(self, location, days=7):
+        from benchmarks.payloads import forecast_payload
+        from services.lean_weather_models import LeanForecastRange
+
+        return LeanForecastRange.from_payload(forecast_payload(days))
+
+
+class _FailingGemini:
+    def __init__(self, error_code):
+        self.error_code = error_code
+
+    def stream_explanation(self, gemini_input):
+        raise AppErrorWrapper(self.error_code, "Gemini is unavailable.")
+        yield  # A generator, like the real client
+
+
+@pytest.mark.parametrize("error_code", sorted(FALLBACK_ERROR_CODES))
+def test_gemini_rate_limits_fall_back_to_template_advice(monkeypatch, tmp_path, error_code):
+    """A rate-limited, quota-exhausted or timed-out Gemini gets the local advice, not an error."""
+    monkeypatch.setattr(services.clients, "_registry", ClientRegistry(
+        {WEATHER_CLIENT: _FakeWeather, GEMINI_CLIENT: lambda: _FailingGemini(error_code)}
+    ))
+    monkeypatch.setattr(services.file_logger, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(services.file_logger, "LOG_FILE", tmp_path / "assessment_log.json")
+    at = AppTest.from_file(str(APP_FILE), default_timeout=30)
+    at.run()
+    at.button[0].click().run()
+    assert not at.exception
+    assert not at.error
+    assert any("AI Service Temporarily Unavailable" in warning.value for warning in at.warning)
+    assert any(info.value.startswith("**AI Safety Advice:** **Weather Summary:**") for info in at.info)
+
+
+def test_range_mode_accepts_an_empty_planning_window_at_midnight(monkeypatch):
+    """A planning slider at (24, 24) plans the day's last hour instead of failing."""
+    monkeypatch.setattr(services.clients, "_registry", ClientRegistry({WEATHER_CLIENT: _FakeWeather, GEMINI_CLIENT: object}))
+    at = AppTest.from_file(str(APP_FILE), default_timeout=30)
+    at.run()
+    at.slider(key="range_planning_hours").set_value((24, 24)).run()
+    at.button(key="find_best_days").click().run()
+    assert not at.exception
+    assert not at.error
+    assert any(header.value.startswith("Best days in Coventry") for header in at.subheader)
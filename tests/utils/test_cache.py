@@ -0,0 +1,85 @@
+# tests/utils/test_cache.py
+import pytest
+
+from utils.cache import TwoTierCache, MISSING
+
+
+class FakeClock:
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+def test_memory_lru_evicts_least_recently_used():
+    cache = TwoTierCache(memory_size=2)
+    cache.set("a", 1, ttl=60)
+    cache.set("b", 2, ttl=60)
+    assert cache.get("a") == 1  # "b" is now least recently used
+    cache.set("c", 3, ttl=60)
+    assert cache.get("b") is MISSING
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["memory_evictions"] == 1
+
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = TwoTierCache(clock=clock)
+    cache.set("a", 1, ttl=10)
+    clock.now += 9
+    assert cache.get("a") == 1
+    clock.now += 2
+    assert cache.get("a", default=None) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_none_can_be_cached():
+    cache = TwoTierCache()
+    cache.set("a", None, ttl=60)
+    assert cache.get("a", default="absent") is None
+
+
+def test_disk_tier_survives_a_new_instance(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    first = TwoTierCache(path=path)
+    first.set(("day", "coventry", "2024-06-01"), {"temp_c": 18.0}, ttl=60)
+    first.close()
+
+    second = TwoTierCache(path=path)
+    assert second.get(("day", "coventry", "2024-06-01")) == {"temp_c": 18.0}
+    assert second.get(("day", "coventry", "2024-06-01")) == {"temp_c": 18.0}
+    stats = second.stats()
+    assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    clock = FakeClock()
+    cache = TwoTierCache(memory_size=1, path=tmp_path / "cache.sqlite3", disk_size=3, clock=clock)
+    for i in range(5):
+        clock.now += 1
+        cache.set(i, i, ttl=60)
+    stats = cache.stats()
+    assert stats["disk_size"] == 3
+    assert stats["disk_evictions"] == 2
+    assert cache.get(0) is MISSING and cache.get(4) == 4
+
+
+def test_expired_disk_rows_are_evicted_first(tmp_path):
+    clock = FakeClock()
+    cache = TwoTierCache(memory_size=1, path=tmp_path / "cache.sqlite3", disk_size=2, clock=clock)
+    cache.set("long", 1, ttl=100)
+    cache.set("short", 2, ttl=1)
+    clock.now += 5
+    cache.set("new", 3, ttl=100)
+    assert cache.get("long") == 1 and cache.get("new") == 3
+
+
+def test_clear_and_invalid_sizes(tmp_path):
+    cache = TwoTierCache(path=tmp_path / "cache.sqlite3")
+    cache.set("a", 1, ttl=60)
+    cache.clear()
+    assert cache.get("a") is MISSING
+    assert cache.stats()["disk_size"] == 0
+    with pytest.raises(ValueError):
+        TwoTierCache(memory_size=0)
@@ -0,0 +1,108 @@
+# tests/utils/test_single_flight.py
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from utils.single_flight import SingleFlight, AsyncSingleFlight
+
+
+def _slow(result, calls, delay=0.1):
+    def fn():
+        calls.append(1)
+        time.sleep(delay)
+        if isinstance(result, Exception):
+            raise result
+        return result
+    return fn
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(lambda _: flight.do("coventry", _slow({"ok": True}, calls)), range(20)))
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats() == {"calls": 20, "executions": 1, "coalesced": 19, "in_flight": 0}
+
+
+def test_errors_are_shared_with_waiters():
+    flight = SingleFlight()
+    calls = []
+    errors = []
+
+    def call():
+        try:
+            flight.do("coventry", _slow(RuntimeError("upstream down"), calls))
+        except RuntimeError as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert len(errors) == 5 and all(e is errors[0] for e in errors)
+
+
+def test_sequential_calls_and_different_keys_are_not_coalesced():
+    flight = SingleFlight()
+    calls = []
+    flight.do("a", _slow(1, calls, delay=0))
+    flight.do("a", _slow(1, calls, delay=0))
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        list(pool.map(lambda key: flight.do(key, _slow(key, calls)), ["b", "c"]))
+    assert len(calls) == 4
+    assert flight.stats()["coalesced"] == 0
+
+
+def test_async_identical_calls_share_one_execution():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return object()
+
+    async def main():
+        return await asyncio.gather(*(flight.do("coventry", fetch) for _ in range(10)))
+
+    results = asyncio.run(main())
+    assert len(calls) == 1
+    assert all(r is results[0] for r in results)
+    assert flight.stats()["coalesced"] == 9
+
+
+def test_async_cancelled_waiter_does_not_cancel_shared_call():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.05)
+        return "done"
+
+    async def main():
+        first = asyncio.ensure_future(flight.do("k", fetch))
+        second = asyncio.ensure_future(flight.do("k", fetch))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == "done"
+
+
+def test_async_errors_are_shared():
+    flight = AsyncSingleFlight()
+
+    async def fetch():
+        await asyncio.sleep(0.01)
+        raise ValueError("bad location")
+
+    async def main():
+        return await asyncio.gather(*(flight.do("k", fetch) for _ in range(3)), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert flight.stats()["executions"] == 1
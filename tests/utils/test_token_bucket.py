@@ -0,0 +1,114 @@
+# tests/utils/test_token_bucket.py
+import multiprocessing
+
+import pytest
+
+from utils.token_bucket import BucketConfig, QuotaExhausted, QuotaManager, PRIORITY_BATCH, PRIORITY_INTERACTIVE
+
+
+class FakeTime:
+    """A clock that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def clock(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def fake_time():
+    return FakeTime()
+
+
+def make_manager(fake_time, path=None, **config):
+    config = dict(dict(rate=1.0, capacity=4, reserve=0.5, max_wait=10.0), **config)
+    return QuotaManager({"api": BucketConfig(**config)}, path, clock=fake_time.clock, sleep=fake_time.sleep)
+
+
+def test_burst_then_waits_at_the_refill_rate(fake_time):
+    quota = make_manager(fake_time, rate=2.0, reserve=0.0)
+    assert [quota.acquire("api") for _ in range(4)] == [0.0] * 4
+    assert quota.acquire("api") == pytest.approx(0.5)
+    assert quota.stats()["api"]["waited_interactive"] == 1
+
+
+def test_batch_traffic_leaves_the_reserve_for_interactive(fake_time):
+    quota = make_manager(fake_time)
+    quota.acquire("api", PRIORITY_BATCH)
+    quota.acquire("api", PRIORITY_BATCH)
+    with pytest.raises(QuotaExhausted):
+        quota.acquire("api", PRIORITY_BATCH, max_wait=0)
+    assert quota.acquire("api", PRIORITY_INTERACTIVE, max_wait=0) == 0.0
+    assert quota.acquire("api", PRIORITY_INTERACTIVE, max_wait=0) == 0.0
+    assert quota.stats()["api"]["rejected_batch"] == 1
+
+
+def test_costs_beyond_the_bucket_wait_for_a_full_share_and_leave_a_debt(fake_time):
+    quota = make_manager(fake_time, reserve=0.0)
+    assert quota.acquire("api", cost=3) == 0.0
+    assert quota.budget("api") == pytest.approx(1)
+    assert quota.acquire("api", cost=10) == pytest.approx(3.0)  # Waits for a full bucket, not for 10 tokens
+    assert quota.budget("api") == pytest.approx(-6)
+    with pytest.raises(ValueError):
+        quota.acquire("api", cost=0)
+
+
+def test_rejects_without_sleeping_when_the_wait_is_too_long(fake_time):
+    quota = make_manager(fake_time, rate=0.1, capacity=1)
+    quota.acquire("api")
+    with pytest.raises(QuotaExhausted) as excinfo:
+        quota.acquire("api", max_wait=5)
+    assert excinfo.value.wait == pytest.approx(10)
+    assert fake_time.slept == []
+
+
+def test_penalize_empties_the_bucket(fake_time):
+    quota = make_manager(fake_time)
+    quota.penalize("api", 30)
+    assert quota.budget("api") == pytest.approx(-29)
+    with pytest.raises(QuotaExhausted):
+        quota.acquire("api")
+    fake_time.now += 30
+    assert quota.acquire("api", max_wait=0) == 0.0
+
+
+def test_budget_is_shared_through_the_file(fake_time, tmp_path):
+    path = tmp_path / "quota.sqlite3"
+    first, second = make_manager(fake_time, path), make_manager(fake_time, path)
+    for _ in range(4):
+        first.acquire("api")
+    assert second.budget("api") == pytest.approx(0)
+    assert second.acquire("api") == pytest.approx(1.0)
+
+
+def _take_tokens(path, count):
+    quota = QuotaManager({"api": BucketConfig(rate=1e-6, capacity=20)}, path)
+    taken = 0
+    for _ in range(count):
+        try:
+            quota.acquire("api", max_wait=0)
+            taken += 1
+        except QuotaExhausted:
+            pass
+    return taken
+
+
+def test_processes_never_overdraw(tmp_path):
+    path = tmp_path / "quota.sqlite3"
+    with multiprocessing.get_context("spawn").Pool(4) as pool:
+        taken = pool.starmap(_take_tokens, [(path, 10)] * 4)
+    assert sum(taken) == 20
+
+
+def test_unknown_bucket_and_priority(fake_time):
+    quota = make_manager(fake_time)
+    with pytest.raises(ValueError):
+        quota.acquire("other")
+    with pytest.raises(ValueError):
+        quota.acquire("api", "urgent")
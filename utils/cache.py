@@ -0,0 +1,165 @@
+"""
+Generic two-tier TTL cache: an in-memory LRU in front of an optional SQLite tier.
+
+Values are kept as Python objects in memory (no re-parsing on a hit) and
+pickled on disk, so entries survive restarts and are shared between processes
+using the same database file. Both tiers are size-bounded and every entry
+carries its own expiry time.
+"""
+import pickle
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Hashable, Optional, Tuple, Union
+
+MISSING = object()  # Returned by get() on a miss, so None can be cached
+
+
+class TwoTierCache:
+    """
+    A size-bounded LRU with per-entry TTLs, optionally backed by SQLite.
+
+    `memory_size` bounds the in-memory tier, `disk_size` the on-disk tier
+    (least recently used rows go first). Without `path` only memory is used.
+    Keys must be hashable; keys and values must be picklable for the disk tier.
+    """
+
+    def __init__(
+        self,
+        memory_size: int = 512,
+        path: Optional[Union[str, Path]] = None,
+        disk_size: int = 10_000,
+        clock=time.time,
+    ):
+        if memory_size < 1 or disk_size < 1:
+            raise ValueError("Cache sizes must be at least 1.")
+        self.memory_size = memory_size
+        self.disk_size = disk_size
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._memory: "OrderedDict[Hashable, Tuple[Any, float]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._counters = dict.fromkeys(
+            ("memory_hits", "disk_hits", "misses", "expirations", "memory_evictions", "disk_evictions", "writes"), 0
+        )
+        self._db = self._open_db() if self.path else None
+
+    # --- Disk tier ---
+
+    def _open_db(self) -> sqlite3.Connection:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path), timeout=5.0, check_same_thread=False, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS cache ("
+            "key BLOB PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        db.execute("CREATE INDEX IF NOT EXISTS cache_accessed ON cache (accessed_at)")
+        return db
+
+    @staticmethod
+    def _db_key(key: Hashable) -> bytes:
+        return pickle.dumps(key, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _disk_get(self, key: Hashable, now: float) -> Tuple[Any, float]:
+        db_key = self._db_key(key)
+        row = self._db.execute("SELECT value, expires_at FROM cache WHERE key = ?", (db_key,)).fetchone()
+        if row is None:
+            return MISSING, 0.0
+        if row[1] <= now:
+            self._db.execute("DELETE FROM cache WHERE key = ?", (db_key,))
+            self._counters["expirations"] += 1
+            return MISSING, 0.0
+        self._db.execute("UPDATE cache SET accessed_at = ? WHERE key = ?", (now, db_key))
+        return pickle.loads(row[0]), row[1]
+
+    def _disk_set(self, key: Hashable, value: Any, expires_at: float, now: float):
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)",
+            (self._db_key(key), pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL), expires_at, now)
+        )
+        excess = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] - self.disk_size
+        if excess > 0:
+            # Expired rows go first, then the least recently used
+            deleted = self._db.execute(
+                "DELETE FROM cache WHERE key IN (SELECT key FROM cache ORDER BY expires_at > ?, accessed_at LIMIT ?)",
+                (now, excess)
+            ).rowcount
+            self._counters["disk_evictions"] += deleted
+
+    # --- Public API ---
+
+    def get(self, key: Hashable, default: Any = MISSING) -> Any:
+        """Returns the cached value, or `default` when absent or expired."""
+        value, _ = self.get_with_expiry(key)
+        return default if value is MISSING else value
+
+    def get_with_expiry(self, key: Hashable) -> Tuple[Any, float]:
+        """Returns (value, expires_at), or (MISSING, 0.0) on a miss."""
+        now = self._clock()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry
+                del self._memory[key]
+                self._counters["expirations"] += 1
+            if self._db is not None:
+                value, expires_at = self._disk_get(key, now)
+                if value is not MISSING:
+                    self._counters["disk_hits"] += 1
+                    self._memory_set(key, value, expires_at)
+                    return value, expires_at
+            self._counters["misses"] += 1
+            return MISSING, 0.0
+
+    def set(self, key: Hashable, value: Any, ttl: float):
+        """Stores `value` in both tiers for `ttl` seconds."""
+        now = self._clock()
+        expires_at = now + ttl
+        with self._lock:
+            self._counters["writes"] += 1
+            self._memory_set(key, value, expires_at)
+            if self._db is not None:
+                self._disk_set(key, value, expires_at, now)
+
+    def _memory_set(self, key: Hashable, value: Any, expires_at: float):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+            self._counters["memory_evictions"] += 1
+
+    def delete(self, key: Hashable):
+        with self._lock:
+            self._memory.pop(key, None)
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache WHERE key = ?", (self._db_key(key),))
+
+    def clear(self):
+        """Empties both tiers; counters are kept."""
+        with self._lock:
+            self._memory.clear()
+            if self._db is not None:
+                self._db.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss/eviction counters per tier plus current sizes and the overall hit rate."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_size"] = len(self._memory)
+            stats["disk_size"] = self._db.execute("SELECT COUNT(*) FROM cache").fetchone()[0] if self._db is not None else 0
+        hits = stats["memory_hits"] + stats["disk_hits"]
+        lookups = hits + stats["misses"]
+        stats["hit_rate"] = hits / lookups if lookups else 0.0
+        return stats
@@ -0,0 +1,35 @@
+import math
+from typing import Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two points in kilometres.
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def snap_to_grid(lat: float, lon: float, cell_deg: float) -> Tuple[float, float]:
+    """
+    Snaps a coordinate to the centre of its grid cell of `cell_deg` degrees.
+    Every point inside one cell maps to the same (lat, lon) pair.
+    """
+    if cell_deg <= 0:
+        raise ValueError("Grid cell size must be positive.")
+    decimals = max(0, -math.floor(math.log10(cell_deg)) + 2)
+    snapped_lat = (math.floor(lat / cell_deg) + 0.5) * cell_deg
+    snapped_lon = (math.floor(lon / cell_deg) + 0.5) * cell_deg
+    return round(snapped_lat, decimals), round(snapped_lon, decimals)
+
+
+def format_coordinates(lat: float, lon: float) -> str:
+    """
+    Formats a coordinate pair as a WeatherAPI `q` parameter ("lat,lon").
+    """
+    return f"{lat:.4f},{lon:.4f}"
@@ -0,0 +1,96 @@
+"""
+Single-flight request coalescing.
+
+Concurrent calls with the same key share one in-flight execution: the first
+caller runs the function, later callers wait for it and receive the same
+result or the same exception. `SingleFlight` is for threads,
+`AsyncSingleFlight` for coroutines on one event loop.
+"""
+import asyncio
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+
+class _Call:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class _Counters:
+    def __init__(self):
+        self.calls = 0       # Every do() call
+        self.executions = 0  # Calls that actually ran the function
+        self.coalesced = 0   # Calls that shared another call's execution (calls saved)
+
+    def stats(self, in_flight: int) -> Dict[str, int]:
+        return {"calls": self.calls, "executions": self.executions, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+class SingleFlight:
+    """Thread-safe single-flight group."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = threading.Lock()
+        self._counters = _Counters()
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Runs `fn()` unless a call for `key` is already in flight, in which case waits for its outcome."""
+        with self._lock:
+            self._counters.calls += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._counters.executions += 1
+            else:
+                self._counters.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return self._counters.stats(len(self._calls))
+
+
+class AsyncSingleFlight:
+    """Single-flight group for coroutines. Not thread-safe: use one per event loop."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self._counters = _Counters()
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Awaits `fn()` unless a call for `key` is already in flight, in which case awaits that one."""
+        self._counters.calls += 1
+        task = self._calls.get(key)
+        if task is None or task.done():
+            self._counters.executions += 1
+            task = self._calls[key] = asyncio.ensure_future(fn())
+            task.add_done_callback(lambda done: self._calls.pop(key) if self._calls.get(key) is done else None)
+        else:
+            self._counters.coalesced += 1
+        # Shielded, so one cancelled waiter does not cancel the call the others share
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, int]:
+        return self._counters.stats(len(self._calls))
@@ -0,0 +1,184 @@
+"""
+Token buckets shared between processes through SQLite.
+
+Each bucket refills at `rate` tokens per second up to `capacity`; a call takes
+one token (or `cost` tokens) or waits until they are available. The bucket state lives in one
+SQLite row updated inside an immediate transaction, so every process using the
+same database file draws from the same budget. Without a path the state is
+kept in an in-memory database private to the manager.
+
+Two priority lanes share a bucket: batch traffic may not take the last
+`reserve` fraction of the capacity, which is left for interactive calls.
+"""
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Mapping, NamedTuple, Optional, Union
+
+PRIORITY_INTERACTIVE = "interactive"
+PRIORITY_BATCH = "batch"
+PRIORITIES = (PRIORITY_INTERACTIVE, PRIORITY_BATCH)
+
+
+class BucketConfig(NamedTuple):
+    rate: float             # Tokens per second
+    capacity: float         # Largest burst
+    reserve: float = 0.0    # Fraction of `capacity` only interactive calls may use
+    max_wait: float = 10.0  # Default longest wait, in seconds, before giving up
+
+
+class QuotaExhausted(Exception):
+    """No token will be available within the allowed wait."""
+
+    def __init__(self, bucket: str, wait: float):
+        super().__init__(f"Quota '{bucket}' exhausted; next token in {wait:.1f}s.")
+        self.bucket = bucket
+        self.wait = wait
+
+
+class QuotaManager:
+    """
+    Acquires tokens from named buckets shared through `path`.
+
+    `acquire` blocks (sleeping, not spinning) until a token is free and
+    returns the seconds it waited, or raises QuotaExhausted straight away if
+    the wait would exceed `max_wait`. `penalize` empties a bucket for a while,
+    e.g. after an upstream 429, so every process backs off together.
+    """
+
+    def __init__(
+        self,
+        buckets: Mapping[str, BucketConfig],
+        path: Optional[Union[str, Path]] = None,
+        clock=time.time,
+        sleep=time.sleep,
+    ):
+        for config in buckets.values():
+            if config.rate <= 0 or config.capacity < 1 or not 0 <= config.reserve < 1:
+                raise ValueError("Buckets need a positive rate, a capacity of at least 1 and a reserve in [0, 1).")
+        self.buckets = dict(buckets)
+        self.path = Path(path) if path else None
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._metrics = {
+            name: {f"{kind}_{priority}": 0 for kind in ("acquired", "waited", "rejected") for priority in PRIORITIES}
+            | {"wait_seconds": 0.0, "max_wait_seconds": 0.0}
+            for name in self.buckets
+        }
+        self._db = self._open_db()
+
+    def _open_db(self) -> sqlite3.Connection:
+        if self.path:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        db = sqlite3.connect(str(self.path or ":memory:"), timeout=5.0, check_same_thread=False, isolation_level=None)
+        if self.path:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")  # No fsync per acquire; losing a moment of budget state is harmless
+        db.execute("CREATE TABLE IF NOT EXISTS buckets (name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)")
+        return db
+
+    def _config(self, name: str) -> BucketConfig:
+        try:
+            return self.buckets[name]
+        except KeyError:
+            raise ValueError(f"Unknown quota bucket '{name}'.") from None
+
+    def _refilled(self, name: str, config: BucketConfig, now: float) -> float:
+        """Current tokens of `name`; must run inside a transaction."""
+        row = self._db.execute("SELECT tokens, updated_at FROM buckets WHERE name = ?", (name,)).fetchone()
+        if row is None:
+            return config.capacity
+        return min(config.capacity, row[0] + max(0.0, now - row[1]) * config.rate)
+
+    def _store(self, name: str, tokens: float, now: float):
+        self._db.execute(
+            "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)", (name, tokens, now)
+        )
+
+    def _try_take(self, name: str, config: BucketConfig, priority: str, cost: float) -> float:
+        """
+        Takes `cost` tokens and returns 0.0, or returns the seconds until they are available.
+
+        A cost larger than the lane's share of the bucket could never be met;
+        it waits for a full share instead and leaves the bucket in debt, so
+        the calls after it wait for the refill.
+        """
+        floor = config.capacity * config.reserve if priority == PRIORITY_BATCH else 0.0
+        needed = min(cost, max(1.0, config.capacity - floor))
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                tokens = self._refilled(name, config, now)
+                if tokens - needed >= floor:
+                    self._store(name, tokens - cost, now)
+                    return 0.0
+                return (floor + needed - tokens) / config.rate
+            finally:
+                self._db.execute("COMMIT")
+
+    def acquire(
+        self, name: str, priority: str = PRIORITY_INTERACTIVE, max_wait: Optional[float] = None, cost: float = 1
+    ) -> float:
+        """Takes `cost` tokens from bucket `name`, waiting up to `max_wait` seconds; returns the time waited."""
+        if priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority '{priority}'.")
+        if cost < 1:
+            raise ValueError("A call costs at least one token.")
+        config = self._config(name)
+        max_wait = config.max_wait if max_wait is None else max_wait
+        metrics = self._metrics[name]
+        start = self._clock()
+        while True:
+            wait = self._try_take(name, config, priority, cost)
+            waited = self._clock() - start
+            if wait == 0.0:
+                break
+            if waited + wait > max_wait:
+                with self._lock:
+                    metrics[f"rejected_{priority}"] += 1
+                raise QuotaExhausted(name, wait)
+            self._sleep(wait)
+        with self._lock:
+            metrics[f"acquired_{priority}"] += 1
+            if waited > 0:
+                metrics[f"waited_{priority}"] += 1
+                metrics["wait_seconds"] += waited
+                metrics["max_wait_seconds"] = max(metrics["max_wait_seconds"], waited)
+        return waited
+
+    def penalize(self, name: str, seconds: float):
+        """Empties bucket `name` so that its next token is `seconds` away, for every process."""
+        config = self._config(name)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                now = self._clock()
+                self._store(name, min(self._refilled(name, config, now), 1 - seconds * config.rate), now)
+            finally:
+                self._db.execute("COMMIT")
+
+    def budget(self, name: str) -> float:
+        """Tokens currently available in bucket `name` (negative while penalized)."""
+        config = self._config(name)
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                return self._refilled(name, config, self._clock())
+            finally:
+                self._db.execute("COMMIT")
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per bucket: the shared `budget`, and this process's acquire, rejection and wait-time counters."""
+        stats = {}
+        for name, config in self.buckets.items():
+            budget = self.budget(name)
+            with self._lock:
+                stats[name] = dict(self._metrics[name], budget=budget, capacity=config.capacity, rate=config.rate)
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()